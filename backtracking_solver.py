@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import math
+import sys
+
+sys.path.insert(0, ".")
+
+from candidates import Candidates
+from geometry import Geometry
+from grid import Grid
+from propagator import Propagator
+
+
+class BacktrackingSolver:
+    """
+    Depth-first search that always branches on the empty cell with the fewest candidates
+    (minimum remaining values) and propagates singles after every assignment.
+
+    Branches are undone by rolling back the grid's trail of candidate removals - the grid is
+    never copied per branch and no Cell objects are involved.
+
+    From LOCKED_CANDIDATES_SIZE values up (16x16, 25x25), propagation also removes locked
+    candidates: the search trees of large puzzles shrink several times over, which more than
+    pays for the extra pass at every node.
+
+    - solve(grid) - return the first solution as a new Grid (None if there is none)
+    - count_solutions(grid, limit, max_nodes) - count solutions, stopping as soon as `limit` are
+      found; None if the search gave up after `max_nodes` guesses
+    - uniqueness(grid, max_nodes) - "none", "unique" or "multiple", stopping at the second solution
+      ("unknown" if the search gave up after `max_nodes` guesses)
+    """
+
+    NO_SOLUTION = "none"
+    UNIQUE = "unique"
+    MULTIPLE = "multiple"
+    UNIQUENESS = (NO_SOLUTION, UNIQUE, MULTIPLE)
+    UNKNOWN = "unknown"
+    LOCKED_CANDIDATES_SIZE = 16
+
+    class OutOfNodes(Exception):
+        pass
+
+    def __init__(self, geometry=None):
+        self.geometry = geometry or Geometry.of(3, 3)
+        self._popcount, _lowest, _values = Candidates.tables(self.geometry.size)
+        self._locked_candidates = self.geometry.size >= self.LOCKED_CANDIDATES_SIZE
+
+    def solve(self, grid: Grid) -> Grid:
+        solutions = self.__run(grid, limit=1)
+        return Grid(self.geometry, solutions[0]) if solutions else None
+
+    def count_solutions(self, grid: Grid, limit=2, max_nodes=None) -> int:
+        try:
+            return len(self.__run(grid, limit=limit, max_nodes=max_nodes))
+        except BacktrackingSolver.OutOfNodes:
+            return None
+
+    def uniqueness(self, grid: Grid, max_nodes=None) -> str:
+        count = self.count_solutions(grid, limit=2, max_nodes=max_nodes)
+        return self.UNKNOWN if count is None else self.UNIQUENESS[count]
+
+    # Private functions
+
+    def __run(self, grid: Grid, limit, max_nodes=None) -> list:
+        self._solutions = []
+        self._limit = limit
+        self._nodes_left = max_nodes or math.inf
+        self._grid = grid.copy()
+        self._grid.trail = []
+        self._propagator = Propagator(self._grid, self._locked_candidates)
+        self._propagator.propagate() and self.__search()
+        return self._solutions
+
+    def __search(self) -> bool:
+        """Returns True when the solution limit has been reached"""
+        cell = self.__mrv_cell()
+        if cell is None:
+            self._solutions.append(list(self._grid.values))
+            return len(self._solutions) >= self._limit
+        grid, propagator = self._grid, self._propagator
+        mask = grid.masks[cell]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            self._nodes_left -= 1
+            if self._nodes_left < 0:
+                raise BacktrackingSolver.OutOfNodes
+            mark = len(grid.trail)
+            propagator.assign(cell, bit.bit_length())
+            done = propagator.propagate() and self.__search()
+            grid.undo(mark)
+            propagator.clear()
+            if done:
+                return True
+        return False
+
+    def __mrv_cell(self) -> int:
+        """Return the empty cell with the fewest candidates (None if the grid is full)"""
+        values, masks, popcount = self._grid.values, self._grid.masks, self._popcount
+        best_cell, best_count = None, self.geometry.size + 1
+        for cell, value in enumerate(values):
+            if not value and popcount[masks[cell]] < best_count:
+                best_cell, best_count = cell, popcount[masks[cell]]
+                if best_count <= 2:  # Singles are already propagated, so this is the minimum
+                    break
+        return best_cell
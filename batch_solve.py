@@ -0,0 +1,257 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, ".")
+
+from backtracking_solver import BacktrackingSolver
+from dlx_solver import DlxSolver
+from geometry import Geometry
+from grid import Grid
+from latency_stats import LatencyStats
+from solution_cache import SolutionCache
+
+
+class BatchSolve:
+    """
+    Headless batch solving - no terminal, no splash screen.
+
+    Puzzles are streamed from a file (or stdin), one per line with "." or "0" for empty
+    cells; blank lines and lines starting with "#" are skipped.  Each solution is written
+    as soon as it is found, one line per puzzle, so memory stays constant however large
+    the input is.  Throughput and latency percentiles are reported on stderr.
+
+    With --jobs, the stream is split into chunks that are solved on a process pool.  Each
+    worker sets up its solver once; only puzzle/solution strings cross process boundaries,
+    results come back in input order, and at most WINDOW_PER_JOB chunks per worker are in
+    flight so memory stays flat.
+
+    With --vectorized (requires NumPy), each chunk is first run through NumPy lock-step
+    singles (see VectorizedBatch) and only the puzzles left unsolved go to the solver;
+    latencies are then reported per puzzle as the chunk time divided by its size.
+
+    With --check, each result line is "none", "unique" or "multiple" instead of a solution -
+    the search stops at the second solution, so bad puzzles are rejected early.
+
+    With --cache-mb, a SolutionCache (keyed by canonical form) sits in front of the solver so
+    repeated and isomorphic puzzles are not solved again.  Each worker process has its own cache;
+    the report sums their counters.
+
+    Usage: python batch_solve.py [puzzles.txt] [-o solutions.txt] [--solver backtracking|dlx] [--jobs N]
+           [--chunk-size N] [--vectorized] [--cache-mb MB] [--check] [--quiet]
+    """
+
+    SOLVERS = {"backtracking": BacktrackingSolver, "dlx": DlxSolver}
+    NO_SOLUTION = "no solution"
+    CHUNK_SIZE = 256
+    WINDOW_PER_JOB = 4
+
+    def __init__(self, solver="backtracking", geometry=None, vectorized=False, cache_bytes=0, check=False):
+        self.geometry = geometry or Geometry.of(3, 3)
+        self._solver_name = solver
+        self._solver = self.SOLVERS[solver](self.geometry)
+        self._check = check
+        self.cache = cache_bytes and SolutionCache(self._solver, cache_bytes)
+        self._solver = self.cache or self._solver
+        self._vectorized = vectorized and BatchSolve.__vectorized_batch(self._solver)
+        self.stats = LatencyStats()
+        self.unsolved = 0
+        self._worker_caches = {}  # Worker pid -> latest stats of its cache
+
+    def main(argv=None) -> None:
+        args = BatchSolve.__parse_args(argv)
+        batch = BatchSolve(
+            args.solver, vectorized=args.vectorized, cache_bytes=int(args.cache_mb * 2**20), check=args.check
+        )
+        open_or = BatchSolve.__open  # The output is only opened once the puzzles are
+        with open_or(args.puzzles, "r", sys.stdin) as lines, open_or(args.output, "w", sys.stdout) as out:
+            started = time.perf_counter()
+            jobs = args.jobs or os.cpu_count()
+            results = (
+                batch.solve_lines(lines) if jobs == 1 else batch.solve_lines_parallel(lines, jobs, args.chunk_size)
+            )
+            for solution in results:
+                out.write(solution + "\n")
+            elapsed = time.perf_counter() - started
+        args.quiet or batch.report(elapsed)
+
+    def solve_lines(self, lines):
+        """Yield one result line per puzzle line"""
+        if self._vectorized and not self._check:
+            for chunk in BatchSolve.__chunks(BatchSolve.__puzzle_lines(lines), self.CHUNK_SIZE):
+                yield from self.__collect(*self.solve_chunk(chunk))
+            return
+        for line in BatchSolve.__puzzle_lines(lines):
+            yield self.solve_line(line)
+
+    def solve_lines_parallel(self, lines, jobs, chunk_size=CHUNK_SIZE):
+        """Yield one result line per puzzle line (in input order), solving chunks on a pool of `jobs` processes"""
+        geometry = (self.geometry.block_rows, self.geometry.block_cols)
+        worker = (self._solver_name, geometry, bool(self._vectorized), self.cache and self.cache.max_bytes, self._check)
+        with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=worker) as pool:
+            pending = deque()
+            for chunk in BatchSolve.__chunks(BatchSolve.__puzzle_lines(lines), chunk_size):
+                pending.append(pool.apply_async(_solve_chunk, (chunk,)))
+                while len(pending) >= jobs * self.WINDOW_PER_JOB:
+                    yield from self.__collect(*pending.popleft().get())
+            while pending:
+                yield from self.__collect(*pending.popleft().get())
+
+    def solve_line(self, line) -> str:
+        result, latency, is_solved = self.timed_solve(line)
+        self.stats.add(latency)
+        self.unsolved += not is_solved
+        return result
+
+    def timed_solve(self, line) -> tuple:
+        """Solve a puzzle line; returns (result line, latency in seconds, True if solved)"""
+        if self._check:
+            return self.timed_check(line)
+        started = time.perf_counter()
+        try:
+            solution = self._solver.solve(Grid.from_string(line, self.geometry))
+        except ValueError as e:
+            solution, result = None, f"error: {e}"
+        else:
+            result = solution.to_string() if solution else self.NO_SOLUTION
+        return result, time.perf_counter() - started, solution is not None
+
+    def timed_check(self, line) -> tuple:
+        """Check a puzzle line has one solution; returns (uniqueness or error, latency in seconds, True if unique)"""
+        started = time.perf_counter()
+        try:
+            count = self._solver.count_solutions(Grid.from_string(line, self.geometry))
+        except ValueError as e:
+            count, result = None, f"error: {e}"
+        else:
+            result = BacktrackingSolver.UNIQUENESS[count]
+        return result, time.perf_counter() - started, count == 1
+
+    def solve_chunk(self, lines) -> tuple:
+        """Solve a chunk of puzzle lines; returns (results, latencies, unsolved count)"""
+        if self._vectorized and not self._check:
+            return self.__solve_vectorized(lines)
+        results, latencies, solved = zip(*(self.timed_solve(line) for line in lines))
+        return list(results), list(latencies), len(lines) - sum(solved)
+
+    def report(self, elapsed=None) -> None:
+        print(self.stats.report("puzzles", elapsed), file=sys.stderr)
+        problem = "did not have a unique solution" if self._check else "had no solution"
+        self.unsolved and print(f"{self.unsolved} puzzles were invalid or {problem}", file=sys.stderr)
+        cache = self.__cache_stats()
+        workers = f" (summed over {len(self._worker_caches)} workers)" if self._worker_caches else ""
+        cache and cache["hits"] + cache["misses"] and print(SolutionCache.summary(cache) + workers, file=sys.stderr)
+
+    # Private functions
+
+    def __puzzle_lines(lines):
+        return (line for line in (line.strip() for line in lines) if line and not line.startswith("#"))
+
+    def __chunks(lines, chunk_size):
+        lines = iter(lines)
+        chunk = list(itertools.islice(lines, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(itertools.islice(lines, chunk_size))
+
+    def __vectorized_batch(solver):
+        from vectorized_batch import VectorizedBatch  # NumPy is only required for --vectorized
+
+        return VectorizedBatch(solver.geometry, solver)
+
+    def __solve_vectorized(self, lines) -> tuple:
+        started = time.perf_counter()
+        results, rows, valid = [None] * len(lines), [], []
+        for index, line in enumerate(lines):
+            try:
+                rows.append(Grid.from_string(line, self.geometry).values)
+                valid.append(index)
+            except ValueError as e:
+                results[index] = f"error: {e}"
+        solutions, solved = self._vectorized.solve(rows)
+        for index, solution, is_solved in zip(valid, self._vectorized.to_strings(solutions), solved):
+            results[index] = solution if is_solved else self.NO_SOLUTION
+        latency = (time.perf_counter() - started) / len(lines)
+        return results, [latency] * len(lines), len(lines) - int(solved.sum())
+
+    def __collect(self, results, latencies, unsolved, worker_cache=None) -> list:
+        for latency in latencies:
+            self.stats.add(latency)
+        self.unsolved += unsolved
+        worker_cache and self._worker_caches.update([worker_cache])
+        return results
+
+    def __cache_stats(self) -> dict:
+        """The counters of this process's cache, or their sums over the workers' caches"""
+        if not self._worker_caches:
+            return self.cache and self.cache.stats()
+        return {key: sum(stats[key] for stats in self._worker_caches.values()) for key in self.cache.stats()}
+
+    def __parse_args(argv) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(description="Solve a stream of sudoku puzzles (one per line)")
+        parser.add_argument("puzzles", nargs="?", help="puzzle file (default: stdin)")
+        parser.add_argument("-o", "--output", help="solution file (default: stdout)")
+        parser.add_argument("--solver", choices=sorted(BatchSolve.SOLVERS), default="backtracking")
+        parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (0: one per core)")
+        parser.add_argument("--chunk-size", type=int, default=BatchSolve.CHUNK_SIZE, help="puzzles per worker task")
+        parser.add_argument("--vectorized", action="store_true", help="solve singles for whole chunks with NumPy")
+        parser.add_argument("--check", action="store_true", help='report "none", "unique" or "multiple" solutions')
+        parser.add_argument("--cache-mb", type=float, default=0, help="solution cache size in MB (default: no cache)")
+        parser.add_argument("-q", "--quiet", action="store_true", help="do not report throughput and latency")
+        return parser.parse_args(argv)
+
+    def __open(path, mode, default):
+        return open(path, mode) if path and path != "-" else _Unclosed(default)
+
+
+# Process pool workers: each worker sets up its solver once and then only sees puzzle strings
+
+_worker = None
+
+
+def _init_worker(solver, geometry, vectorized, cache_bytes, check) -> None:
+    global _worker
+    _worker = BatchSolve(solver, Geometry.of(*geometry), vectorized, cache_bytes, check)
+
+
+def _solve_chunk(lines) -> tuple:
+    """Solve a chunk; the worker's cache stats (if any) are passed along with its results"""
+    return _worker.solve_chunk(lines) + (_worker.cache and (os.getpid(), _worker.cache.stats()),)
+
+
+class _Unclosed:
+    """Context manager for stdin/stdout that does not close them"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def __enter__(self):
+        return self._stream
+
+    def __exit__(self, *_exc):
+        self._stream.flush()
+
+
+if __name__ == "__main__":
+    BatchSolve.main()
@@ -0,0 +1,96 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+class Candidates:
+    """
+    Bitmask helpers for cell candidates.
+
+    A candidate mask is an integer where bit (value - 1) is set when that value is still
+    possible for the cell.  Lookup tables are built once per mask width (the number of
+    values in the puzzle) and shared by every cell using that width:
+
+    - popcount[mask] - number of candidates in the mask
+    - lowest[mask] - smallest candidate value in the mask (0 when the mask is empty)
+    - values[mask] - tuple of candidate values in ascending order
+
+    Widths up to MAX_TABLE_BITS are fully tabulated; wider masks (e.g. 25x25 puzzles)
+    use tables that compute and remember entries on first use.
+    """
+
+    MAX_TABLE_BITS = 16
+
+    _tables = {}
+
+    def full(size) -> int:
+        """Return the mask with all `size` values possible"""
+        return (1 << size) - 1
+
+    def bit(value) -> int:
+        """Return the mask with only `value` possible"""
+        return 1 << (value - 1)
+
+    def mask_of(values) -> int:
+        """Return the mask for an iterable of values"""
+        mask = 0
+        for value in values:
+            mask |= 1 << (value - 1)
+        return mask
+
+    def tables(size) -> tuple:
+        """Return the (popcount, lowest, values) lookup tables for masks of `size` bits"""
+        tables = Candidates._tables.get(size)
+        if tables is None:
+            tables = (
+                Candidates.__full_tables(size)
+                if size <= Candidates.MAX_TABLE_BITS
+                else (_LazyTable(int.bit_count), _LazyTable(_lowest), _LazyTable(_values))
+            )
+            Candidates._tables[size] = tables
+        return tables
+
+    def __full_tables(size) -> tuple:
+        popcount = [0] * (1 << size)
+        lowest = [0] * (1 << size)
+        values = [()] * (1 << size)
+        for mask in range(1, 1 << size):
+            rest = mask & (mask - 1)
+            low = (mask ^ rest).bit_length()
+            popcount[mask] = popcount[rest] + 1
+            lowest[mask] = low
+            values[mask] = (low,) + values[rest]
+        return popcount, lowest, values
+
+
+class _LazyTable(dict):
+    """A lookup table that computes (and remembers) entries on first use"""
+
+    def __init__(self, func):
+        super().__init__()
+        self._func = func
+
+    def __missing__(self, mask):
+        entry = self[mask] = self._func(mask)
+        return entry
+
+
+def _lowest(mask) -> int:
+    return (mask & -mask).bit_length()
+
+
+def _values(mask) -> tuple:
+    return tuple(bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1)
@@ -0,0 +1,205 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import itertools
+import sys
+from dataclasses import dataclass
+
+sys.path.insert(0, ".")
+
+from grid import Grid
+
+
+@dataclass(frozen=True)
+class Transform:
+    """
+    A validity-preserving transformation of a grid:
+    - transpose - rows and columns are swapped first (only for square blocks)
+    - rows[i] - the (transposed) source row that becomes row i
+    - cols[j] - the (transposed) source column that becomes column j
+    - labels - source value -> new value
+    """
+
+    transpose: bool
+    rows: tuple
+    cols: tuple
+    labels: dict
+
+    def apply(self, grid: Grid) -> Grid:
+        """Return the transformed grid"""
+        size = grid.geometry.size
+        labels = self.__all_labels(size)
+        values = [0] * grid.geometry.cell_count
+        for i, j, cell in self.__source_cells(size):
+            values[i * size + j] = labels[grid.values[cell]]
+        return Grid(grid.geometry, values)
+
+    def revert(self, grid: Grid) -> Grid:
+        """Return the grid in the orientation and labelling the transformation was applied to"""
+        size = grid.geometry.size
+        unlabels = {label: value for value, label in self.__all_labels(size).items()}
+        values = [0] * grid.geometry.cell_count
+        for i, j, cell in self.__source_cells(size):
+            values[cell] = unlabels[grid.values[i * size + j]]
+        return Grid(grid.geometry, values)
+
+    # Private functions
+
+    def __source_cells(self, size):
+        for i, row in enumerate(self.rows):
+            for j, col in enumerate(self.cols):
+                yield i, j, (col * size + row if self.transpose else row * size + col)
+
+    def __all_labels(self, size) -> dict:
+        """Labels for every value; values absent from the source are paired with unused labels in ascending order"""
+        labels = dict(self.labels)
+        unused = (label for label in range(1, size + 1) if label not in self.labels.values())
+        for value in range(1, size + 1):
+            value in labels or labels.update({value: next(unused)})
+        labels[0] = 0
+        return labels
+
+
+class CanonicalForm:
+    """
+    Minlex canonical form of a puzzle.
+
+    Among all grids reachable by transposing, permuting bands, rows within a band, stacks,
+    columns within a stack and relabelling values, the canonical form is the one whose
+    string (empty cells as 0, values relabelled in order of first appearance) is
+    lexicographically smallest.  Isomorphic puzzles therefore share the same canonical form.
+
+    The search builds the form row by row and keeps only the transformations that produce
+    the smallest prefix so far.  Columns that no row has told apart yet are kept together as
+    one interchangeable group instead of being enumerated.  Very symmetric grids (e.g. almost
+    empty ones) can still tie on too many transformations; once more than MAX_CANDIDATES are
+    alive the search gives up.
+
+    - of(grid) - (canonical string, Transform from grid to the canonical form), or (None, None)
+    - fingerprint(grid) - a string that isomorphic grids share (non-isomorphic ones may too),
+      much cheaper than of(grid): the sorted clue counts per value, line (by band/stack) and block
+    """
+
+    MAX_CANDIDATES = 2048
+
+    def of(grid: Grid) -> tuple:
+        geometry = grid.geometry
+        orientations = CanonicalForm.__orientations(grid)
+        candidates = CanonicalForm.__first_candidates(orientations, geometry)
+        for _row in range(geometry.size):
+            candidates = CanonicalForm.__next_row_candidates(candidates, orientations, geometry.block_rows)
+            if len(candidates) > CanonicalForm.MAX_CANDIDATES:
+                return None, None
+        transpose, rows, groups, labels = candidates[0]
+        transform = Transform(bool(transpose), rows, tuple(col for group in groups for col in group), labels)
+        return transform.apply(grid).to_string(), transform
+
+    def fingerprint(grid: Grid) -> str:
+        geometry = grid.geometry
+        size = geometry.size
+        counts = [[0] * size for _kind in range(3)]  # Per row, column and block
+        per_value = [0] * (size + 1)
+        for cell, value in enumerate(grid.values):
+            if value:
+                per_value[value] += 1
+                for kind, house in enumerate(geometry.cell_houses[cell]):
+                    counts[kind][house - kind * size] += 1
+        bands = CanonicalForm.__grouped(counts[0], geometry.block_rows)
+        stacks = CanonicalForm.__grouped(counts[1], geometry.block_cols)
+        return repr((sorted(per_value[1:]), sorted((bands, stacks)), sorted(counts[2])))  # Transposing swaps them
+
+    # Private functions
+
+    def __grouped(counts, group) -> list:
+        """Counts per band (or stack), sorted within and between bands"""
+        return sorted(tuple(sorted(counts[start : start + group])) for start in range(0, len(counts), group))
+
+    def __orientations(grid: Grid) -> list:
+        size = grid.geometry.size
+        rows = [tuple(grid.values[row * size : (row + 1) * size]) for row in range(size)]
+        is_square = grid.geometry.block_rows == grid.geometry.block_cols
+        return [rows, [tuple(col) for col in zip(*rows)]] if is_square else [rows]
+
+    def __first_candidates(orientations, geometry) -> list:
+        """Start with every orientation and stack order; the first row will pick among them"""
+        stacks = [tuple(range(col, col + geometry.block_cols)) for col in range(0, geometry.size, geometry.block_cols)]
+        return [
+            (transpose, (), stack_order, {})
+            for transpose in range(len(orientations))
+            for stack_order in itertools.permutations(stacks)
+        ]
+
+    def __next_row_candidates(candidates, orientations, block_rows) -> list:
+        """Extend every candidate by each row allowed next and keep those giving the smallest row"""
+        best, kept = None, []
+        for transpose, rows, groups, labels in candidates:
+            source = orientations[transpose]
+            for source_row in CanonicalForm.__allowed_rows(rows, len(source), block_rows):
+                row = CanonicalForm.__smallest_row(source[source_row], groups, labels)
+                if best is None or row < best:
+                    best, kept = row, []
+                if row == best:
+                    kept.extend(
+                        (transpose, rows + (source_row,), refined, refined_labels)
+                        for refined, refined_labels in CanonicalForm.__refinements(source[source_row], groups, labels)
+                    )
+                if len(kept) > CanonicalForm.MAX_CANDIDATES:
+                    return kept
+        return kept
+
+    def __allowed_rows(rows, size, block_rows):
+        """Rows that can come next: the rest of the current band, or any row of an unused band"""
+        if len(rows) % block_rows:
+            band = rows[-1] // block_rows
+            return [row for row in range(band * block_rows, (band + 1) * block_rows) if row not in rows]
+        used_bands = {row // block_rows for row in rows}
+        return [row for row in range(size) if row // block_rows not in used_bands]
+
+    def __smallest_row(row, groups, labels) -> tuple:
+        """
+        The smallest relabelled row the column groups allow: within a group, empty cells first,
+        then already labelled values in label order, then new values (which get the next labels)
+        """
+        relabelled = []
+        next_label = len(labels) + 1
+        for group in groups:
+            values = [row[col] for col in group]
+            known = sorted(labels[value] for value in values if value in labels)
+            new = sum(1 for value in values if value and value not in labels)
+            relabelled += [0] * (len(values) - len(known) - new) + known + list(range(next_label, next_label + new))
+            next_label += new
+        return tuple(relabelled)
+
+    def __refinements(row, groups, labels):
+        """
+        Yield (groups, labels) for each way of reaching the smallest row: groups are split into the
+        empty cells (still interchangeable), then one group per labelled column, and the new values
+        are tried in every order since the order decides their labels
+        """
+        fixed, new_parts = [], []
+        for group in groups:
+            empty = tuple(col for col in group if not row[col])
+            known = sorted((labels[row[col]], col) for col in group if row[col] in labels)
+            new = [col for col in group if row[col] and row[col] not in labels]
+            fixed.append([empty] * bool(empty) + [(col,) for _label, col in known])
+            new_parts.append(list(itertools.permutations(new)))
+        for new_orders in itertools.product(*new_parts):
+            refined, added = [], {}
+            for parts, new in zip(fixed, new_orders):
+                refined += parts + [(col,) for col in new]
+                added.update((row[col], len(labels) + len(added) + 1) for col in new)
+            yield tuple(refined), {**labels, **added}
@@ -45,11 +45,26 @@ class Cell(Delegator):
         self.borders = borders
 
         # Initialize the Delegators (currently only CellSolver)
-        super().__init__({self._solver: ["possible_values"]})
+        super().__init__(
+            {self._solver: ["possible_values", "candidates", "is_possible", "add_possible", "remove_possible"]}
+        )
+
+    CONFLICTS = (DisplayAttrs.CONFLICTING, DisplayAttrs.CONFLICTED)
 
     def value(self) -> int:
         return self._value
 
+    def conflict(self) -> str:
+        """Return CONFLICTING (this value duplicates a peer's), CONFLICTED (a peer duplicates it) or None"""
+        return next((attr for attr in self.CONFLICTS if attr in self._attrs), None)
+
+    def set_conflict(self, conflict=None) -> bool:
+        """Set the conflict attribute (None clears it) but not the display; returns True if it changed"""
+        previous = self.conflict()
+        self._attrs.difference_update(self.CONFLICTS)
+        conflict and self._attrs.add(conflict)
+        return conflict != previous
+
     def attr(self) -> set:
         """Return the set of attributes."""
         return self._attrs
@@ -66,12 +81,20 @@ class Cell(Delegator):
         self.__draw_cell_values()
 
     def set(self, value, attrs=()) -> None:
-        """Set the cell value but not the display"""
+        """Set the cell value but not the display (the parent tracks conflicts when the value changes)"""
         if value and value not in self._parent.values():
             raise ValueError(f"Cell value must be in {self._parent.values()}")
+        conflict = value == self._value and self.conflict()
         self._attrs = set(attrs)
+        conflict and self._attrs.add(conflict)
         value != self._value and self.__smart_update(value)
 
+    def restore(self, value, candidates, attrs) -> None:
+        """Put back a value, candidate bitmask and attributes saved earlier - no peer updates, no display"""
+        self._value = value
+        self._solver.set_candidates(candidates)
+        self._attrs = set(attrs)
+
     # Private functions
 
     def __draw_cell_values(self) -> None:
@@ -82,7 +105,6 @@ class Cell(Delegator):
         """
         The brains of the cell.  It will update the cell taking into account any logic/analysis required.
         """
-        not value or value in self._solver.possible_values() or self._attrs.add(DisplayAttrs.CONFLICTING)
         self._value and self._parent.add_possible(self.row, self.col, self._value)
         value and self._parent.remove_possible(self.row, self.col, value)
         self._value = value
@@ -15,19 +15,49 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # -----------------------------------------------------------------------------
 
+from candidates import Candidates
+
 
 class CellSolver:
     """
     The CellSolver class is responsible for managing and calculating the possible values
-    for a Sudoku cell. It will also handle logic to determine if a cell must contain
-    a specific value based on the state of the puzzle.
+    for a Sudoku cell.  The logic to determine if a cell must contain a specific value
+    based on the state of the puzzle lives in Propagator (singles) and TechniqueLadder
+    (locked candidates, subsets, fish, wings), which work on the whole grid at once.
 
-    For now, it only contains the `_possible_values` attribute.
+    The possible values are kept as a candidate bitmask (see `Candidates`) so that
+    queries are table lookups rather than set operations.
     """
 
     def __init__(self, cell_parent):
-        self._possible_values = set(sorted(cell_parent.values()))
+        size = len(cell_parent.values())
+        self._popcount, self._lowest, self._values = Candidates.tables(size)
+        self._mask = Candidates.full(size)
+
+    def possible_values(self) -> tuple:
+        """Return the possible values for the cell in ascending order."""
+        return self._values[self._mask]
+
+    def candidates(self) -> int:
+        """Return the bitmask of possible values."""
+        return self._mask
+
+    def set_candidates(self, mask) -> None:
+        """Replace the bitmask of possible values (e.g. when restoring a snapshot)."""
+        self._mask = mask
+
+    def candidate_count(self) -> int:
+        return self._popcount[self._mask]
+
+    def lowest_possible(self) -> int:
+        """Return the smallest possible value (0 if there is none)."""
+        return self._lowest[self._mask]
+
+    def is_possible(self, value) -> bool:
+        return bool(self._mask >> (value - 1) & 1)
+
+    def add_possible(self, value) -> None:
+        self._mask |= 1 << (value - 1)
 
-    def possible_values(self) -> set:
-        """Return the set of possible values for the cell."""
-        return self._possible_values
+    def remove_possible(self, value) -> None:
+        self._mask &= ~(1 << (value - 1))
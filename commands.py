@@ -15,14 +15,33 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # -----------------------------------------------------------------------------
 
+import re
+from types import MappingProxyType
+
 from display import Display
+from grid import Grid
 
 
 class Commands:
     """
     Establish puzzle commands
+
+    Values are entered with the keys 1-9 (shifted for a guess).  configure(size) sets up the
+    value keys for the puzzle size: values beyond 9 are the letters a, b, c... (upper case for
+    a guess), and command keys taken by those letters are dropped - every such command keeps
+    a non-letter key.
+
+    The commands of each mode are compiled once (at import and by configure) into a read-only
+    CMDS and a KEYMAP from key to command name ("up_", "help_"...; value keys map to themselves),
+    so use(mode) is a swap and decoding a key is one lookup.
+
+    Help texts are plain; tags such as "[hidden]" are styled by short_help()/long_help() with
+    the terminal of the display backend in use when the help is shown.
     """
 
+    INIT = "init"
+    PLAY = "play"
+
     DIGITS = "123456789"
     SHIFTED_DIGITS = "!@#$%^&*("
     unshifted_value = str.maketrans(SHIFTED_DIGITS, DIGITS)
@@ -73,7 +92,7 @@ class Commands:
         },
         "play": {
             "keys": ["KEY_ESCAPE"],
-            "short": "ESC " + Display.term.yellow("[initializing]"),
+            "short": "ESC [initializing]",
             "long": "Hit ESC to exit initialization mode and start playing the puzzle",
         },
     }
@@ -90,41 +109,91 @@ class Commands:
             "long": 'Use "r" to rewind to the most recent guess (to choose a new guess)',
         },
         "auto": {
-            "keys": "aA",
-            "short": "a",
-            "long": 'Use "a" to auto-play up to point where a guess must be made - if any',
+            "keys": "aA=",
+            "short": "a/=",
+            "long": 'Use "a" or "=" to auto-play up to point where a guess must be made - if any',
         },
         "next": {
-            "keys": "nN",
-            "short": "n",
-            "long": 'Use "n" to auto-play the next "must be" cell value',
+            "keys": "nN+",
+            "short": "n/+",
+            "long": 'Use "n" or "+" to auto-play the next "must be" cell value',
         },
         "init": {
             "keys": ["KEY_ESCAPE"],
             "short": None,
-            "long": Display.term.yellow("[hidden]") + " Hit ESC to re-enter initialization mode",
+            "long": "[hidden] Hit ESC to re-enter initialization mode",
         },
         "del": {
             "keys": ["KEY_DELETE"],
             "short": None,
-            "long": Display.term.yellow("[hidden]") + " DEL key is available only in initialization mode",
+            "long": "[hidden] DEL key is available only in initialization mode",
         },
     }
 
-    # Note: this is the starting value of CMDS; the puzzle can change it as desired
-    CMDS = dict(list(COMMON_CMDS.items()) + list(INIT_COMMANDS.items()))
+    # Compiled commands of the current mode (see use()): read-only views, set up after the class
+    CMDS = None
+    KEYMAP = None
+    VALUES = None  # Value key -> (value, is guess)
+
+    TAG = re.compile(r"\[[a-z]+\]")  # "[hidden]", not a value range such as "[1-9]"
+
+    _compiled = {}  # Mode -> (CMDS, KEYMAP)
+    _keys = {}  # Keys of every command before configure() dropped the ones taken by values
+
+    def configure(size) -> None:
+        """Set up the value keys for puzzles of `size` values and reset CMDS to the initializing commands"""
+        digits, letters = Grid.DIGITS[: min(size, 9)], Grid.DIGITS[9:size]
+        Commands.DIGITS = digits + letters.lower()
+        Commands.SHIFTED_DIGITS = "!@#$%^&*("[: len(digits)] + letters
+        Commands.unshifted_value = str.maketrans(Commands.SHIFTED_DIGITS, Commands.DIGITS)
+        value_range = f"1-{digits[-1]}" + (f",a-{letters[-1].lower()}" if letters else "")
+        Commands.COMMON_CMDS["#"].update(
+            keys=Commands.DIGITS + Commands.SHIFTED_DIGITS,
+            short=f"{value_range}/shift=guess",
+            long=f"Enter a single value [{value_range}]; when SHIFTED, it is a rewindable guess",
+        )
+        for group, cmds in (
+            ("common", Commands.COMMON_CMDS),
+            ("init", Commands.INIT_COMMANDS),
+            ("play", Commands.PLAY_COMMANDS),
+        ):
+            for name, cmd in cmds.items():
+                name == "#" or Commands.__free_keys(group, name, cmd)
+        Commands.compile()
+        Commands.use(Commands.INIT)
+
+    def compile() -> None:
+        """Freeze the commands and the key -> command name map of every mode"""
+        for mode, mode_cmds in ((Commands.INIT, Commands.INIT_COMMANDS), (Commands.PLAY, Commands.PLAY_COMMANDS)):
+            cmds = dict(list(Commands.COMMON_CMDS.items()) + list(mode_cmds.items()))
+            keymap = {}
+            for name, cmd in cmds.items():
+                for key in cmd["keys"]:
+                    keymap.setdefault(key, key if name == "#" else name + "_")  # The first command with the key wins
+            Commands._compiled[mode] = (MappingProxyType(cmds), MappingProxyType(keymap))
+        values = {key: (index + 1, False) for index, key in enumerate(Commands.DIGITS)}
+        values.update({key: (index + 1, True) for index, key in enumerate(Commands.SHIFTED_DIGITS)})
+        Commands.VALUES = MappingProxyType(values)
+
+    def use(mode) -> None:
+        """Switch to the commands of a mode (INIT or PLAY)"""
+        Commands.CMDS, Commands.KEYMAP = Commands._compiled[mode]
+
+    def command(key) -> str:
+        """The command name of a key (KEY_UP etc. for sequences) in the current mode; None if there is none"""
+        return Commands.KEYMAP.get(key)
 
     def is_value(cmd):
-        return cmd in Commands.DIGITS + Commands.SHIFTED_DIGITS
+        return cmd in Commands.VALUES
 
     def val_with_guess(cmd):
-        return int(str(cmd).translate(Commands.unshifted_value)), cmd in Commands.SHIFTED_DIGITS
+        return Commands.VALUES[cmd]
 
     def short_help():
         """Short help - a one-liner"""
         return ", ".join(
             [
-                f'{k.upper()}={Display.term.red(Commands.CMDS[k]["short"])}'
+                f'{k.upper()}={Display.term.red(Commands.__styled(Commands.CMDS[k]["short"]))}'
                 for k in Commands.CMDS.keys()
                 if Commands.CMDS[k]["short"]
             ]
@@ -133,5 +202,25 @@ class Commands:
     def long_help():
         """Long help - a one-pager"""
         return "\n".join(
-            [f'{k.upper()} - {Commands.CMDS[k]["long"]}' for k in Commands.CMDS.keys() if Commands.CMDS[k]["long"]]
+            [
+                f'{k.upper()} - {Commands.__styled(Commands.CMDS[k]["long"])}'
+                for k in Commands.CMDS.keys()
+                if Commands.CMDS[k]["long"]
+            ]
         )
+
+    # Private functions
+
+    def __styled(text) -> str:
+        return Commands.TAG.sub(lambda tag: Display.term.yellow(tag.group()), text)
+
+    def __free_keys(group, name, cmd) -> None:
+        """Drop the keys (and their short help) that are used for values"""
+        keys, short = Commands._keys.setdefault((group, name), (cmd["keys"], cmd["short"]))
+        taken = set(Commands.DIGITS + Commands.SHIFTED_DIGITS)
+        cmd["keys"] = [key for key in keys if key not in taken]
+        cmd["short"] = short[2:] if short and short[0] in taken and short[1:2] == "/" else short
+
+
+Commands.compile()
+Commands.use(Commands.INIT)
@@ -15,6 +15,12 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # -----------------------------------------------------------------------------
 
+import sys
+
+sys.path.insert(0, ".")
+
+from display import echo
+
 
 class Copyright:
     """
@@ -39,4 +45,4 @@ class Copyright:
     """
 
     def splash():
-        print(Copyright.COPYRIGHT)
+        echo(Copyright.COPYRIGHT + "\n")
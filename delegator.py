@@ -20,6 +20,12 @@ class Delegator:
     """
     A generic delegator class that delegates specific method calls to one or more target objects.
 
+    The delegated methods are bound once, when the delegator is initialized, and kept as attributes
+    of the instance - calling one is a plain attribute lookup, not a search of the targets.  A target
+    must therefore not be replaced afterwards (change its state instead), and a method missing on
+    its target raises AttributeError when the delegator is initialized rather than when it is called.
+    delegator_bench.py compares the cost of a call with the former per-call lookup.
+
     Attributes:
         _delegate_targets: A dictionary where keys are target objects and values are lists of method names
                            to be delegated to each target.
@@ -27,20 +33,13 @@ class Delegator:
 
     def __init__(self, delegate_targets):
         """
-        Initialize the Delegator with multiple delegate targets.
+        Initialize the Delegator with multiple delegate targets and bind their delegated methods.
 
         Args:
             delegate_targets (dict): A dictionary where keys are target objects and values are lists of
                                      method names to be delegated to each target.
         """
         self._delegate_targets = delegate_targets
-
-    def __getattr__(self, name):
-        """
-        Delegate attribute access to the appropriate target object if the attribute
-        is in the list of methods to be delegated for that target.
-        """
-        for target, methods in self._delegate_targets.items():
-            if name in methods:
-                return getattr(target, name)
-        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        for target, methods in delegate_targets.items():
+            for name in methods:
+                setattr(self, name, getattr(target, name))
@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import argparse
+import sys
+import timeit
+
+sys.path.insert(0, ".")
+
+from display import Display
+from display_backend import NullBackend
+from puzzle_3x3 import Puzzle3x3
+
+
+class DelegatorBench:
+    """
+    Microbenchmark of the per-call cost of the methods a Cell delegates to its CellSolver.
+
+    Each call is timed on a real cell twice: bound at init (Delegator, as Cell uses it) and
+    through a __getattr__ lookup of the targets on every call (LookupDelegator, how Delegator
+    used to work), so the two are compared on the same machine and Python.
+
+    Usage: python delegator_bench.py [--number N] [--repeat R]
+    """
+
+    CALLS = {
+        "candidates()": "cell.candidates()",
+        "possible_values()": "cell.possible_values()",
+        "is_possible(5)": "cell.is_possible(5)",
+        "remove/add_possible(5)": "cell.remove_possible(5); cell.add_possible(5)",
+    }
+
+    class LookupDelegator:
+        """The delegated methods looked up in the targets on every call"""
+
+        def __init__(self, delegate_targets):
+            self._delegate_targets = delegate_targets
+
+        def __getattr__(self, name):
+            for target, methods in self._delegate_targets.items():
+                if name in methods:
+                    return getattr(target, name)
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def main(argv=None) -> None:
+        args = DelegatorBench.__parse_args(argv)
+        print(f"{'call':>24}  {'lookup':>9}  {'bound':>9}")
+        for name, (lookup, bound) in DelegatorBench.run(args.number, args.repeat).items():
+            print(f"{name:>24}  {lookup * 1e9:7.0f}ns  {bound * 1e9:7.0f}ns")
+
+    def run(number=200000, repeat=5) -> dict:
+        """Call -> (seconds per call through a lookup, seconds per call bound at init); the best of `repeat` runs"""
+        previous = Display.backend
+        Display.use(NullBackend())
+        try:
+            cell = Puzzle3x3().cell(4, 4)
+        finally:
+            Display.use(previous)
+        lookup = DelegatorBench.LookupDelegator(cell._delegate_targets)
+        results = {}
+        for name, statement in DelegatorBench.CALLS.items():
+            times = [
+                min(timeit.repeat(statement, globals={"cell": target}, number=number, repeat=repeat)) / number
+                for target in (lookup, cell)
+            ]
+            results[name] = tuple(times)
+        return results
+
+    # Private functions
+
+    def __parse_args(argv) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(description="Time the methods a Cell delegates to its CellSolver")
+        parser.add_argument("--number", type=int, default=200000, help="calls per timing (default: 200000)")
+        parser.add_argument("--repeat", type=int, default=5, help="timings per call, the best is kept (default: 5)")
+        return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    DelegatorBench.main()
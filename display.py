@@ -15,12 +15,17 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # -----------------------------------------------------------------------------
 
-import functools
+import os
 
-from blessed import Terminal
 from display_attrs import DisplayAttrs as Attrs
+from display_backend import DisplayBackend
+from frame_buffer import FrameBuffer
+from grid import Grid
 
-echo = functools.partial(print, end="", flush=True)
+
+def echo(text) -> None:
+    """Send text to the display backend (one write)"""
+    Display.backend.write(text)
 
 
 class Border:
@@ -31,6 +36,7 @@ class Border:
 
     def __init__(self, borders=set()):
         self.__borders = borders
+        self.key = frozenset(borders)  # Hashable: the same for the same borders
 
     def is_top(self):
         return self.TOP in self.__borders
@@ -52,9 +58,17 @@ class Display:
     It establishes the screen size and is able to draw the basic elements
     of the Sudoku puzzle, including managing the keyboard input.
 
-    - geometry(geom) - set horizontal and vertical cell count
+    Cell frames and attribute escape sequences are rendered once per border kind and attribute
+    signature (see DisplayAttrs.signature) and kept, so drawing a cell is mostly copying cached
+    strings.  The cells are drawn into a FrameBuffer rather than straight to the terminal; the changes are
+    sent in one write by flush(), which every function that moves the cursor or waits for the
+    user (e.g. move_to_cell, warn) calls first.
+
+    - use(backend) - send the output to another DisplayBackend (terminal, null or memory)
+    - geometry(geom) - set horizontal and vertical cell count, and whether cells are compact
     - geom['h_cells'] = return number of horizontal cells
     - geom['v_cells'] = return number of vertical cells
+    - geom['compact'] = True for small cells without possible values (puzzles with more than 9 values)
 
     - clear_screen() - clears the screen and resets cursor to top-left
     - validate_screen_size() - ensure screen is large enough to manage the puzzle
@@ -63,18 +77,41 @@ class Display:
     - draw_cell_value(row, col, value) - draw the value of the cell in the middle of the cell
     - draw_cell_possible_values(row, col, values) - draw all the possible cell values at the bottom of the cell
 
+    - flush() - send the cells drawn since the last flush (only what changed on the screen)
+    - inkey(timeout) - read a key for the game, passing its name (key_name()) to `recorder` if set
     - move_to_status_line() - move the cursor to the status line: one line below the puzzle
     """
 
-    # Initialize terminal and set basic configuration
-    term = Terminal()
-    geom = {"h_cells": None, "v_cells": None}
+    # Initialize the display backend (terminal unless SUDOKU_DISPLAY names another) and set basic configuration
+    backend = DisplayBackend.named(os.environ.get(DisplayBackend.ENVIRONMENT, DisplayBackend.NAME))
+    term = backend.term
+    geom = {"h_cells": None, "v_cells": None, "compact": False}
+    frame = FrameBuffer()
+    recorder = None  # Called with the name of every key read by inkey() (see KeyScript.Recorder)
+    _rendered = {}  # (kind, border key, attribute signature or values) -> rendered string(s)
+
+    def use(backend) -> None:
+        Display.backend = backend
+        Display.term = backend.term
+        Display._rendered.clear()  # Escape sequences differ between backends
+        Display.frame.clear()
 
     def geometry(geometry):
         Display.geom["h_cells"] = geometry["h_cells"]
         Display.geom["v_cells"] = geometry["v_cells"]
+        Display.geom["compact"] = geometry.get("compact", False)
+        Display.CELL_HORIZONTAL_SIZE, Display.CELL_HEIGHT, Display.CELL_VALUES_ROW = (
+            Display.COMPACT_CELL if Display.geom["compact"] else Display.REGULAR_CELL
+        )
+        Display.CELL_WIDTH = Display.CELL_HORIZONTAL_SIZE + 1
+        Display._rendered.clear()
+        Display.frame = FrameBuffer(
+            Display.geom["h_cells"] * Display.CELL_WIDTH + 1, Display.geom["v_cells"] * Display.CELL_HEIGHT + 1
+        )
 
-    # Cell dimensions (internally fixed sizes to work on terminals)
+    # Cell dimensions (internally fixed sizes to work on terminals): horizontal size, height, possible values row
+    REGULAR_CELL = (5, 3, 2)
+    COMPACT_CELL = (3, 2, None)
     CELL_HORIZONTAL_SIZE = 5
     CELL_WIDTH = CELL_HORIZONTAL_SIZE + 1
     CELL_HEIGHT = 3
@@ -91,18 +128,23 @@ class Display:
         return Display.CELL_WIDTH * cell_col
 
     def clear_screen():
-        echo(Display.term.home())
-        echo(Display.term.clear())
+        Display.frame.clear()
+        echo(Display.term.home() + Display.term.clear())
+
+    def flush():
+        frame = Display.frame.frame(Display.term.move_xy, Display.term.normal)
+        frame and echo(frame)
 
     def validate_screen_size():
+        Display.flush()
         is_size_ok = True
         min_width = Display.geom["h_cells"] * Display.CELL_WIDTH
         min_height = Display.geom["v_cells"] * Display.CELL_HEIGHT + 2
         while Display.term.is_a_tty and (Display.term.width < min_width or Display.term.height < min_height):
             is_size_ok = False
             Display.clear_screen()
-            print(f"The terminal must have at least {min_height} lines and {min_width} columns")
-            print(f"It currently has {Display.term.height} lines and {Display.term.width} columns")
+            echo(f"The terminal must have at least {min_height} lines and {min_width} columns\n")
+            echo(f"It currently has {Display.term.height} lines and {Display.term.width} columns\n")
             echo("Please resize it and hit <ENTER> when ready or <CTRL-C> to quit: ")
             try:
                 Display.term.inkey()
@@ -113,56 +155,91 @@ class Display:
 
     def draw_cell(row=0, col=0, border=Border(), attrs=dict()):
         x, y = Display.x(col), Display.y(row)
-        echo(Display.term.move_xy(x, y))
-        Display.__draw_top_line(border, attrs)
+        signature = Attrs.signature(attrs)
+        top, (lvline, inside, inside_attrs, rvline), bottom = Display.__cell_frame(border, attrs, signature)
+        Display.frame.put(x, y, top)
         for line_no in range(1, Display.CELL_HEIGHT):
-            echo(Display.term.move_xy(x, y + line_no))
-            Display.__draw_inner_line(border, attrs)
-        echo(Display.term.move_xy(x, y + Display.CELL_HEIGHT))
-        Display.__draw_bottom_line(border, attrs)
+            Display.frame.put(x, y + line_no, lvline)
+            Display.frame.put(x + 1, y + line_no, inside, inside_attrs)
+            Display.frame.put(x + Display.CELL_WIDTH, y + line_no, rvline)
+        Display.frame.put(x, y + Display.CELL_HEIGHT, bottom)
 
     def draw_cell_value(row=0, col=0, value=" ", attrs=dict()):
-        """Draw the value in the middle of the cell using the rendered attributes"""
-        Display.move_to_cell(row, col)
-        rendered_attrs = Display.__rendered_attrs(attrs)
-        echo(rendered_attrs + str(value) + Display.term.normal)
+        """Draw the value (1-9, then A, B, C...) in the middle of the cell using the rendered attributes"""
+        x, y = Display.__cell_middle(row, col)
+        Display.frame.put(x, y, Display.__digit(value), Display.__rendered_attrs(Attrs.signature(attrs), attrs))
 
     def move_to_cell(row=0, col=0):
         """Move to the middle of the cell"""
-        x = Display.x(col) + Display.CELL_WIDTH // 2
-        y = Display.y(row) + Display.CELL_VALUE_ROW
-        echo(Display.term.move_xy(x, y))
+        Display.flush()
+        echo(Display.term.move_xy(*Display.__cell_middle(row, col)))
 
     def draw_cell_possible_values(row=0, col=0, values=[], attrs=dict()):
-        """Draw the possible values at the bottom of the cell"""
-        values = values if len(values) <= Display.CELL_HORIZONTAL_SIZE else "....."
-        x = Display.x(col) + 1
-        y = Display.y(row) + Display.CELL_VALUES_ROW
-        echo(Display.term.move_xy(x, y))
-        rendered_attrs = Display.__rendered_bg_attrs(attrs)
-        echo(rendered_attrs + " " * (Display.CELL_HORIZONTAL_SIZE - len(values)) + Display.term.normal)
-        echo(rendered_attrs + "".join(str(v).translate(Display.small_nums) for v in values) + Display.term.normal)
+        """Draw the possible values at the bottom of the cell (compact cells have no room for them)"""
+        if Display.CELL_VALUES_ROW is None:
+            return
+        key = ("values", None, tuple(values))
+        text = Display._rendered.get(key)
+        if text is None:
+            shown = values if len(values) <= Display.CELL_HORIZONTAL_SIZE else "....."
+            text = "".join(Display.__digit(v).translate(Display.small_nums) for v in shown)
+            text = Display._rendered[key] = " " * (Display.CELL_HORIZONTAL_SIZE - len(shown)) + text
+        Display.frame.put(
+            Display.x(col) + 1,
+            Display.y(row) + Display.CELL_VALUES_ROW,
+            text,
+            Display.__rendered_bg_attrs(Attrs.signature(attrs), attrs),
+        )
 
     def move_to_status_line():
+        Display.flush()
         echo(Display.term.move_xy(*Display.status_line_location()))
 
     def status_line_location():
         return 0, (Display.geom["v_cells"] or 0) * Display.CELL_HEIGHT + 1
 
     def warn(msg, wait=False):
+        Display.flush()
         with Display.term.location(*Display.status_line_location()):
             echo(Display.term.clear_eol + Display.term.yellow(msg))
             wait and Display.hit_any_key_to_continue()
 
     def hit_any_key_to_continue():
+        Display.flush()
         echo("Hit any key to continue: ")
         try:
-            with Display.term.cbreak():
-                Display.term.inkey()
+            Display.inkey()
         except:
             pass
 
-    def __draw_top_line(border, attrs):
+    def inkey(timeout=None):
+        """
+        Read a key (in cbreak mode) that the game acts on - every such key goes through here so that
+        a recorded session replays in step.  The keys of the splash screen and of the resize prompt
+        are read straight from the terminal: a headless replay shows neither.
+        """
+        with Display.term.cbreak():
+            keystroke = Display.term.inkey(timeout=timeout)
+        Display.recorder and keystroke and Display.recorder(Display.key_name(keystroke))
+        return keystroke
+
+    def key_name(keystroke) -> str:
+        """The character of a key, or its name (KEY_UP, KEY_ESCAPE...) for sequences"""
+        return (keystroke.is_sequence and keystroke.name) or str(keystroke)
+
+    def __cell_frame(border, attrs, signature) -> tuple:
+        """The top line, the parts of an inner line (borders, inside, its attributes) and the bottom line of a cell"""
+        key = ("frame", border.key, signature)
+        frame = Display._rendered.get(key)
+        if frame is None:
+            frame = Display._rendered[key] = (
+                Display.__top_line(border, attrs),
+                Display.__inner_line(border, attrs, signature),
+                Display.__bottom_line(border, attrs),
+            )
+        return frame
+
+    def __top_line(border, attrs) -> str:
         ulcorner = (
             Attrs.outer_border(Display.fullblock, attrs)
             if border.is_top() or border.is_left()
@@ -178,9 +255,9 @@ class Display:
             if border.is_top() or border.is_right()
             else Attrs.inner_border(Display.bigplus, attrs)
         )
-        echo(ulcorner + hline * Display.CELL_HORIZONTAL_SIZE + urcorner)
+        return ulcorner + hline * Display.CELL_HORIZONTAL_SIZE + urcorner
 
-    def __draw_inner_line(border, attrs):
+    def __inner_line(border, attrs, signature) -> tuple:
         lvline = (
             Attrs.outer_border(Display.fullblock, attrs)
             if border.is_left()
@@ -191,10 +268,9 @@ class Display:
             if border.is_right()
             else Attrs.inner_border(Display.vline, attrs)
         )
-        rendered_str = Display.__rendered_bg_attrs(attrs) + " " * Display.CELL_HORIZONTAL_SIZE + Display.term.normal
-        echo(lvline + rendered_str + rvline)
+        return lvline, " " * Display.CELL_HORIZONTAL_SIZE, Display.__rendered_bg_attrs(signature, attrs), rvline
 
-    def __draw_bottom_line(border, attrs):
+    def __bottom_line(border, attrs) -> str:
         llcorner = (
             Attrs.outer_border(Display.fullblock, attrs)
             if border.is_bottom() or border.is_left()
@@ -210,13 +286,27 @@ class Display:
             if border.is_bottom() or border.is_right()
             else Attrs.inner_border(Display.bigplus, attrs)
         )
-        echo(llcorner + hline * Display.CELL_HORIZONTAL_SIZE + lrcorner)
+        return llcorner + hline * Display.CELL_HORIZONTAL_SIZE + lrcorner
+
+    def __cell_middle(row, col) -> tuple:
+        return Display.x(col) + Display.CELL_WIDTH // 2, Display.y(row) + Display.CELL_VALUE_ROW
+
+    def __digit(value) -> str:
+        return Grid.DIGITS[value - 1] if isinstance(value, int) and value > 0 else str(value)
+
+    def __rendered_attrs(signature, attrs) -> str:
+        return Display.__rendered_sequence("fg", signature, attrs, Attrs.render)
 
-    def __rendered_attrs(attrs) -> str:
-        return getattr(Display.term, Attrs.render(attrs))
+    def __rendered_bg_attrs(signature, attrs) -> str:
+        return Display.__rendered_sequence("bg", signature, attrs, Attrs.render_bg)
 
-    def __rendered_bg_attrs(attrs) -> str:
-        return getattr(Display.term, Attrs.render_bg(attrs))
+    def __rendered_sequence(kind, signature, attrs, render) -> str:
+        """The terminal escape sequence of the attributes (e.g. term.green_on_gray50), resolved once per signature"""
+        key = (kind, None, signature)
+        sequence = Display._rendered.get(key)
+        if sequence is None:
+            sequence = Display._rendered[key] = getattr(Display.term, render(attrs))
+        return sequence
 
     # These character symbols are re-used from https://github.com/thisisparker/cursewords/blob/master/cursewords/characters.py
     vline = "│"
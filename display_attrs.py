@@ -29,6 +29,7 @@ class DisplayAttrs:
     - Additional (optional)
         - CONFLICTING - FG=BoldRed, BG=Yellow
         - CONFLICTED - FG=[primary], BG=Yellow
+    - Background shading: Level(level) (or dict(level=level)) - BG=gray[level]
     """
 
     INITIAL = "initial"
@@ -39,6 +40,12 @@ class DisplayAttrs:
     DEFAULT_COLOR = "darkorange3"
     MAX_GRAY_LEVEL = 100  # There are no gray levels greater than 100
 
+    @dataclass(frozen=True)
+    class Level:
+        """Background gray level that is hashable, so it can be kept in a cell's set of attributes"""
+
+        level: int
+
     @dataclass
     class FgBgAttr:
         fg: tuple = None
@@ -56,6 +63,15 @@ class DisplayAttrs:
         CONFLICTED: FgBgAttr(None, ("yellow")),
     }
 
+    def signature(_attrs) -> frozenset:
+        """A hashable equivalent of the attributes (level dicts become Levels), e.g. to cache what they render to"""
+        try:
+            return frozenset(_attrs)
+        except TypeError:
+            return frozenset(
+                DisplayAttrs.Level(attr.get("level")) if isinstance(attr, dict) else attr for attr in _attrs
+            )
+
     def outer_border(_str, _attrs):
         """Render outer border attributes - currently no rendering"""
         return _str
@@ -78,12 +94,17 @@ class DisplayAttrs:
         primary = DisplayAttrs.__get_attrs(_attrs, DisplayAttrs.ATTRS_PRIMARY)
         optional = DisplayAttrs.__get_attrs(_attrs, DisplayAttrs.ATTRS_OPTIONAL)
         fg = "".join(optional.fg or primary.fg or DisplayAttrs.DEFAULT_COLOR)
-        level = next(iter([attr["level"] for attr in _attrs if isinstance(attr, dict) and "level" in attr]), None)
+        level = next(iter([DisplayAttrs.__level(attr) for attr in _attrs if DisplayAttrs.__level(attr)]), None)
         level = min(level, DisplayAttrs.MAX_GRAY_LEVEL) if level else None
         bg_level = f"gray{level}" if level else ()
         bg = "".join(optional.bg or primary.bg or bg_level)
         return fg, bg
 
+    def __level(attr) -> int:
+        if isinstance(attr, DisplayAttrs.Level):
+            return attr.level
+        return attr["level"] if isinstance(attr, dict) and "level" in attr else None
+
     def __get_attrs(_attrs, _attr_list) -> FgBgAttr:
         key = next(iter([key for key in _attr_list.keys() if key in _attrs]), None)
         return _attr_list[key] if key else DisplayAttrs.FgBgAttr()
@@ -0,0 +1,234 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import contextlib
+import re
+from collections import deque
+
+
+class Keystroke(str):
+    """A key read from a headless backend - like blessed's: KEY_* names are sequences"""
+
+    def __new__(cls, key):
+        keystroke = super().__new__(cls, key)
+        keystroke.is_sequence = key.startswith("KEY_")
+        keystroke.name = key if keystroke.is_sequence else None
+        return keystroke
+
+
+class DisplayBackend:
+    """
+    Where Display sends its output and gets its keys: the blessed terminal.
+
+    A backend has a `term` with the part of the blessed Terminal interface the program uses
+    (escape sequence attributes, move_xy, location, cbreak, inkey, width/height, is_a_tty) and
+    write(text) for the output.  Use Display.use(backend) to switch, or pick one at startup
+    with the SUDOKU_DISPLAY environment variable (sudoku.py also has --display):
+    - terminal - the blessed terminal (DisplayBackend)
+    - null - discards all output and has no escape sequences (NullBackend)
+    - memory - keeps a screen of characters and attributes to inspect (MemoryBackend)
+
+    Headless backends read keys queued with feed(); when there are none, inkey() times out (or
+    raises EOFError when it was asked to wait forever), which Input reports as "quit".
+    """
+
+    NAME = "terminal"
+    ENVIRONMENT = "SUDOKU_DISPLAY"
+    BACKENDS = {}
+
+    def __init__(self):
+        from blessed import Terminal  # blessed is only required for the terminal
+
+        self.term = Terminal()
+
+    def register(backend_class) -> type:
+        DisplayBackend.BACKENDS[backend_class.NAME] = backend_class
+        return backend_class
+
+    def named(name) -> "DisplayBackend":
+        if name not in DisplayBackend.BACKENDS:
+            raise ValueError(f'Unknown display "{name}" - use one of {", ".join(DisplayBackend.BACKENDS)}')
+        return DisplayBackend.BACKENDS[name]()
+
+    def write(self, text) -> None:
+        print(text, end="", flush=True)
+
+
+DisplayBackend.register(DisplayBackend)
+
+
+class NullTerminal:
+    """The headless stand-in for blessed's Terminal: every escape sequence is empty"""
+
+    is_a_tty = False
+    does_styling = False
+
+    def __init__(self, width, height, write):
+        self.width = width
+        self.height = height
+        self.keys = deque()
+        self._write = write
+
+    def __getattr__(self, name) -> "NullTerminal.Sequence":
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._sequence(name)
+
+    def move_xy(self, x, y) -> str:
+        return ""
+
+    @contextlib.contextmanager
+    def location(self, x=None, y=None):
+        self._write(self._sequence("save") + self.move_xy(x or 0, y or 0))
+        yield
+        self._write(self._sequence("restore"))
+
+    @contextlib.contextmanager
+    def cbreak(self):
+        yield
+
+    def inkey(self, timeout=None) -> Keystroke:
+        if self.keys:
+            return self.keys.popleft()
+        if timeout is None:
+            raise EOFError("no more keys")
+        return Keystroke("")
+
+    class Sequence(str):
+        """An escape sequence that, like blessed's, can also wrap text: term.red("text")"""
+
+        def __call__(self, text="") -> str:
+            return f"{self}{text}{self.normal}" if self else text
+
+    def _sequence(self, name) -> "NullTerminal.Sequence":
+        return NullTerminal.Sequence("")
+
+
+@DisplayBackend.register
+class NullBackend(DisplayBackend):
+    """Discards the output - for solving and benchmarks without a terminal"""
+
+    NAME = "null"
+
+    def __init__(self, width=200, height=100):
+        self.term = self._terminal(width, height)
+
+    def feed(self, *keys) -> None:
+        """Queue keys for inkey(): characters, or KEY_* names such as KEY_ESCAPE"""
+        self.term.keys.extend(Keystroke(key) for key in keys)
+
+    def write(self, text) -> None:
+        pass
+
+    def _terminal(self, width, height) -> NullTerminal:
+        return NullTerminal(width, height, self.write)
+
+
+class MemoryTerminal(NullTerminal):
+    """A NullTerminal whose sequences are understood by MemoryBackend: ESC [ y;x H, ESC [ name m..."""
+
+    def move_xy(self, x, y) -> str:
+        return f"\x1b[{y};{x}H"
+
+    def _sequence(self, name) -> NullTerminal.Sequence:
+        sequence = NullTerminal.Sequence(MemoryBackend.SEQUENCES.get(name, f"\x1b[{name}m"))
+        sequence.normal = MemoryBackend.SEQUENCES["normal"]
+        return sequence
+
+
+@DisplayBackend.register
+class MemoryBackend(NullBackend):
+    """
+    Keeps the screen in memory so that tests can look at it.
+
+    - line(y) / lines() - the text of a line (trailing blanks removed) / of all lines
+    - attr(x, y) - the name of the attribute a character was written with (e.g. "green_on_gray10")
+    - writes - number of write() calls
+    """
+
+    NAME = "memory"
+    SEQUENCES = {
+        "normal": "\x1b[m",
+        "home": "\x1b[H",
+        "clear": "\x1b[2J",
+        "clear_eol": "\x1b[K",
+        "save": "\x1b7",
+        "restore": "\x1b8",
+    }
+    TOKENS = re.compile(r"(\x1b\[\d+;\d+H|\x1b\[[a-z0-9_]*m|\x1b\[H|\x1b\[2J|\x1b\[K|\x1b7|\x1b8|\n)")
+
+    def __init__(self, width=200, height=100):
+        super().__init__(width, height)
+        self.writes = 0
+        self._cursor = self._saved = (0, 0)
+        self._attr = "normal"
+        self.__clear()
+
+    def write(self, text) -> None:
+        self.writes += 1
+        for token in MemoryBackend.TOKENS.split(text):
+            token and self.__apply(token)
+
+    def line(self, y) -> str:
+        return "".join(self._chars[y]).rstrip()
+
+    def lines(self) -> list[str]:
+        return [self.line(y) for y in range(self.term.height)]
+
+    def attr(self, x, y) -> str:
+        return self._attrs[y][x]
+
+    def _terminal(self, width, height) -> NullTerminal:
+        return MemoryTerminal(width, height, self.write)
+
+    # Private functions
+
+    def __apply(self, token) -> None:
+        x, y = self._cursor
+        if token == self.SEQUENCES["home"]:
+            self._cursor = (0, 0)
+        elif token == self.SEQUENCES["clear"]:
+            self.__clear()
+        elif token == self.SEQUENCES["clear_eol"]:
+            self.__put(" " * max(0, self.term.width - x))
+            self._cursor = (x, y)
+        elif token == self.SEQUENCES["save"]:
+            self._saved = self._cursor
+        elif token == self.SEQUENCES["restore"]:
+            self._cursor = self._saved
+        elif token == "\n":
+            self._cursor = (0, y + 1)
+        elif token.startswith("\x1b[") and token.endswith("H"):
+            row, col = token[2:-1].split(";")
+            self._cursor = (int(col), int(row))
+        elif token.startswith("\x1b[") and token.endswith("m"):
+            self._attr = token[2:-1] or "normal"
+        else:
+            self.__put(token)
+
+    def __put(self, text) -> None:
+        x, y = self._cursor
+        if 0 <= y < self.term.height:
+            for offset, char in enumerate(text[: max(0, self.term.width - x)]):
+                self._chars[y][x + offset] = char
+                self._attrs[y][x + offset] = self._attr
+        self._cursor = (x + len(text), y)
+
+    def __clear(self) -> None:
+        self._chars = [[" "] * self.term.width for _row in range(self.term.height)]
+        self._attrs = [["normal"] * self.term.width for _row in range(self.term.height)]
@@ -0,0 +1,207 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+
+sys.path.insert(0, ".")
+
+from geometry import Geometry
+from grid import Grid
+
+
+class DlxSolver:
+    """
+    Exact-cover solver using Knuth's Dancing Links (Algorithm X).
+
+    The exact-cover matrix has one row per (cell, value) and four constraint columns per row:
+    the cell has a value, and the value appears once in the row, column and block.  The node
+    structure is built once per geometry and reused for every solve - the givens are covered
+    before the search and uncovered afterwards, which leaves the links exactly as they were.
+
+    - solve(grid) - return the first solution as a new Grid (None if there is none)
+    - count_solutions(grid, limit) - count solutions, stopping as soon as `limit` are found
+
+    Both raise ValueError when the grid does not fit the solver's geometry.
+
+    A solver instance is not re-entrant: use one instance per thread/process.
+    """
+
+    def __init__(self, geometry=None):
+        self.geometry = geometry or Geometry.of(3, 3)
+        self.__build()
+
+    def solve(self, grid: Grid) -> Grid:
+        solutions = self.__run(grid, limit=1, keep=True)
+        return Grid(self.geometry, solutions[0]) if solutions else None
+
+    def count_solutions(self, grid: Grid, limit=2) -> int:
+        return len(self.__run(grid, limit=limit, keep=False))
+
+    # Private functions
+
+    def __build(self) -> None:
+        size = self.geometry.size
+        cells = self.geometry.cell_count
+        columns = 4 * cells
+        # Node 0 is the root, nodes 1..columns are the column headers
+        self._left = [column - 1 for column in range(columns + 1)]
+        self._left[0] = columns
+        self._right = [column + 1 for column in range(columns + 1)]
+        self._right[columns] = 0
+        self._up = list(range(columns + 1))
+        self._down = list(range(columns + 1))
+        self._column = list(range(columns + 1))
+        self._row = [-1] * (columns + 1)
+        self._count = [0] * (columns + 1)
+        self._row_start = []
+        for cell, (row, col) in enumerate(self.geometry.row_col):
+            block = self.geometry.block_of(row, col)
+            for digit in range(size):
+                self.__add_row(
+                    cell * size + digit,
+                    (
+                        1 + cell,
+                        1 + cells + row * size + digit,
+                        1 + 2 * cells + col * size + digit,
+                        1 + 3 * cells + block * size + digit,
+                    ),
+                )
+
+    def __add_row(self, row, columns) -> None:
+        left, right, up, down = self._left, self._right, self._up, self._down
+        first = len(left)
+        self._row_start.append(first)
+        for offset, column in enumerate(columns):
+            node = first + offset
+            left.append(node - 1 if offset else first + len(columns) - 1)
+            right.append(node + 1 if offset < len(columns) - 1 else first)
+            up.append(up[column])
+            down.append(column)
+            down[up[column]] = node
+            up[column] = node
+            self._column.append(column)
+            self._row.append(row)
+            self._count[column] += 1
+
+    def __run(self, grid: Grid, limit, keep) -> list:
+        size = self.geometry.size
+        if len(grid.values) != self.geometry.cell_count or not all(0 <= value <= size for value in grid.values):
+            raise ValueError(f"Not a {size}x{size} grid")
+        self._solutions = []
+        self._limit = limit
+        self._keep = keep
+        self._givens = list(grid.values)
+        covered = self.__cover_givens(grid.values)
+        if covered is not None:
+            self._chosen = []
+            self.__search()
+        for column in reversed(covered or []):
+            self.__uncover(column)
+        return self._solutions
+
+    def __cover_givens(self, values) -> list:
+        """Cover the columns of every given; returns the covered columns (None if the givens conflict)"""
+        covered = []
+        size = self.geometry.size
+        for cell, value in enumerate(values):
+            if not value:
+                continue
+            node = self._row_start[cell * size + value - 1]
+            for _constraint in range(4):
+                column = self._column[node]
+                if self._right[self._left[column]] != column:  # Already covered by a conflicting given
+                    for column in reversed(covered):
+                        self.__uncover(column)
+                    return None
+                self.__cover(column)
+                covered.append(column)
+                node = self._right[node]
+        return covered
+
+    def __search(self) -> bool:
+        """Algorithm X; returns True when the solution limit has been reached"""
+        right, down, count = self._right, self._down, self._count
+        if right[0] == 0:
+            self.__record_solution()
+            return len(self._solutions) >= self._limit
+        column, best = 0, None
+        node = right[0]
+        while node:
+            if best is None or count[node] < best:
+                column, best = node, count[node]
+                if best <= 1:
+                    break
+            node = right[node]
+        if not best:
+            return False
+
+        self.__cover(column)
+        done = False
+        row_node = down[column]
+        while row_node != column and not done:
+            self._chosen.append(self._row[row_node])
+            node = right[row_node]
+            while node != row_node:
+                self.__cover(self._column[node])
+                node = right[node]
+            done = self.__search()
+            node = self._left[row_node]
+            while node != row_node:
+                self.__uncover(self._column[node])
+                node = self._left[node]
+            self._chosen.pop()
+            row_node = down[row_node]
+        self.__uncover(column)
+        return done
+
+    def __record_solution(self) -> None:
+        if not self._keep:
+            self._solutions.append(None)
+            return
+        size = self.geometry.size
+        values = list(self._givens)
+        for row in self._chosen:
+            values[row // size] = row % size + 1
+        self._solutions.append(values)
+
+    def __cover(self, column) -> None:
+        left, right, up, down, col, count = self._left, self._right, self._up, self._down, self._column, self._count
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        row_node = down[column]
+        while row_node != column:
+            node = right[row_node]
+            while node != row_node:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                count[col[node]] -= 1
+                node = right[node]
+            row_node = down[row_node]
+
+    def __uncover(self, column) -> None:
+        left, right, up, down, col, count = self._left, self._right, self._up, self._down, self._column, self._count
+        row_node = up[column]
+        while row_node != column:
+            node = left[row_node]
+            while node != row_node:
+                count[col[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row_node = up[row_node]
+        right[left[column]] = column
+        left[right[column]] = column
@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+class FrameBuffer:
+    """
+    The screen as a grid of characters and their attributes (escape sequences), double-buffered.
+
+    Drawing only changes the buffer.  frame() compares it with what was last shown and returns
+    the output for the changed runs of each line - a cursor move, then the characters with an
+    attribute sequence wherever the attribute changes - as one string, so that a frame is a
+    single write whose size depends on what changed rather than on what was drawn.
+
+    Runs separated by fewer than MERGE_GAP unchanged characters are sent as one run, since a
+    cursor move costs more than re-sending a few characters.
+
+    - put(x, y, text, attr) - draw text (clipped to the screen) with the attribute sequence attr
+    - frame(move, normal) - the output that brings the screen up to date ("" if nothing changed);
+      move(x, y) returns a cursor move sequence and normal resets the attributes
+    - clear() - the screen was cleared: nothing is shown or drawn
+    """
+
+    BLANK = " "
+    MERGE_GAP = 4
+
+    def __init__(self, width=0, height=0):
+        self.width = width
+        self.height = height
+        self.clear()
+
+    def put(self, x, y, text, attr="") -> None:
+        if not 0 <= y < self.height:
+            return
+        if x < 0 or x + len(text) > self.width:
+            text = text[max(0, -x) : max(0, self.width - x)]
+            x = max(0, x)
+        self._chars[y][x : x + len(text)] = text
+        self._attrs[y][x : x + len(text)] = [attr] * len(text)
+        self._dirty_rows.add(y)
+
+    def frame(self, move, normal) -> str:
+        out = []
+        for y in sorted(self._dirty_rows):
+            for start, end in self.__changed_runs(y):
+                out.append(move(start, y))
+                self.__append_run(out, y, start, end, normal)
+                self._shown_chars[y][start:end] = self._chars[y][start:end]
+                self._shown_attrs[y][start:end] = self._attrs[y][start:end]
+        self._dirty_rows.clear()
+        return "".join(out)
+
+    def clear(self) -> None:
+        self._chars = [[self.BLANK] * self.width for _row in range(self.height)]
+        self._attrs = [[""] * self.width for _row in range(self.height)]
+        self._shown_chars = [list(row) for row in self._chars]
+        self._shown_attrs = [list(row) for row in self._attrs]
+        self._dirty_rows = set()
+
+    # Private functions
+
+    def __changed_runs(self, y) -> list:
+        chars, attrs = self._chars[y], self._attrs[y]
+        shown_chars, shown_attrs = self._shown_chars[y], self._shown_attrs[y]
+        runs = []
+        for x in range(self.width):
+            if chars[x] != shown_chars[x] or attrs[x] != shown_attrs[x]:
+                if runs and x - runs[-1][1] < self.MERGE_GAP:
+                    runs[-1][1] = x + 1
+                else:
+                    runs.append([x, x + 1])
+        return runs
+
+    def __append_run(self, out, y, start, end, normal) -> None:
+        chars, attrs = self._chars[y], self._attrs[y]
+        current = ""
+        for x in range(start, end):
+            attrs[x] != current and out.append(normal + attrs[x])
+            current = attrs[x]
+            out.append(chars[x])
+        current and out.append(normal)
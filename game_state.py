@@ -0,0 +1,218 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import itertools
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import ClassVar
+
+sys.path.insert(0, ".")
+
+from cell import Cell
+from display_attrs import DisplayAttrs
+from geometry import Geometry
+from history import History
+
+
+@dataclass(frozen=True)
+class GameState:
+    """
+    A whole game - cells, history, shading, selected cell and mode - in a versioned binary format.
+
+    The format is a fixed header followed by one array per field, little-endian, each starting
+    at a multiple of its item size:
+        header  - magic, version, block rows/cols, flags, selected row/col, bg level, history sizes
+        candidates - uint32 per cell (candidate bitmask)
+        history - uint32 per kept history entry (History.packed()), oldest first
+        levels - uint16 per cell (background shading level, 0 for none)
+        values - uint8 per cell (0 for empty)
+        attrs - uint8 per cell: primary attribute code | conflict code << 2
+
+    load(path) maps the file and the arrays are memoryviews of the mapping - nothing is parsed
+    or copied until the state is restored into a puzzle.  Rewind points are not saved.
+
+    - of(geometry, cells, history, ...) - capture a game
+    - to_bytes() / save(path) - the binary form (saved atomically)
+    - from_buffer(buffer) / load(path) - read it back
+    - cell_attrs(index) - the set of attributes of a cell
+    """
+
+    class FormatError(ValueError):
+        pass
+
+    MAGIC = b"SDKG"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHBBBBBxH2xII")
+    CELL_BYTES = 4 + 2 + 1 + 1  # Candidates, level, value, attrs
+    INITIALIZING = 1  # Flag
+    PRIMARY = (None, DisplayAttrs.INITIAL, DisplayAttrs.GUESS)
+    CONFLICTS = (None,) + Cell.CONFLICTS
+    ATTR_CODES = frozenset(
+        primary | conflict << 2 for primary, conflict in itertools.product(range(len(PRIMARY)), range(len(CONFLICTS)))
+    )
+
+    block_rows: int
+    block_cols: int
+    initializing: bool
+    bg_level: int
+    selected_cell: tuple
+    candidates: array
+    history: array
+    history_dropped: int
+    levels: array
+    values: array
+    attrs: array
+
+    _shared_attrs: ClassVar[dict] = {}
+
+    def of(
+        geometry: Geometry, cells: list[Cell], history: History, initializing, bg_level, selected_cell
+    ) -> "GameState":
+        return GameState(
+            geometry.block_rows,
+            geometry.block_cols,
+            initializing,
+            bg_level,
+            selected_cell,
+            array("I", (cell.candidates() for cell in cells)),
+            history.packed(),
+            history.dropped,
+            array("H", (GameState.__level(cell.attr()) for cell in cells)),
+            array("B", (cell.value() or 0 for cell in cells)),
+            array("B", (GameState.__attr_code(cell) for cell in cells)),
+        )
+
+    def to_bytes(self) -> bytes:
+        header = GameState.HEADER.pack(
+            GameState.MAGIC,
+            GameState.VERSION,
+            self.block_rows,
+            self.block_cols,
+            GameState.INITIALIZING if self.initializing else 0,
+            *self.selected_cell,
+            self.bg_level,
+            self.history_dropped,
+            len(self.history),
+        )
+        sections = [header]
+        for section in (self.candidates, self.history, self.levels, self.values, self.attrs):
+            section = array(section.format if isinstance(section, memoryview) else section.typecode, section)
+            sys.byteorder == "little" or section.byteswap()
+            sections.append(section.tobytes())
+        return b"".join(sections)
+
+    def save(self, path) -> None:
+        """Write the game to path; an existing game there is only replaced once the new one is complete"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(temporary, path)
+
+    def from_buffer(buffer) -> "GameState":
+        view = memoryview(buffer)
+        if len(view) < GameState.HEADER.size:
+            raise GameState.FormatError("not a saved game: too short")
+        header = GameState.HEADER.unpack_from(view)
+        magic, version, block_rows, block_cols, flags, row, col, bg_level, dropped, kept = header
+        if magic != GameState.MAGIC:
+            raise GameState.FormatError("not a saved game")
+        if version != GameState.VERSION:
+            raise GameState.FormatError(f"saved game version {version} is not supported (expected {GameState.VERSION})")
+        if not Geometry.is_shape(block_rows, block_cols):
+            raise GameState.FormatError(f"saved game has no valid block shape ({block_rows}x{block_cols})")
+        cells = (block_rows * block_cols) ** 2
+        expected = GameState.HEADER.size + cells * GameState.CELL_BYTES + kept * array("I").itemsize
+        if len(view) != expected:
+            raise GameState.FormatError(f"saved game has {len(view)} bytes, expected {expected}")
+        offset = GameState.HEADER.size
+        arrays = []
+        for typecode, count in (("I", cells), ("I", kept), ("H", cells), ("B", cells), ("B", cells)):
+            section, offset = GameState.__section(view, offset, typecode, count)
+            arrays.append(section)
+        candidates, history, levels, values, attrs = arrays
+        GameState.__check_contents(block_rows * block_cols, (row, col), candidates, history, values, attrs)
+        initializing = bool(flags & GameState.INITIALIZING)
+        return GameState(
+            block_rows,
+            block_cols,
+            initializing,
+            bg_level,
+            (row, col),
+            candidates,
+            history,
+            dropped,
+            levels,
+            values,
+            attrs,
+        )
+
+    def load(path) -> "GameState":
+        """Map the saved game at path read-only: the mapping lives as long as the state's arrays"""
+        with open(path, "rb") as file:
+            try:
+                return GameState.from_buffer(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError as error:  # Including an empty file, which cannot be mapped
+                raise GameState.FormatError(f"{path}: {error}") from error
+
+    def cell_attrs(self, index) -> frozenset:
+        """The attributes of a cell, shared by every cell with the same ones"""
+        key = (self.attrs[index], self.levels[index])
+        attrs = GameState._shared_attrs.get(key)
+        if attrs is None:
+            code, level = key
+            primary, conflict = GameState.PRIMARY[code & 3], GameState.CONFLICTS[code >> 2]
+            attrs = frozenset(attr for attr in (primary, conflict, level and DisplayAttrs.Level(level)) if attr)
+            GameState._shared_attrs[key] = attrs
+        return attrs
+
+    # Private functions
+
+    def __section(view, offset, typecode, count) -> tuple:
+        """A typed view of `count` items at offset (a byte-swapped copy on big-endian hosts) and the offset after it"""
+        end = offset + count * array(typecode).itemsize
+        if end > len(view):
+            raise GameState.FormatError("saved game is truncated")
+        section = view[offset:end].cast(typecode)
+        if typecode != "B" and sys.byteorder != "little":
+            section = array(typecode, section)
+            section.byteswap()
+        return section, end
+
+    def __check_contents(size, selected_cell, candidates, history, values, attrs) -> None:
+        """Reject cells, history entries and a selected cell that do not fit the grid before anything is built"""
+        if max(values) > size or max(candidates) >= 1 << size:
+            raise GameState.FormatError(f"saved game has cell values or candidates over {size}")
+        if not GameState.ATTR_CODES.issuperset(attrs):
+            raise GameState.FormatError("saved game has invalid cell attributes")
+        limits = (size * size - 1, size, size, len(History.ATTRS) - 1, len(History.ATTRS) - 1)
+        fields = tuple(zip(History.FIELDS, limits))
+        if any(entry >> shift & mask > limit for entry in history for (shift, mask), limit in fields):
+            raise GameState.FormatError("saved game has invalid history entries")
+        if not all(0 <= index < size for index in selected_cell):
+            raise GameState.FormatError(f"saved game selects cell {selected_cell} outside the grid")
+
+    def __level(attrs) -> int:
+        return next((attr.level for attr in attrs if isinstance(attr, DisplayAttrs.Level)), 0)
+
+    def __attr_code(cell) -> int:
+        primary = next((code for code, attr in enumerate(GameState.PRIMARY) if attr in cell.attr()), 0)
+        return primary | GameState.CONFLICTS.index(cell.conflict()) << 2
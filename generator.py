@@ -0,0 +1,162 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from backtracking_solver import BacktrackingSolver
+from candidates import Candidates
+from geometry import Geometry
+from grid import Grid
+
+
+class Generator:
+    """
+    Generate puzzles with a unique solution.
+
+    A random full solution grid is built first (random values in a few random cells, then
+    solved).  Clues are then removed in random order - together with their symmetric partners
+    when a symmetry is chosen - and each removal is kept only if the puzzle still has a unique
+    solution.  Every clue is tried once, which leaves a minimal puzzle: no remaining clue (or
+    symmetric group of clues) can be removed.
+
+    Puzzle number i of a run only depends on the seed and i, so output is reproducible for any
+    number of worker processes.
+
+    Usage: python generator.py [-n COUNT] [--seed SEED] [--symmetry NAME] [--jobs N] [-o puzzles.txt]
+    """
+
+    NONE = "none"
+    ROTATIONAL = "rotational"
+    HORIZONTAL = "horizontal"
+    VERTICAL = "vertical"
+    DIAGONAL = "diagonal"
+    SYMMETRIES = (NONE, ROTATIONAL, HORIZONTAL, VERTICAL, DIAGONAL)
+
+    def __init__(self, geometry=None, symmetry=NONE):
+        self.geometry = geometry or Geometry.of(3, 3)
+        self.symmetry = symmetry
+        self._solver = BacktrackingSolver(self.geometry)
+        self._orbits = self.__orbits()
+        _popcount, _lowest, self._values = Candidates.tables(self.geometry.size)
+
+    def main(argv=None) -> None:
+        args = Generator.__parse_args(argv)
+        generator = Generator(symmetry=args.symmetry)
+        out = open(args.output, "w") if args.output else sys.stdout
+        started = time.perf_counter()
+        for puzzle in generator.generate_many(args.count, args.seed, args.jobs or os.cpu_count()):
+            out.write(puzzle + "\n")
+        elapsed = time.perf_counter() - started
+        out is sys.stdout or out.close()
+        args.quiet or print(
+            f"{args.count} puzzles in {elapsed:.3f}s ({args.count / elapsed:.1f} puzzles/s)", file=sys.stderr
+        )
+
+    def generate(self, rng: random.Random) -> Grid:
+        """Return a minimal puzzle with a unique solution"""
+        values = list(self.__random_solution(rng).values)
+        orbits = list(self._orbits)
+        rng.shuffle(orbits)
+        for orbit in orbits:
+            removed = [values[cell] for cell in orbit]
+            for cell in orbit:
+                values[cell] = 0
+            if self._solver.count_solutions(Grid(self.geometry, values)) != 1:
+                for cell, value in zip(orbit, removed):
+                    values[cell] = value
+        return Grid(self.geometry, values)
+
+    def generate_many(self, count, seed=None, jobs=1):
+        """Yield `count` puzzle strings; puzzle i is generated from (seed, i) so the output is reproducible"""
+        seed = random.randrange(2**32) if seed is None else seed
+        tasks = ((seed, index) for index in range(count))
+        if jobs == 1:
+            yield from (_generate(self, task) for task in tasks)
+            return
+        geometry = (self.geometry.block_rows, self.geometry.block_cols)
+        with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(geometry, self.symmetry)) as pool:
+            yield from pool.imap(_generate_in_worker, tasks, chunksize=4)
+
+    # Private functions
+
+    def __random_solution(self, rng) -> Grid:
+        size, cells = self.geometry.size, self.geometry.cell_count
+        while True:
+            grid = Grid(self.geometry)
+            for cell in rng.sample(range(cells), size):
+                if not grid.masks[cell]:
+                    break
+                grid.place(cell, rng.choice(self._values[grid.masks[cell]]))
+            solution = grid.is_consistent() and self._solver.solve(grid)
+            if solution:
+                return solution
+
+    def __orbits(self) -> list:
+        """Groups of cells that must be cleared together to keep the symmetry"""
+        size = self.geometry.size
+        mirror = {
+            Generator.NONE: lambda row, col: (row, col),
+            Generator.ROTATIONAL: lambda row, col: (size - 1 - row, size - 1 - col),
+            Generator.HORIZONTAL: lambda row, col: (row, size - 1 - col),
+            Generator.VERTICAL: lambda row, col: (size - 1 - row, col),
+            Generator.DIAGONAL: lambda row, col: (col, row),
+        }[self.symmetry]
+        orbits = {}
+        for cell, (row, col) in enumerate(self.geometry.row_col):
+            orbit = tuple(sorted({cell, self.geometry.cell_id(*mirror(row, col))}))
+            orbits[orbit] = None
+        return list(orbits)
+
+    def __parse_args(argv) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(description="Generate sudoku puzzles with a unique solution (one per line)")
+        parser.add_argument("-n", "--count", type=int, default=1, help="number of puzzles")
+        parser.add_argument("--seed", type=int, help="seed for reproducible output (default: random)")
+        parser.add_argument("--symmetry", choices=Generator.SYMMETRIES, default=Generator.NONE)
+        parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (0: one per core)")
+        parser.add_argument("-o", "--output", help="puzzle file (default: stdout)")
+        parser.add_argument("-q", "--quiet", action="store_true", help="do not report the generation rate")
+        return parser.parse_args(argv)
+
+
+# Process pool workers: each worker sets up its generator once
+
+_worker = None
+
+
+def _init_worker(geometry, symmetry) -> None:
+    global _worker
+    _worker = Generator(Geometry.of(*geometry), symmetry)
+
+
+def _generate(generator, task) -> str:
+    seed, index = task
+    return generator.generate(random.Random(f"{seed}:{index}")).to_string()
+
+
+def _generate_in_worker(task) -> str:
+    return _generate(_worker, task)
+
+
+if __name__ == "__main__":
+    Generator.main()
@@ -0,0 +1,116 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import argparse
+
+
+class Geometry:
+    """
+    Cell, house and peer index for a puzzle made of equally sized rectangular blocks.
+
+    The index is computed once per block shape and shared by every puzzle (and solver)
+    using that shape - use Geometry.of(block_rows, block_cols) rather than instantiating.
+
+    Cells are identified by a flat id: row * size + col.  Houses are numbered rows first,
+    then columns, then blocks:
+    - size - number of values (and of rows, columns and blocks)
+    - cell_count - number of cells (size * size)
+    - row_col[cell] - (row, col) of the cell
+    - houses[house] - tuple of the cell ids in the house
+    - cell_houses[cell] - (row house, column house, block house) of the cell
+    - peers[cell] - tuple of the ids of all other cells sharing a house with the cell
+
+    Segments are the cells shared by a block and a row or column (used for locked candidates):
+    - segments[segment] - tuple of the cell ids in the segment
+    - segment_blocks[segment] - the other segments of the same block and direction
+    - segment_lines[segment] - the other segments of the same row or column
+    """
+
+    MAX_SIZE = 25  # Values are 1-9 and A-P
+
+    _geometries = {}
+
+    def is_shape(block_rows, block_cols) -> bool:
+        """Return True if blocks of block_rows x block_cols cells make a puzzle of 1 to MAX_SIZE values"""
+        return block_rows > 0 and block_cols > 0 and block_rows * block_cols <= Geometry.MAX_SIZE
+
+    def block_shape(text) -> tuple:
+        """Return (block_rows, block_cols) for text like "3x3" - the argparse type of every --blocks option"""
+        try:
+            rows, cols = (int(part) for part in text.lower().split("x"))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'"{text}" is not a block shape like 3x3')
+        if not Geometry.is_shape(rows, cols):
+            raise argparse.ArgumentTypeError(f"blocks must have 1 to {Geometry.MAX_SIZE} cells")
+        return rows, cols
+
+    def of(block_rows, block_cols) -> "Geometry":
+        """Return the shared Geometry for blocks of block_rows x block_cols cells"""
+        key = (block_rows, block_cols)
+        key in Geometry._geometries or Geometry._geometries.update({key: Geometry(block_rows, block_cols)})
+        return Geometry._geometries[key]
+
+    def __init__(self, block_rows, block_cols):
+        self.block_rows = block_rows
+        self.block_cols = block_cols
+        self.size = size = block_rows * block_cols
+        self.cell_count = size * size
+        self.row_col = tuple((cell // size, cell % size) for cell in range(self.cell_count))
+        self.houses = self.__rows() + self.__cols() + self.__blocks()
+        self.cell_houses = tuple((row, size + col, 2 * size + self.block_of(row, col)) for row, col in self.row_col)
+        self.peers = tuple(self.__peers(cell) for cell in range(self.cell_count))
+        self.segments, self.segment_blocks, self.segment_lines = self.__segments()
+
+    def cell_id(self, row, col) -> int:
+        return row * self.size + col
+
+    def block_of(self, row, col) -> int:
+        """Return the block number (0 is top-left, numbered left to right, top to bottom)"""
+        return (row // self.block_rows) * (self.size // self.block_cols) + col // self.block_cols
+
+    # Private functions
+
+    def __rows(self) -> tuple:
+        return tuple(tuple(range(row * self.size, (row + 1) * self.size)) for row in range(self.size))
+
+    def __cols(self) -> tuple:
+        return tuple(tuple(range(col, self.cell_count, self.size)) for col in range(self.size))
+
+    def __blocks(self) -> tuple:
+        blocks = [[] for _block in range(self.size)]
+        for cell, (row, col) in enumerate(self.row_col):
+            blocks[self.block_of(row, col)].append(cell)
+        return tuple(tuple(block) for block in blocks)
+
+    def __peers(self, cell) -> tuple:
+        peers = {peer for house in self.cell_houses[cell] for peer in self.houses[house]}
+        peers.discard(cell)
+        return tuple(sorted(peers))
+
+    def __segments(self) -> tuple:
+        segments, by_block, by_line = [], {}, {}
+        for block, cells in enumerate(self.houses[2 * self.size :]):
+            for line in sorted({house for cell in cells for house in self.cell_houses[cell][:2]}):
+                by_block.setdefault((block, line < self.size), []).append(len(segments))
+                by_line.setdefault(line, []).append(len(segments))
+                segments.append(tuple(cell for cell in cells if line in self.cell_houses[cell]))
+        blocks, lines = [None] * len(segments), [None] * len(segments)
+        for groups, others in ((by_block, blocks), (by_line, lines)):
+            for group in groups.values():
+                for segment in group:
+                    others[segment] = tuple(other for other in group if other != segment)
+        return tuple(segments), tuple(blocks), tuple(lines)
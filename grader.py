@@ -0,0 +1,167 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+sys.path.insert(0, ".")
+
+from geometry import Geometry
+from grid import Grid
+from latency_stats import LatencyStats
+from propagator import Propagator
+from techniques import TechniqueLadder
+
+
+@dataclass
+class GradeStep:
+    """One step of a graded solve: a placement by a single, or the eliminations of another technique"""
+
+    technique: str
+    cost: int
+    seconds: float
+    placed: tuple = None  # (cell, value) for singles
+    eliminated: list = None  # [(cell, mask)] for other techniques
+
+
+@dataclass
+class Grade:
+    rating: str
+    score: int
+    solved: bool
+    steps: list = field(default_factory=list)
+    seconds: Counter = field(default_factory=Counter)  # technique -> time spent, including searches that found nothing
+
+    def counts(self) -> Counter:
+        """Number of steps made by each technique"""
+        return Counter(step.technique for step in self.steps)
+
+
+class Grader:
+    """
+    Grade puzzles by the human techniques needed to solve them.
+
+    The grader solves without guessing, always using the cheapest technique that makes
+    progress: singles first, then the TechniqueLadder (locked candidates, subsets, fish,
+    wings).  After each step it starts again from the cheapest technique, so a hard technique
+    is only charged when nothing easier works.  Every step records its technique, cost and time.
+
+    - score - the sum of the step costs
+    - rating - named after the most expensive technique needed (see RATINGS); puzzles that
+      the ladder cannot finish are rated UNSOLVED, contradictory ones INVALID
+
+    Usage: python grader.py [puzzles.txt] [-o grades.txt]
+    """
+
+    SINGLE_COSTS = {Propagator.NAKED_SINGLE: 1, Propagator.HIDDEN_SINGLE: 2}
+    RATINGS = ((1, "trivial"), (2, "easy"), (4, "medium"), (12, "hard"), (float("inf"), "expert"))
+    UNSOLVED = "unsolved"
+    INVALID = "invalid"
+    SINGLES = "singles"
+
+    def __init__(self, geometry=None, techniques=None):
+        self.geometry = geometry or Geometry.of(3, 3)
+        self.techniques = techniques or TechniqueLadder.of(self.geometry).techniques
+        self.stats = LatencyStats()
+        self.ratings = Counter()
+
+    def main(argv=None) -> None:
+        args = Grader.__parse_args(argv)
+        grader = Grader()
+        lines = open(args.puzzles) if args.puzzles and args.puzzles != "-" else sys.stdin
+        out = open(args.output, "w") if args.output else sys.stdout
+        started = time.perf_counter()
+        for line in (line.strip() for line in lines):
+            line and not line.startswith("#") and out.write(grader.grade_line(line) + "\n")
+        elapsed = time.perf_counter() - started
+        lines is sys.stdin or lines.close()
+        out is sys.stdout or out.close()
+        args.quiet or grader.report(elapsed)
+
+    def grade_line(self, line) -> str:
+        """Grade a puzzle line; returns "<puzzle> <rating> <score>" or an error line"""
+        started = time.perf_counter()
+        try:
+            grade = self.grade(Grid.from_string(line, self.geometry))
+        except ValueError as e:
+            return f"error: {e}"
+        self.stats.add(time.perf_counter() - started)
+        self.ratings[grade.rating] += 1
+        return f"{line} {grade.rating} {grade.score}"
+
+    def grade(self, grid: Grid) -> Grade:
+        grid = grid.copy()
+        propagator = Propagator(grid)
+        grade = Grade(self.INVALID, 0, False)
+        if not grid.is_consistent():
+            return grade
+        try:
+            while not grid.is_solved() and self.__step(propagator, grade):
+                pass
+        except Propagator.Contradiction:
+            return grade
+        grade.solved = grid.is_solved()
+        grade.score = sum(step.cost for step in grade.steps)
+        hardest = max((step.cost for step in grade.steps), default=0)
+        grade.rating = next(name for cost, name in self.RATINGS if hardest <= cost) if grade.solved else self.UNSOLVED
+        return grade
+
+    def report(self, elapsed=None) -> None:
+        print(self.stats.report("puzzles", elapsed), file=sys.stderr)
+        print(", ".join(f"{rating}: {count}" for rating, count in self.ratings.most_common()), file=sys.stderr)
+
+    # Private functions
+
+    def __step(self, propagator, grade) -> bool:
+        """Make one step with the cheapest technique that works; returns False when none does"""
+        started = time.perf_counter()
+        made = len(propagator.steps)
+        if not propagator.propagate(limit=1):
+            raise Propagator.Contradiction()
+        seconds = time.perf_counter() - started
+        grade.seconds[self.SINGLES] += seconds
+        if len(propagator.steps) > made:
+            step = propagator.steps[-1]
+            grade.steps.append(
+                GradeStep(step.technique, self.SINGLE_COSTS[step.technique], seconds, (step.cell, step.value))
+            )
+            return True
+        for technique in self.techniques:
+            started = time.perf_counter()
+            eliminations = technique.find(propagator.grid)
+            seconds = time.perf_counter() - started
+            grade.seconds[technique.NAME] += seconds
+            if eliminations:
+                for cell, mask in eliminations:
+                    propagator.eliminate(cell, mask)
+                grade.steps.append(GradeStep(technique.NAME, technique.COST, seconds, eliminated=eliminations))
+                return True
+        return False
+
+    def __parse_args(argv) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(description="Grade sudoku puzzles (one per line) by the techniques they need")
+        parser.add_argument("puzzles", nargs="?", help="puzzle file (default: stdin)")
+        parser.add_argument("-o", "--output", help="grade file (default: stdout)")
+        parser.add_argument("-q", "--quiet", action="store_true", help="do not report throughput and ratings")
+        return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    Grader.main()
@@ -0,0 +1,124 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+
+sys.path.insert(0, ".")
+
+from candidates import Candidates
+from geometry import Geometry
+
+
+class Grid:
+    """
+    A headless puzzle grid: flat lists of cell values and candidate masks over a shared Geometry.
+
+    This is the structure the solvers work on - no Cell objects and no display.  A value of 0
+    means the cell is empty.  The mask of an empty cell holds its candidates; the mask of a
+    placed cell is the bit of its value, or 0 when a peer holds the same value (a conflict).
+
+    When `trail` is a list, every change made by place() and eliminate() is recorded on it as
+    (cell, old mask, old value) so that a search can roll back with undo(mark) instead of
+    copying the grid.
+    """
+
+    DIGITS = "123456789ABCDEFGHIJKLMNOP"
+    BLANKS = ".0"
+
+    def __init__(self, geometry=None, values=None):
+        self.geometry = geometry or Geometry.of(3, 3)
+        self.values = list(values) if values else [0] * self.geometry.cell_count
+        self.masks = self.__initial_masks()
+        self.trail = None
+
+    def from_string(text, geometry=None) -> "Grid":
+        """Create a grid from a string of digits with "." or "0" for empty cells (whitespace is ignored)"""
+        geometry = geometry or Geometry.of(3, 3)
+        text = "".join(text.split())
+        if len(text) != geometry.cell_count:
+            raise ValueError(
+                f"A {geometry.size}x{geometry.size} grid needs {geometry.cell_count} cells, got {len(text)}"
+            )
+        return Grid(geometry, [Grid.value_of(char, geometry.size) for char in text])
+
+    def value_of(char, size=len(DIGITS)) -> int:
+        """Return the value of a digit character (0 for an empty cell) of a grid of `size` values"""
+        if char in Grid.BLANKS:
+            return 0
+        value = Grid.DIGITS.find(char.upper()) + 1
+        if not 0 < value <= size:
+            raise ValueError(f'"{char}" is not a valid cell value')
+        return value
+
+    def to_string(self) -> str:
+        return "".join(Grid.DIGITS[value - 1] if value else "." for value in self.values)
+
+    def copy(self) -> "Grid":
+        grid = Grid.__new__(Grid)
+        grid.geometry, grid.values, grid.masks, grid.trail = self.geometry, list(self.values), list(self.masks), None
+        return grid
+
+    def is_solved(self) -> bool:
+        return all(self.values) and all(self.masks)
+
+    def is_consistent(self) -> bool:
+        """Return True if no two peers hold the same value and every empty cell has a candidate"""
+        return all(self.masks)
+
+    def place(self, cell, value) -> list:
+        """Place value in the cell, remove it from its peers' candidates and return the peers that changed"""
+        bit = 1 << (value - 1)
+        values, masks, trail = self.values, self.masks, self.trail
+        trail is None or trail.append((cell, masks[cell], values[cell]))
+        values[cell] = value
+        masks[cell] = bit
+        changed = []
+        for peer in self.geometry.peers[cell]:
+            if masks[peer] & bit:
+                trail is None or trail.append((peer, masks[peer], values[peer]))
+                masks[peer] ^= bit
+                changed.append(peer)
+        return changed
+
+    def eliminate(self, cell, mask) -> bool:
+        """Remove the candidates in mask from the cell; returns True if any was removed"""
+        masks, trail = self.masks, self.trail
+        if not masks[cell] & mask:
+            return False
+        trail is None or trail.append((cell, masks[cell], self.values[cell]))
+        masks[cell] &= ~mask
+        return True
+
+    def undo(self, mark) -> None:
+        """Roll back the trail to `mark` (a previous length of the trail)"""
+        values, masks, trail = self.values, self.masks, self.trail
+        while len(trail) > mark:
+            cell, masks[cell], values[cell] = trail.pop()
+
+    # Private functions
+
+    def __initial_masks(self) -> list:
+        values, peers = self.values, self.geometry.peers
+        full = Candidates.full(self.geometry.size)
+        masks = []
+        for cell, value in enumerate(values):
+            used = 0
+            for peer in peers[cell]:
+                used |= values[peer] and 1 << (values[peer] - 1)
+            bit = value and 1 << (value - 1)
+            masks.append(full & ~used if not value else bit & ~used)
+        return masks
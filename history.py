@@ -15,7 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # -----------------------------------------------------------------------------
 
-from cell import Cell
+from array import array
 from dataclasses import dataclass
 
 
@@ -31,26 +31,111 @@ class Entry:
         value: int = 0
         prim_attr: str = None
 
-    cell: Cell
+    cell: int  # Flat cell index (row * size + col)
     valueinfo: ValueInfo
     previous_valueinfo: ValueInfo = None
 
 
 class History:
     """
-    Keep and manage history of entries
+    Keep and manage the history of entries of one puzzle.
+
+    Entries are not kept as objects: each one is packed into a single 32-bit integer (cell
+    index, new value, previous value and both primary attributes) in an array, and decoded
+    back into an Entry by undo().
+
+    With a `capacity`, the history is a ring buffer that drops its oldest entries when full -
+    length() still counts them, so positions taken earlier (e.g. by snapshots) stay valid.
     """
 
-    _history: list[Entry] = []
+    # (shift, mask) of the packed fields: cell (16 bits), value and previous value (5 bits each,
+    # 0 is no value) and the attribute and previous attribute (2 bits each, index into ATTRS)
+    FIELDS = ((0, 0xFFFF), (16, 0x1F), (21, 0x1F), (26, 0x3), (28, 0x3))
+    ATTRS = (None, Entry.ValueInfo.INITIAL, Entry.ValueInfo.GUESS)
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self._entries = array("I", bytes(array("I").itemsize * capacity)) if capacity else array("I")
+        self._start = 0  # Ring buffer: index of the oldest entry
+        self._count = 0  # Number of entries kept
+        self.dropped = 0  # Number of oldest entries dropped to stay within the capacity
+
+    def clear(self) -> None:
+        self._start = self._count = self.dropped = 0
+        if not self.capacity:
+            del self._entries[:]
+
+    def add(self, entry: Entry) -> None:
+        self.__append(History.__pack(entry))
+
+    def packed(self) -> array:
+        """The packed entries kept, oldest first (e.g. to save them)"""
+        if not self.capacity:
+            return array("I", self._entries)
+        return array("I", (self._entries[(self._start + index) % self.capacity] for index in range(self._count)))
+
+    def restore(self, packed, dropped=0) -> None:
+        """Replace the history with packed entries saved earlier (see packed())"""
+        self.clear()
+        self.dropped = dropped
+        if not self.capacity:
+            self._entries.extend(packed)
+            self._count = len(self._entries)
+            return
+        for entry in packed:
+            self.__append(entry)
+
+    def undo(self) -> Entry:
+        if not self._count:
+            raise IndexError("undo from empty history")
+        self._count -= 1
+        if not self.capacity:
+            return History.__unpack(self._entries.pop())
+        return History.__unpack(self._entries[(self._start + self._count) % self.capacity])
+
+    def is_empty(self) -> bool:
+        return self._count == 0
+
+    def length(self) -> int:
+        """Number of entries added and not undone, including those dropped to stay within the capacity"""
+        return self.dropped + self._count
+
+    def truncate(self, length) -> None:
+        """Drop every entry after the first `length` (e.g. when rewinding to a snapshot)"""
+        count = max(0, min(self._count, length - self.dropped))
+        if not self.capacity:
+            del self._entries[count:]
+        self._count = count
 
-    def clear():
-        History._history.clear()
+    # Private functions
 
-    def add(entry: Entry):
-        History._history.append(entry)
+    def __append(self, packed) -> None:
+        if not self.capacity:
+            self._entries.append(packed)
+        elif self._count == self.capacity:
+            self._entries[self._start] = packed
+            self._start = (self._start + 1) % self.capacity
+            self.dropped += 1
+            return
+        else:
+            self._entries[(self._start + self._count) % self.capacity] = packed
+        self._count += 1
 
-    def undo() -> Entry:
-        return History._history.pop()
+    def __pack(entry) -> int:
+        previous = entry.previous_valueinfo or Entry.ValueInfo()
+        fields = (
+            entry.cell,
+            entry.valueinfo.value or 0,
+            previous.value or 0,
+            History.ATTRS.index(entry.valueinfo.prim_attr),
+            History.ATTRS.index(previous.prim_attr),
+        )
+        packed = 0
+        for field, (shift, mask) in zip(fields, History.FIELDS):
+            packed |= (field & mask) << shift
+        return packed
 
-    def is_empty() -> bool:
-        return len(History._history) == 0
+    def __unpack(packed) -> Entry:
+        cell, value, previous_value, attr, previous_attr = (packed >> shift & mask for shift, mask in History.FIELDS)
+        previous = Entry.ValueInfo(previous_value, History.ATTRS[previous_attr]) if previous_value else None
+        return Entry(cell, Entry.ValueInfo(value or None, History.ATTRS[attr]), previous)
@@ -22,14 +22,15 @@ from display import Display
 class Input:
     """
     Get input from the terminal and/or other connected input devices and decode it
+    (keys are read with Display.inkey, which also records them)
     """
 
     def get_cmd(timeout=None):
         cmd = None
         while not cmd:
             try:
-                with Display.term.cbreak():
-                    cmd = Input.__decode_inkey(Display.term.inkey(timeout=timeout))
+                keystroke = Display.inkey(timeout=timeout)
+                cmd = Input.__decode_inkey(keystroke)
             except Exception as e:  # Any exception just quit
                 return "quit_"
             except:  # Everything else that is bad, including CTRL-C (KeyboardInterrupt), just quit
@@ -39,8 +40,4 @@ class Input:
     def __decode_inkey(keystroke):
         if keystroke == "":
             return "timeout"
-        cmd_name = keystroke.name if keystroke.is_sequence else keystroke
-        matching_cmds = [k for k in Commands.CMDS.keys() if cmd_name in Commands.CMDS[k]["keys"]]
-        cmd = next(iter(matching_cmds), None)
-        cmd = cmd_name if cmd == "#" else cmd + "_" if cmd else cmd
-        return cmd
+        return Commands.command(Display.key_name(keystroke))
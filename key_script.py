@@ -0,0 +1,104 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+
+sys.path.insert(0, ".")
+
+from geometry import Geometry
+
+
+class KeyScript:
+    """
+    The keys of a recorded session, to be replayed.
+
+    The file is text: a header line "sudoku-keys VERSION ROWSxCOLS [STATE]" (the block shape and,
+    for a session that continued a saved game, the game it started from as hex of its
+    GameState bytes), then one key per line - the character, or the key name for sequences
+    (KEY_UP, KEY_ESCAPE...), with backslash escapes for backslashes and control characters.
+
+    - KeyScript(block_rows, block_cols, keys, state) / read(path) / write(path)
+    - Recorder(path, block_rows, block_cols, state) - called with each key as it is read; every
+      key is written (and flushed) right away so that a session that crashes is still recorded
+    """
+
+    MAGIC = "sudoku-keys"
+    VERSION = 1
+
+    class FormatError(ValueError):
+        pass
+
+    def __init__(self, block_rows=3, block_cols=3, keys=(), state=None):
+        self.block_rows = block_rows
+        self.block_cols = block_cols
+        self.keys = list(keys)
+        self.state = state  # The bytes of the GameState the session started from (None for a new game)
+
+    def read(path) -> "KeyScript":
+        with open(path, encoding="utf-8") as file:
+            block_rows, block_cols, state = KeyScript.__header(file.readline().split(), path)
+            keys = [KeyScript.decode(line.rstrip("\n")) for line in file if line.rstrip("\n")]
+            return KeyScript(block_rows, block_cols, keys, state)
+
+    def write(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(KeyScript.header(self.block_rows, self.block_cols, self.state))
+            file.writelines(KeyScript.encode(key) + "\n" for key in self.keys)
+
+    def header(block_rows, block_cols, state=None) -> str:
+        fields = [KeyScript.MAGIC, str(KeyScript.VERSION), f"{block_rows}x{block_cols}"]
+        state and fields.append(state.hex())
+        return " ".join(fields) + "\n"
+
+    def encode(key) -> str:
+        return key.encode("unicode_escape").decode("ascii")
+
+    def decode(line) -> str:
+        return line.encode("ascii").decode("unicode_escape")
+
+    class Recorder:
+        def __init__(self, path, block_rows=3, block_cols=3, state=None):
+            self._file = open(path, "w", encoding="utf-8")
+            self._file.write(KeyScript.header(block_rows, block_cols, state))
+            self._file.flush()
+
+        def __call__(self, key) -> None:
+            self._file.write(KeyScript.encode(key) + "\n")
+            self._file.flush()
+
+        def close(self) -> None:
+            self._file.close()
+
+    # Private functions
+
+    def __header(fields, path) -> tuple:
+        if len(fields) not in (3, 4) or fields[0] != KeyScript.MAGIC:
+            raise KeyScript.FormatError(f"{path}: not a recorded session")
+        if fields[1] != str(KeyScript.VERSION):
+            raise KeyScript.FormatError(
+                f"{path}: session version {fields[1]} is not supported (expected {KeyScript.VERSION})"
+            )
+        try:
+            block_rows, block_cols = (int(part) for part in fields[2].split("x"))
+        except ValueError:
+            raise KeyScript.FormatError(f'{path}: "{fields[2]}" is not a block shape') from None
+        if not Geometry.is_shape(block_rows, block_cols):
+            raise KeyScript.FormatError(f"{path}: blocks must have 1 to {Geometry.MAX_SIZE} cells")
+        try:
+            return block_rows, block_cols, bytes.fromhex(fields[3]) if len(fields) == 4 else None
+        except ValueError:
+            raise KeyScript.FormatError(f"{path}: the saved game of the session is not hex") from None
@@ -0,0 +1,82 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import math
+
+
+class LatencyStats:
+    """
+    Constant-memory latency statistics.
+
+    Latencies are counted in log-spaced buckets (BUCKETS_PER_DECADE per factor of 10), so
+    percentiles are accurate to about 12% no matter how many samples are added.
+
+    - add(seconds) - record one latency
+    - merge(stats) - add all the latencies recorded by another LatencyStats
+    - percentile(pct) - approximate latency (seconds) at the given percentile
+    - report(what) - one-line summary of count, rate and p50/p99/max latency
+    """
+
+    MIN_LATENCY = 1e-7
+    DECADES = 10
+    BUCKETS_PER_DECADE = 20
+
+    def __init__(self):
+        self._buckets = [0] * (self.DECADES * self.BUCKETS_PER_DECADE + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._buckets[self.__bucket(seconds)] += 1
+
+    def merge(self, stats: "LatencyStats") -> None:
+        self.count += stats.count
+        self.total += stats.total
+        self.max = max(self.max, stats.max)
+        self._buckets = [mine + theirs for mine, theirs in zip(self._buckets, stats._buckets)]
+
+    def percentile(self, pct) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for bucket, count in enumerate(self._buckets):
+            seen += count
+            if seen >= max(rank, 1):
+                return min(self.MIN_LATENCY * 10 ** ((bucket + 1) / self.BUCKETS_PER_DECADE), self.max)
+        return self.max
+
+    def report(self, what="puzzles", elapsed=None) -> str:
+        """Summary line; the rate is based on `elapsed` wall time when given, else on the summed latencies"""
+        elapsed = elapsed or self.total
+        rate = self.count / elapsed if elapsed else 0.0
+        return (
+            f"{self.count} {what} in {elapsed:.3f}s ({rate:.1f} {what}/s), latency "
+            f"p50={self.percentile(50) * 1000:.3f}ms p99={self.percentile(99) * 1000:.3f}ms max={self.max * 1000:.3f}ms"
+        )
+
+    # Private functions
+
+    def __bucket(self, seconds) -> int:
+        if seconds <= self.MIN_LATENCY:
+            return 0
+        bucket = int(math.log10(seconds / self.MIN_LATENCY) * self.BUCKETS_PER_DECADE)
+        return min(bucket, len(self._buckets) - 1)
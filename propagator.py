@@ -0,0 +1,183 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+
+sys.path.insert(0, ".")
+
+from collections import deque
+from dataclasses import dataclass
+
+from candidates import Candidates
+from grid import Grid
+
+
+@dataclass
+class Step:
+    """A single deduction: the value that must be placed in a cell and the technique that found it"""
+
+    cell: int
+    value: int
+    technique: str
+
+
+class Propagator:
+    """
+    Constraint propagation on a Grid using naked singles and hidden singles.
+
+    Work is driven by a queue of changed cells rather than board sweeps: a cell is only
+    re-examined (naked single) when its candidates changed, and a house is only re-examined
+    (hidden single) when one of its cells changed.  Every deduction is placed on the grid and
+    recorded in `steps`.
+
+    With `locked_candidates`, a pass of pointing/claiming eliminations over every block/line
+    segment runs whenever the singles run dry - too costly for 9x9 search, but it prunes the
+    much larger trees of 16x16 and 25x25 puzzles.
+
+    - assign(cell, value) - place a value and queue the peers it affects
+    - eliminate(cell, mask) - remove candidates found by other techniques and queue the cell
+    - propagate(limit) - deduce until nothing changes (or `limit` steps were made);
+      returns False if the grid turned out to be contradictory
+    - clear() - drop pending work and recorded steps (e.g. after the grid was rolled back)
+    """
+
+    NAKED_SINGLE = "naked single"
+    HIDDEN_SINGLE = "hidden single"
+
+    class Contradiction(Exception):
+        pass
+
+    def __init__(self, grid: Grid, locked_candidates=False):
+        self.grid = grid
+        self._locked_candidates = locked_candidates
+        self.steps: list[Step] = []
+        geometry = grid.geometry
+        self._houses = geometry.houses
+        self._cell_houses = geometry.cell_houses
+        self._full = Candidates.full(geometry.size)
+        self._popcount, self._lowest, _values = Candidates.tables(geometry.size)
+        self._queue = deque(range(geometry.cell_count))
+        self._queued = [True] * geometry.cell_count
+        self._dirty_houses = set(range(len(geometry.houses)))
+        self._segments = geometry.segments
+        self._segment_blocks = geometry.segment_blocks
+        self._segment_lines = geometry.segment_lines
+
+    def assign(self, cell, value) -> None:
+        self.__mark([cell] + self.grid.place(cell, value))
+
+    def eliminate(self, cell, mask) -> None:
+        self.grid.eliminate(cell, mask) and self.__mark((cell,))
+
+    def propagate(self, limit=None) -> bool:
+        try:
+            self.__propagate(limit)
+        except Propagator.Contradiction:
+            return False
+        return True
+
+    def clear(self) -> None:
+        self.steps.clear()
+        while self._queue:
+            self._queued[self._queue.pop()] = False
+        self._dirty_houses.clear()
+
+    # Private functions
+
+    def __propagate(self, limit) -> None:
+        self._limit = len(self.steps) + limit if limit else None
+        while not self.__is_limit_reached():
+            if self._queue:
+                self.__naked_single(self._queue.popleft())
+            elif self._dirty_houses:
+                self.__hidden_singles(self._dirty_houses.pop())
+            elif not (self._locked_candidates and self.__locked_candidates()):
+                return
+
+    def __is_limit_reached(self) -> bool:
+        return self._limit is not None and len(self.steps) >= self._limit
+
+    def __naked_single(self, cell) -> None:
+        self._queued[cell] = False
+        mask = self.grid.masks[cell]
+        if not mask:
+            raise Propagator.Contradiction()
+        if not self.grid.values[cell] and self._popcount[mask] == 1:
+            self.__deduce(cell, self._lowest[mask], self.NAKED_SINGLE)
+
+    def __hidden_singles(self, house) -> None:
+        values, masks = self.grid.values, self.grid.masks
+        once = twice = placed = 0
+        for cell in self._houses[house]:
+            if values[cell]:
+                placed |= masks[cell]
+            else:
+                twice |= once & masks[cell]
+                once |= masks[cell]
+        if once | placed != self._full:
+            raise Propagator.Contradiction()
+        singles = once & ~twice & ~placed
+        while singles and not self.__is_limit_reached():
+            bit = singles & -singles
+            singles ^= bit
+            cell = next((cell for cell in self._houses[house] if masks[cell] & bit and not values[cell]), None)
+            if cell is None:  # Its only cell was already taken by another hidden single
+                raise Propagator.Contradiction()
+            self.__deduce(cell, bit.bit_length(), self.HIDDEN_SINGLE)
+        singles and self._dirty_houses.add(house)
+
+    def __locked_candidates(self) -> bool:
+        """Remove values confined to one segment of a block from the rest of its line, and vice versa"""
+        values, masks, segments = self.grid.values, self.grid.masks, self._segments
+        unions = []
+        for cells in segments:
+            union = 0
+            for cell in cells:
+                if not values[cell]:
+                    union |= masks[cell]
+            unions.append(union)
+        found = False
+        for segment, union in enumerate(unions):
+            if not union:
+                continue
+            block_rest = line_rest = 0
+            for other in self._segment_blocks[segment]:
+                block_rest |= unions[other]
+            for other in self._segment_lines[segment]:
+                line_rest |= unions[other]
+            pointing = union & ~block_rest & line_rest  # Only in this segment of the block: not elsewhere on the line
+            claiming = union & ~line_rest & block_rest  # Only in this segment of the line: not elsewhere in the block
+            pointing and self.__eliminate(self._segment_lines[segment], pointing)
+            claiming and self.__eliminate(self._segment_blocks[segment], claiming)
+            found = found or pointing or claiming
+        return bool(found)
+
+    def __eliminate(self, others, mask) -> None:
+        values, masks = self.grid.values, self.grid.masks
+        for other in others:
+            for cell in self._segments[other]:
+                values[cell] or not masks[cell] & mask or self.eliminate(cell, mask)
+
+    def __deduce(self, cell, value, technique) -> None:
+        self.steps.append(Step(cell, value, technique))
+        self.assign(cell, value)
+
+    def __mark(self, cells) -> None:
+        for cell in cells:
+            self._queued[cell] or self._queue.append(cell)
+            self._queued[cell] = True
+            self._dirty_houses.update(self._cell_houses[cell])
@@ -0,0 +1,270 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import argparse
+import contextlib
+import mmap
+import random
+import struct
+import sys
+from dataclasses import dataclass
+
+sys.path.insert(0, ".")
+
+from geometry import Geometry
+from grid import Grid
+
+
+class PuzzleCorpus:
+    """
+    A packed, random-access file of puzzles (and/or solutions) of one block shape.
+
+    Every puzzle is a fixed-width record of `bits` per cell (size.bit_length(): 3 for 4x4 and 6x6,
+    4 for 8 to 15 values such as 9x9, 5 for 16x16 to 25x25), first cell in the high bits, padded
+    to whole bytes - 41 bytes for a 9x9 grid.
+    The file is a 16-byte header (magic, version, block rows/cols, bits per cell, record size)
+    followed by the records, so the index is arithmetic: puzzle i starts at offset(i), and the
+    number of puzzles follows from the file size (files of the same shape can be concatenated
+    after dropping the second header).
+
+    A corpus is opened with mmap: reading puzzle i touches only its record, whatever the size
+    of the file.  4-bit records convert to and from text with bytes.hex()/bytes.fromhex().
+
+    - PuzzleCorpus(path) - open a corpus; len(corpus), corpus[i] (text), values(i), grid(i),
+      offset(i), iteration; close() (or use it as a context manager)
+    - write(path, lines, geometry) - pack text lines (one puzzle per line, "." or "0" for empty
+      cells, blank and "#" lines skipped); returns the number of puzzles written
+    - pack(text, geometry) / unpack(record, geometry) - convert a single puzzle
+
+    Usage: python puzzle_corpus.py pack [puzzles.txt] -o corpus.sdc [--blocks RxC]
+           python puzzle_corpus.py unpack corpus.sdc [-o puzzles.txt] [--start I] [--count N]
+           python puzzle_corpus.py sample corpus.sdc -n N [--seed SEED] [-o puzzles.txt]
+    """
+
+    class FormatError(ValueError):
+        pass
+
+    @dataclass(frozen=True)
+    class Layout:
+        """How the puzzles of a geometry are packed"""
+
+        cells: int
+        bits: int
+        record_size: int
+        to_hex: dict  # str.translate() tables of the 4-bit (hex) records
+        from_hex: dict
+
+    MAGIC = b"SDKC"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHBBBxH4x")
+
+    _layouts = {}
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:  # An empty file cannot be mapped
+                raise PuzzleCorpus.FormatError(f"{path}: not a puzzle corpus") from error
+        try:
+            self.geometry, self.layout = PuzzleCorpus.__read_header(self._map)
+        except PuzzleCorpus.FormatError as error:
+            self._map.close()
+            raise PuzzleCorpus.FormatError(f"{path}: {error}") from None
+        self._count = (len(self._map) - PuzzleCorpus.HEADER.size) // self.layout.record_size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index) -> str:
+        return PuzzleCorpus.unpack(self.record(index), self.geometry)
+
+    def __iter__(self):
+        return (self[index] for index in range(self._count))
+
+    def __enter__(self) -> "PuzzleCorpus":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def offset(self, index) -> int:
+        """Byte offset of puzzle `index` (negative indexes count from the end)"""
+        if not -self._count <= index < self._count:
+            raise IndexError(f"puzzle {index} is not in a corpus of {self._count}")
+        return PuzzleCorpus.HEADER.size + (index % self._count) * self.layout.record_size
+
+    def record(self, index) -> bytes:
+        offset = self.offset(index)
+        return self._map[offset : offset + self.layout.record_size]
+
+    def values(self, index) -> list[int]:
+        return [Grid.value_of(char) for char in self[index]]
+
+    def grid(self, index) -> Grid:
+        return Grid(self.geometry, self.values(index))
+
+    def layout_of(geometry) -> "PuzzleCorpus.Layout":
+        layout = PuzzleCorpus._layouts.get(geometry)
+        if layout is None:
+            bits = geometry.size.bit_length()
+            to_hex, from_hex = PuzzleCorpus.__hex_tables(geometry.size)
+            record_size = (geometry.cell_count * bits + 7) // 8
+            layout = PuzzleCorpus.Layout(geometry.cell_count, bits, record_size, to_hex, from_hex)
+            PuzzleCorpus._layouts[geometry] = layout
+        return layout
+
+    def pack(text, geometry=None) -> bytes:
+        """The record of a puzzle given as text (whitespace is ignored)"""
+        geometry = geometry or Geometry.of(3, 3)
+        layout = PuzzleCorpus.layout_of(geometry)
+        text = "".join(text.split())
+        if len(text) != layout.cells:
+            raise ValueError(f"A {geometry.size}x{geometry.size} grid needs {layout.cells} cells, got {len(text)}")
+        if layout.bits == 4:
+            try:
+                return bytes.fromhex(text.translate(layout.to_hex) + "0" * (layout.cells % 2))
+            except ValueError:
+                raise ValueError(f'"{text}" is not a {geometry.size}x{geometry.size} puzzle') from None
+        packed = 0
+        for char in text:
+            value = Grid.value_of(char)
+            if value > geometry.size:
+                raise ValueError(f'"{char}" is not a value of a {geometry.size}x{geometry.size} puzzle')
+            packed = packed << layout.bits | value
+        return (packed << (layout.record_size * 8 - layout.cells * layout.bits)).to_bytes(layout.record_size, "big")
+
+    def unpack(record, geometry=None) -> str:
+        """The text of a puzzle record, "." for empty cells"""
+        layout = PuzzleCorpus.layout_of(geometry or Geometry.of(3, 3))
+        if layout.bits == 4:
+            return record.hex()[: layout.cells].translate(layout.from_hex)
+        packed = int.from_bytes(record, "big") >> (layout.record_size * 8 - layout.cells * layout.bits)
+        mask = (1 << layout.bits) - 1
+        shifts = range((layout.cells - 1) * layout.bits, -1, -layout.bits)
+        return "".join(
+            Grid.DIGITS[value - 1] if value else "." for value in (packed >> shift & mask for shift in shifts)
+        )
+
+    def write(path, lines, geometry=None) -> int:
+        geometry = geometry or Geometry.of(3, 3)
+        layout = PuzzleCorpus.layout_of(geometry)
+        header = PuzzleCorpus.HEADER.pack(
+            PuzzleCorpus.MAGIC,
+            PuzzleCorpus.VERSION,
+            geometry.block_rows,
+            geometry.block_cols,
+            layout.bits,
+            layout.record_size,
+        )
+        count = 0
+        with open(path, "wb") as out:
+            out.write(header)
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    out.write(PuzzleCorpus.pack(line, geometry))
+                    count += 1
+        return count
+
+    def main(argv=None) -> None:
+        args = PuzzleCorpus.__parse_args(argv)
+        if args.command == "pack":
+            with PuzzleCorpus.__open(args.puzzles, sys.stdin) as lines:
+                count = PuzzleCorpus.write(args.output, lines, Geometry.of(*args.blocks))
+            args.quiet or print(f"{count} puzzles packed", file=sys.stderr)
+            return
+        with PuzzleCorpus(args.corpus) as corpus:
+            if args.command == "sample":
+                indexes = random.Random(args.seed).sample(range(len(corpus)), min(args.n, len(corpus)))
+            else:
+                end = len(corpus) if args.count is None else min(len(corpus), args.start + args.count)
+                indexes = range(args.start, end)
+            out = open(args.output, "w") if args.output else sys.stdout
+            for index in indexes:
+                out.write(corpus[index] + "\n")
+            out is sys.stdout or out.close()
+
+    # Private functions
+
+    def __read_header(buffer) -> tuple:
+        """The geometry and layout of a corpus; raises FormatError unless its header and size are valid"""
+        if len(buffer) < PuzzleCorpus.HEADER.size:
+            raise PuzzleCorpus.FormatError("not a puzzle corpus")
+        magic, version, block_rows, block_cols, bits, record_size = PuzzleCorpus.HEADER.unpack_from(buffer)
+        if magic != PuzzleCorpus.MAGIC:
+            raise PuzzleCorpus.FormatError("not a puzzle corpus")
+        if version != PuzzleCorpus.VERSION:
+            raise PuzzleCorpus.FormatError(
+                f"corpus version {version} is not supported (expected {PuzzleCorpus.VERSION})"
+            )
+        if not Geometry.is_shape(block_rows, block_cols):
+            raise PuzzleCorpus.FormatError(f"corpus has no valid block shape ({block_rows}x{block_cols})")
+        geometry = Geometry.of(block_rows, block_cols)
+        layout = PuzzleCorpus.layout_of(geometry)
+        if (bits, record_size) != (layout.bits, layout.record_size):
+            raise PuzzleCorpus.FormatError(
+                f"{bits}-bit cells in {record_size}-byte records are not {block_rows}x{block_cols} puzzles"
+            )
+        if (len(buffer) - PuzzleCorpus.HEADER.size) % record_size:
+            raise PuzzleCorpus.FormatError("the last puzzle is truncated")
+        return geometry, layout
+
+    def __hex_tables(size) -> tuple:
+        """Text <-> hex digit translation; characters that are not values become "x" so that fromhex() rejects them"""
+        to_hex = {ord(char): "x" for char in "0123456789abcdefABCDEF"}
+        to_hex.update({ord(blank): "0" for blank in Grid.BLANKS})
+        from_hex = {ord("0"): "."}
+        for value in range(1, min(size, 15) + 1):
+            digit = Grid.DIGITS[value - 1]
+            to_hex[ord(digit)] = to_hex[ord(digit.lower())] = format(value, "x")
+            from_hex[ord(format(value, "x"))] = digit
+        return to_hex, from_hex
+
+    def __parse_args(argv) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(
+            description="Convert between puzzle text files (one per line) and packed corpora"
+        )
+        commands = parser.add_subparsers(dest="command", required=True)
+        pack = commands.add_parser("pack", help="pack a text file of puzzles")
+        pack.add_argument("puzzles", nargs="?", help="puzzle file (default: stdin)")
+        pack.add_argument("-o", "--output", required=True, help="corpus file")
+        pack.add_argument(
+            "--blocks", type=Geometry.block_shape, default=(3, 3), help="block rows x columns (default: 3x3)"
+        )
+        pack.add_argument("-q", "--quiet", action="store_true", help="do not report the number of puzzles")
+        unpack = commands.add_parser("unpack", help="write puzzles of a corpus as text")
+        unpack.add_argument("--start", type=int, default=0, help="first puzzle (default: 0)")
+        unpack.add_argument("--count", type=int, help="number of puzzles (default: all)")
+        sample = commands.add_parser("sample", help="write a random sample of a corpus as text")
+        sample.add_argument("-n", type=int, default=1, help="number of puzzles")
+        sample.add_argument("--seed", type=int, help="seed for a reproducible sample (default: random)")
+        for command in (unpack, sample):
+            command.add_argument("corpus", help="corpus file")
+            command.add_argument("-o", "--output", help="puzzle file (default: stdout)")
+        return parser.parse_args(argv)
+
+    def __open(path, default):
+        return open(path) if path and path != "-" else contextlib.nullcontext(default)
+
+
+if __name__ == "__main__":
+    PuzzleCorpus.main()
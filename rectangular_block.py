@@ -31,14 +31,6 @@ class RectangularBlock:
     The size and position of the block are provided during instantiation.
     """
 
-    # fmt: off
-    BORDERS = [
-        [ Border({Border.TOP, Border.LEFT}),    Border({Border.TOP}),    Border({Border.TOP, Border.RIGHT}) ],
-        [ Border({Border.LEFT}),                Border(),                Border({Border.RIGHT}) ],
-        [ Border({Border.BOTTOM, Border.LEFT}), Border({Border.BOTTOM}), Border({Border.BOTTOM, Border.RIGHT}) ],
-    ]
-    # fmt: on
-
     def __init__(self, parent, row, col, rows=0, cols=0):
         self.parent = parent
         self.block_row = row
@@ -63,18 +55,34 @@ class RectangularBlock:
         return range(1, self.rows * self.cols + 1)
 
     def add_possible(self, row, col, value) -> None:
-        pass
+        """The cell at (row, col) no longer holds value - make it possible again for peers not blocked elsewhere"""
+        self.parent.value_cleared(row, col, value)
+        for cell in self.parent.peers(row, col):
+            self.parent.is_value_placed_for(cell.row, cell.col, value) or cell.add_possible(value)
 
     def remove_possible(self, row, col, value) -> None:
-        pass
+        """The cell at (row, col) now holds value - none of its peers can hold it"""
+        self.parent.value_placed(row, col, value)
+        for cell in self.parent.peers(row, col):
+            cell.remove_possible(value)
 
     # Private functions
 
     def __initialize_cells(self):
-        self._cells = [[None for _col in range(self.rows)] for _row in range(self.cols)]
+        self._cells = [[None for _col in range(self.cols)] for _row in range(self.rows)]
         for row in range(self.rows):
             for col in range(self.cols):
-                self._cells[row][col] = Cell(parent=self, **self.__phys_pos(row, col), borders=self.BORDERS[row][col])
+                self._cells[row][col] = Cell(parent=self, **self.__phys_pos(row, col), borders=self.__borders(row, col))
+
+    def __borders(self, row, col) -> Border:
+        """Thick borders on the sides of the cell that are on the edge of the block"""
+        edges = {
+            Border.TOP: row == 0,
+            Border.BOTTOM: row == self.rows - 1,
+            Border.LEFT: col == 0,
+            Border.RIGHT: col == self.cols - 1,
+        }
+        return Border({edge for edge, is_edge in edges.items() if is_edge})
 
     def __phys_pos(self, row, col):
         return {
@@ -0,0 +1,373 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+
+sys.path.insert(0, ".")
+
+from history import History, Entry
+
+from commands import Commands
+from backtracking_solver import BacktrackingSolver
+from cell import Cell
+from display import Display, echo
+from display_attrs import DisplayAttrs
+from game_state import GameState
+from geometry import Geometry
+from grid import Grid
+from propagator import Propagator
+from rectangular_block import RectangularBlock
+from snapshot import Snapshot
+from techniques import TechniqueLadder
+
+
+class RectangularPuzzle:
+    """
+    Implement a puzzle of equally sized rectangular blocks of block_rows x block_cols cells,
+    e.g. 2x2 (4x4 puzzle), 2x3, 3x3 (the classic 9x9), 3x4, 4x4 (16x16) or 5x5 (25x25).
+
+    Puzzles with more than 9 values use letters after 9 (see Commands.configure) and a
+    compact display without possible values.
+
+    The moves are kept in the puzzle's own History; with a `history_capacity` only that many
+    of the latest moves can be undone.
+
+    All puzzles are required to have a minimum interface consisting of the following attributes:
+        selected_cell - (row: int, col: int) - a tuple that represents the currently selected cell
+        is_playing - bool - True if user is still playing the puzzle, False otherwise
+
+    And the following methods:
+        render() -
+        display_status() -
+
+    In addition, the puzzle should support all the commands available in commands.py.  Function
+    names for commands have underscore (_) as a suffix to eliminate conflicts with reserved words.
+
+    """
+
+    BG_LEVEL_DELTA = 10
+    UNIQUENESS_NODES = 5000  # Guesses the uniqueness check may make before the puzzle is played unverified
+    MAX_DIGIT_SIZE = 9  # Larger puzzles need letters and a compact display
+
+    def __init__(self, block_rows=3, block_cols=3, history_capacity=None):
+        # Public attributes required for all puzzles
+        self.selected_cell = (0, 0)  # row, col (NOT x, y)
+        self.is_playing = True
+
+        self._geometry = Geometry.of(block_rows, block_cols)
+        size = self._geometry.size
+        self._history = History(history_capacity)
+        Commands.configure(size)
+        Display.geometry({"h_cells": size, "v_cells": size, "compact": size > self.MAX_DIGIT_SIZE})
+        Display.validate_screen_size()
+
+        self._blocks = [
+            [
+                RectangularBlock(self, row=block_row, col=block_col, rows=block_rows, cols=block_cols)
+                for block_col in range(size // block_cols)
+            ]
+            for block_row in range(size // block_rows)
+        ]
+        self.__initialize_index()
+
+        self._initializing = True
+        self._bg_level = 0
+        self._snapshots = []
+
+    # Required public interface methods
+
+    def render(self) -> None:
+        Display.clear_screen()
+        for blocks in self._blocks:
+            for block in blocks:
+                block.render()
+        self.display_status()
+
+    def display_status(self) -> None:
+        Display.move_to_status_line()
+        echo(Commands.short_help() + Display.term.clear_eol)
+
+    def state(self) -> GameState:
+        """The whole game, e.g. to save() it"""
+        return GameState.of(
+            self._geometry, self._cells, self._history, self._initializing, self._bg_level, self.selected_cell
+        )
+
+    def restore(self, state: GameState) -> None:
+        """Continue a saved game of the same block shape (render() it afterwards); its rewind points are gone"""
+        if (state.block_rows, state.block_cols) != (self._geometry.block_rows, self._geometry.block_cols):
+            raise ValueError(
+                f"A game of {state.block_rows}x{state.block_cols} blocks cannot be restored into this puzzle"
+            )
+        self._house_counts = [[0] * (self._geometry.size + 1) for _house in self._geometry.houses]
+        for cell_id, cell in enumerate(self._cells):
+            cell.restore(state.values[cell_id] or None, state.candidates[cell_id], state.cell_attrs(cell_id))
+            state.values[cell_id] and self.__count(cell_id, state.values[cell_id], 1)
+        self._history.restore(state.history, state.history_dropped)
+        self._snapshots.clear()
+        self._bg_level = state.bg_level
+        self.selected_cell = state.selected_cell
+        self._initializing = state.initializing
+        Commands.use(Commands.INIT if state.initializing else Commands.PLAY)
+
+    # Interface required for rectangular blocks
+
+    def cell(self, row, col) -> Cell:
+        return self._cells[self._geometry.cell_id(row, col)]
+
+    def peers(self, row, col) -> tuple[Cell]:
+        """Return the cells sharing a row, column or block with the cell at (row, col)"""
+        return self._peer_cells[self._geometry.cell_id(row, col)]
+
+    def value_placed(self, row, col, value) -> None:
+        """Count the value in the cell's houses; a duplicate is CONFLICTING and the peers it duplicates CONFLICTED"""
+        cell_id = self._geometry.cell_id(row, col)
+        self.__count(cell_id, value, 1)
+        if self.__is_duplicate(cell_id, value):
+            self._cells[cell_id].set_conflict(DisplayAttrs.CONFLICTING)
+            self.__update_peer_conflicts(cell_id, value, lambda peer_id, conflict: conflict or DisplayAttrs.CONFLICTED)
+
+    def value_cleared(self, row, col, value) -> None:
+        """Uncount the value in the cell's houses; peers holding it are no longer in conflict unless duplicated"""
+        cell_id = self._geometry.cell_id(row, col)
+        self.__count(cell_id, value, -1)
+        houses = self._geometry.cell_houses[cell_id]
+        if any(self._house_counts[house][value] for house in houses):  # Some peer still holds the value
+            self.__update_peer_conflicts(
+                cell_id, value, lambda peer_id, conflict: conflict if self.__is_duplicate(peer_id, value) else None
+            )
+
+    def is_value_placed_for(self, row, col, value) -> bool:
+        """Return True if value is held by any other cell sharing a house with the cell at (row, col)"""
+        cell_id = self._geometry.cell_id(row, col)
+        own = self._cells[cell_id].value() == value
+        return any(self._house_counts[house][value] > own for house in self._geometry.cell_houses[cell_id])
+
+    # Interface methods for commands (corresponding to commands in Commands)
+
+    def quit_(self) -> None:
+        self.is_playing = False
+
+    def help_(self) -> None:
+        Display.clear_screen()
+        echo(Commands.long_help() + "\n")
+        Display.hit_any_key_to_continue()
+        self.render()
+
+    def value_(self, val, guess=False) -> None:
+        cell = self.__selected_cell()
+        if not self._initializing and DisplayAttrs.INITIAL in cell.attr():
+            Display.warn("Cannot change an initial value while playing. ", wait=True)
+            return
+        guess and not self._initializing and self.__start_guess()
+        self.__accept_user_value(val, self.__attributes(guess), cell)
+
+    def up_(self) -> None:
+        row, col = self.selected_cell
+        row = row - 1 if row > 0 else row
+        self.selected_cell = (row, col)
+
+    def down_(self) -> None:
+        row, col = self.selected_cell
+        row = row + 1 if row < Display.geom["v_cells"] - 1 else row
+        self.selected_cell = (row, col)
+
+    def left_(self) -> None:
+        row, col = self.selected_cell
+        col = col - 1 if col > 0 else col
+        self.selected_cell = (row, col)
+
+    def right_(self) -> None:
+        row, col = self.selected_cell
+        col = col + 1 if col < Display.geom["h_cells"] - 1 else col
+        self.selected_cell = (row, col)
+
+    def play_(self) -> None:
+        if not self.__is_valid_puzzle():
+            return
+        self._initializing = False
+        Commands.use(Commands.PLAY)
+        self.display_status()
+
+    def init_(self) -> None:
+        if self.__check_for_active_play():
+            return
+        self._initializing = True
+        self._snapshots.clear()
+        Commands.use(Commands.INIT)
+        self.display_status()
+
+    def del_(self) -> None:
+        if not self._initializing:
+            Display.warn("Deleting a cell value can only be done while initializing the puzzle. ", wait=True)
+            return
+        self.__selected_cell().update(None)
+
+    def undo_(self) -> None:
+        (
+            self.__undo_history()
+            if not self._history.is_empty()
+            else Display.warn("Cannot undo initialized puzzle.  ESC will re-enter initialization mode. ", wait=True)
+        )
+
+    def rewind_(self) -> None:
+        """Restore the puzzle as it was just before the most recent guess, with one redraw of the changed cells"""
+        if not self._snapshots:
+            Display.warn("There is no guess to rewind to. ", wait=True)
+            return
+        snapshot = self._snapshots.pop()
+        changed = snapshot.changed(self._cells)
+        for cell_id in changed:
+            self._cells[cell_id].value() and self.__count(cell_id, self._cells[cell_id].value(), -1)
+            snapshot.values[cell_id] and self.__count(cell_id, snapshot.values[cell_id], 1)
+        for cell in snapshot.restore(self._cells, changed):
+            cell.render()
+        self._history.truncate(snapshot.history_length)
+        self._bg_level = snapshot.bg_level
+        self.selected_cell = snapshot.selected_cell
+
+    def next_(self) -> None:
+        propagator = Propagator(self.__grid())
+        is_consistent = self._techniques.propagate(propagator, limit=1)
+        self.__play_steps(propagator.steps)
+        is_consistent and not propagator.steps and Display.warn(
+            "No cell value can be determined without a guess. ", wait=True
+        )
+        is_consistent or self.__warn_contradiction()
+
+    def auto_(self) -> None:
+        """Auto-play every "must be" cell value as one batch with a single redraw at the end"""
+        propagator = Propagator(self.__grid())
+        is_consistent = self._techniques.propagate(propagator)
+        self.__play_steps(propagator.steps)
+        is_consistent or self.__warn_contradiction()
+
+    # Private functions
+
+    def __grid(self) -> Grid:
+        return Grid(self._geometry, [cell.value() or 0 for cell in self._cells])
+
+    def __play_steps(self, steps) -> None:
+        """Play the deduced values (with history), then redraw each affected cell once"""
+        attr = self.__attributes(False)
+        redraw = {}
+        for step in steps:
+            cell = self._cells[step.cell]
+            self.__add_history(cell, step.value, attr)
+            cell.set(step.value, attr)
+            redraw.update(dict.fromkeys((cell,) + self._peer_cells[step.cell]))
+            self.selected_cell = (cell.row, cell.col)
+        for cell in redraw:
+            cell.render()
+
+    def __warn_contradiction(self) -> None:
+        Display.warn("The puzzle cannot be solved from here - undo or rewind. ", wait=True)
+
+    def __start_guess(self) -> None:
+        """Snapshot the puzzle so that rewind_ can return to this point, then shade the guesses darker"""
+        self._snapshots.append(Snapshot.of(self._cells, self._history.length(), self._bg_level, self.selected_cell))
+        self.__increment_bg_level()
+
+    def __increment_bg_level(self) -> None:
+        self._bg_level += self.BG_LEVEL_DELTA
+        self._bg_level > DisplayAttrs.MAX_GRAY_LEVEL and Display.warn(
+            "No more shades of gray left - repeating last shade. ", wait=True
+        )
+
+    def __attributes(self, guess) -> set:
+        """Determine primary attribute(s): INITIAL or GUESS (or normal) plus background shading"""
+        attr = [DisplayAttrs.INITIAL] if self._initializing else [DisplayAttrs.GUESS] if guess else []
+        attr += [DisplayAttrs.Level(self._bg_level)] if self._bg_level else []
+        return set(attr)
+
+    def __initialize_index(self) -> None:
+        """Flat cell list and peer cells per the shared geometry index, plus per-house value counts"""
+        self._cells = tuple(self.__block(row, col).cell(row, col) for row, col in self._geometry.row_col)
+        self._peer_cells = tuple(tuple(self._cells[peer] for peer in peers) for peers in self._geometry.peers)
+        self._house_counts = [[0] * (self._geometry.size + 1) for _house in self._geometry.houses]
+        self._techniques = TechniqueLadder.of(self._geometry)
+
+    def __count(self, cell_id, value, delta) -> None:
+        for house in self._geometry.cell_houses[cell_id]:
+            self._house_counts[house][value] += delta
+
+    def __is_duplicate(self, cell_id, value) -> bool:
+        return any(self._house_counts[house][value] > 1 for house in self._geometry.cell_houses[cell_id])
+
+    def __update_peer_conflicts(self, cell_id, value, new_conflict) -> None:
+        """Set the conflict of the peers holding value to new_conflict(peer id, conflict); redraw the changed ones"""
+        for peer_id, peer in zip(self._geometry.peers[cell_id], self._peer_cells[cell_id]):
+            peer.value() == value and peer.set_conflict(new_conflict(peer_id, peer.conflict())) and peer.render()
+
+    def __selected_cell(self) -> Cell:
+        return self.cell(*self.selected_cell)
+
+    def __accept_user_value(self, val, attr: set, cell: Cell) -> None:
+        self._initializing or self.__add_history(cell, val, attr)
+        cell.update(val, attr)
+
+    def __block(self, row, col) -> RectangularBlock:
+        return self._blocks[row // self._geometry.block_rows][col // self._geometry.block_cols]
+
+    def __add_history(self, cell, val, attr) -> None:
+        new_info = Entry.ValueInfo(val, self.__prim_attr(attr))
+        prev_val = cell.value()
+        prev_info = Entry.ValueInfo(prev_val, self.__prim_attr(cell.attr())) if prev_val else None
+        self._history.add(Entry(self._geometry.cell_id(cell.row, cell.col), new_info, prev_info))
+
+    def __prim_attr(self, attr) -> str:
+        prim_attr = DisplayAttrs.INITIAL if DisplayAttrs.INITIAL in attr else None
+        prim_attr = prim_attr or (DisplayAttrs.GUESS if DisplayAttrs.GUESS in attr else None)
+        return prim_attr
+
+    def __is_valid_puzzle(self) -> bool:
+        """Only a puzzle with exactly one solution can be played (or one too hard to check quickly)"""
+        uniqueness = BacktrackingSolver(self._geometry).uniqueness(self.__grid(), self.UNIQUENESS_NODES)
+        uniqueness == BacktrackingSolver.NO_SOLUTION and Display.warn(
+            "This puzzle has no solution - fix the initial values. ", wait=True
+        )
+        uniqueness == BacktrackingSolver.MULTIPLE and Display.warn(
+            "This puzzle has more than one solution - add initial values. ", wait=True
+        )
+        uniqueness == BacktrackingSolver.UNKNOWN and Display.warn(
+            "Could not verify that this puzzle has only one solution. ", wait=True
+        )
+        return uniqueness in (BacktrackingSolver.UNIQUE, BacktrackingSolver.UNKNOWN)
+
+    def __check_for_active_play(self) -> bool:
+        is_actively_playing = not self._history.is_empty()  # length() also counts moves a capped history dropped
+        is_actively_playing and Display.warn(
+            "Cannot initialize puzzle while playing - undo everything first. ", wait=True
+        )
+        return is_actively_playing
+
+    def __undo_history(self) -> None:
+        entry = self._history.undo()
+        while self._snapshots and self._snapshots[-1].history_length >= self._history.length():
+            self._snapshots.pop()  # Undone past the guess it was taken for
+        self.selected_cell = self._geometry.row_col[entry.cell]
+        entry.valueinfo.prim_attr == DisplayAttrs.GUESS and self.__decrement_bg_level()
+        prev_val = entry.previous_valueinfo.value if entry.previous_valueinfo else None
+        prev_attr = (
+            self.__attributes(entry.previous_valueinfo.prim_attr == DisplayAttrs.GUESS)
+            if entry.previous_valueinfo
+            else ()
+        )
+        self._cells[entry.cell].update(prev_val, prev_attr)
+
+    def __decrement_bg_level(self) -> None:
+        self._bg_level = max(self._bg_level - self.BG_LEVEL_DELTA, 0)
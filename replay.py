@@ -0,0 +1,98 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import argparse
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from display import Display
+from display_backend import DisplayBackend
+from game_state import GameState
+from key_script import KeyScript
+from latency_stats import LatencyStats
+from sudoku import Main
+
+
+class Replay:
+    """
+    Replay a recorded session (see KeyScript and sudoku.py --record) through the whole interactive
+    path - Main, Input, the puzzle and the display - at full speed on a headless display and
+    without the splash screen.  A session that continued a saved game starts from that game.
+
+    Per-command latencies (from the key being read until the result is drawn) and the total
+    session time are reported on stderr.  With --repeat, the session is replayed several times
+    and the latencies of every run are counted together.
+
+    Usage: python replay.py session.keys [--display null|memory] [--repeat N]
+    """
+
+    DISPLAYS = ("null", "memory")  # The display backends that can be fed keys
+
+    def __init__(self, script: KeyScript, display="null"):
+        self.script = script
+        self._display = display
+        self.latencies = {}
+        self.session = LatencyStats()
+
+    def main(argv=None) -> None:
+        args = Replay.__parse_args(argv)
+        replay = Replay(KeyScript.read(args.session), args.display)
+        for _run in range(args.repeat):
+            replay.run()
+        print(replay.report(), file=sys.stderr)
+
+    def run(self) -> Main:
+        """Replay the session once; returns the Main that played it"""
+        previous = Display.backend
+        backend = DisplayBackend.named(self._display)
+        backend.feed(*self.script.keys)
+        Display.use(backend)
+        state = self.script.state and GameState.from_buffer(self.script.state)
+        main = Main(self.script.block_rows, self.script.block_cols, splash=False, timed=True, state=state)
+        started = time.perf_counter()
+        try:
+            main.run()
+        finally:
+            self.session.add(time.perf_counter() - started)
+            Display.use(previous)
+        for cmd, stats in main.latencies.items():
+            self.latencies.setdefault(cmd, LatencyStats()).merge(stats)
+        return main
+
+    def report(self) -> str:
+        """One line per command (most frequent first), then the session times"""
+        commands = sorted(self.latencies.items(), key=lambda item: -item[1].count)
+        lines = [f"{cmd:>8}: {stats.report('keys')}" for cmd, stats in commands]
+        return "\n".join(lines + [f"{'session':>8}: {self.session.report('sessions')}"])
+
+    # Private functions
+
+    def __parse_args(argv) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(description="Replay a recorded sudoku session and report command latencies")
+        parser.add_argument("session", help="keys recorded with sudoku.py --record")
+        parser.add_argument(
+            "--display", choices=Replay.DISPLAYS, default="null", help="headless display (default: null)"
+        )
+        parser.add_argument("--repeat", type=int, default=1, help="number of replays (default: 1)")
+        return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    Replay.main()
@@ -0,0 +1,81 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import ClassVar
+
+sys.path.insert(0, ".")
+
+from cell import Cell
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Compact copy of the cells of a puzzle, taken when a guess is made so that rewinding to it
+    is a single restore.
+
+    Values and candidate bitmasks are arrays of one machine integer per cell; attributes are
+    frozensets shared by every cell (and snapshot) with the same attributes.
+
+    - of(cells, ...) - take a snapshot of the cells
+    - changed(cells) - the indexes of the cells that differ from the snapshot
+    - restore(cells, indexes) - put back the given cells; returns those cells
+    """
+
+    history_length: int
+    bg_level: int
+    selected_cell: tuple
+    values: array
+    candidates: array
+    attrs: tuple
+
+    _shared_attrs: ClassVar[dict] = {}
+
+    def of(cells: list[Cell], history_length, bg_level, selected_cell) -> "Snapshot":
+        return Snapshot(
+            history_length,
+            bg_level,
+            selected_cell,
+            array("B", (cell.value() or 0 for cell in cells)),
+            array("L", (cell.candidates() for cell in cells)),
+            tuple(Snapshot.__shared(cell.attr()) for cell in cells),
+        )
+
+    def changed(self, cells: list[Cell]) -> list[int]:
+        values, candidates, attrs = self.values, self.candidates, self.attrs
+        return [
+            index
+            for index, cell in enumerate(cells)
+            if (cell.value() or 0) != values[index]
+            or cell.candidates() != candidates[index]
+            or cell.attr() != attrs[index]
+        ]
+
+    def restore(self, cells: list[Cell], indexes) -> list[Cell]:
+        restored = [cells[index] for index in indexes]
+        for index, cell in zip(indexes, restored):
+            cell.restore(self.values[index] or None, self.candidates[index], self.attrs[index])
+        return restored
+
+    # Private functions
+
+    def __shared(attrs) -> frozenset:
+        attrs = frozenset(attrs)
+        return Snapshot._shared_attrs.setdefault(attrs, attrs)
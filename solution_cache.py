@@ -0,0 +1,183 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from collections import OrderedDict
+
+sys.path.insert(0, ".")
+
+from canonical_form import CanonicalForm
+from grid import Grid
+from propagator import Propagator
+
+
+class SolutionCache:
+    """
+    An LRU cache of solutions that sits in front of any solver with solve(grid) and
+    count_solutions(grid, limit) methods.
+
+    Entries map a puzzle string to its solution string ("" when there is none), so exact
+    repeats cost one hash lookup.  Relabelled, transposed or band/stack permuted variants of an
+    already solved puzzle are found by their canonical (minlex) form, and the cached canonical
+    solution is mapped back through the transformation.  Solution counts are cached the same
+    way under a "count<limit>:" key prefix (they need no mapping back).
+
+    Canonicalization costs about as much as solving a hard 9x9 puzzle, and far more for easy,
+    sparse or unique ones, so it is only done where it can pay off:
+    - puzzles that singles alone solve (or prove contradictory) are answered without it
+    - puzzles with fewer than MIN_CLUES of their cells given are only cached as given
+    - a puzzle is only canonicalized once an earlier one had the same CanonicalForm.fingerprint;
+      the first of a class is remembered and canonicalized together with the second
+
+    Entries (fingerprints included) are evicted least recently used first once their estimated
+    size exceeds max_bytes.
+
+    - solve(grid) - the solution (None if there is none)
+    - count_solutions(grid, limit) - the number of solutions, counting at most `limit`
+    - stats() - dict of hits, misses, evictions, uncacheable (too sparse or symmetric to
+      canonicalize), canonicalized, entries and bytes
+    - report() / summary(stats) - one line of those counters
+    """
+
+    MIN_CLUES = 0.2
+    ENTRY_OVERHEAD = 100  # Approximate bytes per entry for the dict and LRU links
+    FINGERPRINT = "fingerprint:"  # Key prefix that cannot occur in a puzzle string
+
+    def __init__(self, solver, max_bytes=64 * 2**20):
+        self._solver = solver
+        self.geometry = solver.geometry
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self.hits = self.misses = self.evictions = self.uncacheable = self.canonicalized = 0
+
+    def solve(self, grid: Grid) -> Grid:
+        solution = self.__cached(grid, "", None)
+        return Grid.from_string(solution, self.geometry) if solution else None
+
+    def count_solutions(self, grid: Grid, limit=2) -> int:
+        return int(self.__cached(grid, f"count{limit}:", limit))
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "uncacheable": self.uncacheable,
+            "canonicalized": self.canonicalized,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
+
+    def report(self) -> str:
+        return SolutionCache.summary(self.stats())
+
+    def summary(stats) -> str:
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = 100 * stats["hits"] / lookups if lookups else 0.0
+        return (
+            f"cache: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.1f}% hit rate), "
+            f"{stats['evictions']} evictions, {stats['uncacheable']} uncacheable, "
+            f"{stats['canonicalized']} canonicalized, {stats['entries']} entries in {stats['bytes'] / 2**20:.1f}MB"
+        )
+
+    # Private functions
+
+    def __cached(self, grid, prefix, limit) -> str:
+        """The cached value for a grid: its solution string, or its solution count when there is a limit"""
+        puzzle = grid.to_string()
+        value = self.__lookup(prefix + puzzle)
+        if value is None:
+            value = self.__compute(grid, puzzle, prefix, limit)
+            self.__store(prefix + puzzle, value)
+        else:
+            self.hits += 1
+        return value
+
+    def __compute(self, grid, puzzle, prefix, limit) -> str:
+        """The value for a puzzle that is not cached as given"""
+        propagated = grid.copy()
+        solvable = Propagator(propagated).propagate()
+        if not solvable or propagated.is_solved():
+            self.misses += 1
+            solution = propagated.to_string() if solvable else ""
+            return str(int(solvable)) if limit else solution
+        canonical, transform = self.__canonical_form(grid, puzzle, prefix, limit)
+        value = canonical and self.__lookup(prefix + canonical)
+        if value is not None:
+            self.hits += 1
+            return self.__mapped(value, transform.revert, limit)
+        self.misses += 1
+        if limit:
+            value = str(self._solver.count_solutions(grid, limit))
+        else:
+            solved = self._solver.solve(grid)
+            value = solved.to_string() if solved else ""
+        canonical and self.__store(prefix + canonical, self.__mapped(value, transform.apply, limit))
+        return value
+
+    def __canonical_form(self, grid, puzzle, prefix, limit) -> tuple:
+        """(canonical string, Transform) when an isomorphic puzzle may be cached, else (None, None)"""
+        if sum(1 for value in grid.values if value) < self.geometry.cell_count * SolutionCache.MIN_CLUES:
+            self.uncacheable += 1
+            return None, None
+        fingerprint = SolutionCache.FINGERPRINT + prefix + CanonicalForm.fingerprint(grid)
+        first = self.__lookup(fingerprint)
+        if first is None:
+            self.__store(fingerprint, puzzle)
+            return None, None
+        if first:
+            self.__store(fingerprint, "")
+            self.__store_canonical(first, prefix, limit)
+        return self.__canonicalize(grid)
+
+    def __store_canonical(self, puzzle, prefix, limit) -> None:
+        """Also cache the canonical form of a puzzle that was only cached as given"""
+        value = self.__lookup(prefix + puzzle)
+        if value is None:
+            return
+        canonical, transform = self.__canonicalize(Grid.from_string(puzzle, self.geometry))
+        canonical and self.__store(prefix + canonical, self.__mapped(value, transform.apply, limit))
+
+    def __mapped(self, value, map_grid, limit) -> str:
+        """A cached value mapped through a transformation - counts and "" (no solution) stay as they are"""
+        return value if limit or not value else map_grid(Grid.from_string(value, self.geometry)).to_string()
+
+    def __canonicalize(self, grid) -> tuple:
+        self.canonicalized += 1
+        canonical, transform = CanonicalForm.of(grid)
+        self.uncacheable += canonical is None
+        return canonical, transform
+
+    def __lookup(self, key) -> str:
+        value = self._entries.get(key)
+        value is None or self._entries.move_to_end(key)
+        return value
+
+    def __store(self, key, value) -> None:
+        size = SolutionCache.__entry_size(key, value)
+        old = self._entries.get(key)
+        self.bytes -= 0 if old is None else SolutionCache.__entry_size(key, old)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._entries:
+            self.bytes -= SolutionCache.__entry_size(*self._entries.popitem(last=False))
+            self.evictions += 1
+
+    def __entry_size(key, value) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(value) + SolutionCache.ENTRY_OVERHEAD
@@ -15,31 +15,81 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # -----------------------------------------------------------------------------
 
+import argparse
+import functools
+import os
 import sys
+import time
+from collections import defaultdict
 
 sys.path.insert(0, ".")
 
 from copyright import Copyright
 from commands import Commands
-from display import Display
+from display import Display, echo
+from display_backend import DisplayBackend
+from game_state import GameState
+from geometry import Geometry
 from input import Input
-
-# NOTE: supports different puzzle geometries/shapes - change the following line
-from puzzle_3x3 import Puzzle3x3 as Puzzle
+from key_script import KeyScript
+from latency_stats import LatencyStats
+from rectangular_puzzle import RectangularPuzzle as Puzzle
 
 
 class Main:
     """
-    This runs the generic 3x3 Sudoku puzzle
+    This runs a Sudoku puzzle of rectangular blocks - the classic 3x3 blocks by default
+
+    Usage: python sudoku.py [--blocks ROWSxCOLS] [--game FILE] [--display terminal|null|memory] [--record FILE]
+    (--record writes the keys of the session to FILE, to be replayed with replay.py)
+
+    With `timed`, the time taken by each command (including drawing it) is added to
+    latencies[command]; `splash=False` skips the GNU GPL splash screen; `state` is a GameState
+    to start from instead of the game saved in `game`.
+    (blocks e.g. 2x3, 4x4 for 16x16, 5x5 for 25x25; a saved game is continued and saved on quit)
     """
 
+    def __init__(self, block_rows=3, block_cols=3, game=None, splash=True, timed=False, state=None):
+        self._block_shape = (block_rows, block_cols)
+        self._game = game
+        self._state = state  # The saved game, if main() already loaded it
+        self._splash = splash
+        self.latencies = defaultdict(LatencyStats) if timed else None
+
+    def main(argv=None):
+        args = Main.__parse_args(argv)
+        args.display and Display.use(DisplayBackend.named(args.display))
+        state = Main.__load_game(args.game)
+        shape = (state.block_rows, state.block_cols) if state else args.blocks or (3, 3)
+        if args.blocks and args.blocks != shape:
+            sys.exit(f"The saved game has {shape[0]}x{shape[1]} blocks, not {args.blocks[0]}x{args.blocks[1]}")
+        recorder = args.record and KeyScript.Recorder(args.record, *shape, state and state.to_bytes())
+        Display.recorder = recorder
+        try:
+            Main(*shape, game=args.game, state=state).run()
+        finally:
+            recorder and recorder.close()
+            Display.recorder = None
+
     def run(self):
-        self.__splash()
-        self._puzzle = Puzzle()
+        state = self._state or Main.__load_game(self._game)
+        self._splash and self.__splash()
+        self._puzzle = Puzzle(state.block_rows, state.block_cols) if state else Puzzle(*self._block_shape)
+        state and self._puzzle.restore(state)
+        self._actions = self.__actions()
         self._puzzle.render()
         self.__play()
+        self._game and self._puzzle.state().save(self._game)
         Display.move_to_status_line()
-        print("\n")
+        echo("\n\n")
+
+    def __load_game(game) -> GameState:
+        if not (game and os.path.exists(game)):
+            return None
+        try:
+            return GameState.load(game)
+        except GameState.FormatError as error:
+            sys.exit(f"Cannot continue the saved game: {error}")
 
     def __splash(self):
         Copyright.splash()
@@ -57,15 +107,32 @@ class Main:
 
     def __process_user_input(self):
         cmd = Input.get_cmd()
-        self.__handle_puzzle_value(cmd) if Commands.is_value(cmd) else self.__handle_puzzle_func(cmd)
-
-    def __handle_puzzle_value(self, cmd):
-        self._puzzle.value_(*Commands.val_with_guess(cmd))
+        started = time.perf_counter()
+        self.__dispatch(cmd)
+        Display.flush()
+        self.latencies is None or self.latencies[cmd].add(time.perf_counter() - started)
+
+    def __actions(self) -> dict:
+        """Command -> bound puzzle method for every command the puzzle supports (value keys call value_)"""
+        actions = {key: functools.partial(self._puzzle.value_, *value) for key, value in Commands.VALUES.items()}
+        for name in list(Commands.COMMON_CMDS) + list(Commands.INIT_COMMANDS) + list(Commands.PLAY_COMMANDS):
+            method = name != "#" and getattr(self._puzzle, name + "_", None)
+            method and actions.setdefault(name + "_", method)
+        return actions
+
+    def __dispatch(self, cmd):
+        action = self._actions.get(cmd)
+        if action is None:
+            self.__report_unsupported_func(cmd)
+        elif Commands.is_value(cmd):
+            self.__handle_puzzle_value(action)
+        else:
+            self.__execute_puzzle_func(cmd, action)
+
+    def __handle_puzzle_value(self, action):
+        action()
         self._puzzle.display_status()
 
-    def __handle_puzzle_func(self, cmd):
-        self.__report_unsupported_func(cmd) if not hasattr(self._puzzle, cmd) else self.__execute_puzzle_func(cmd)
-
     def __report_unsupported_func(self, cmd):
         Display.warn(f'This puzzle does not support the "{cmd}" command')
         self.__handle_possible_forced_quit(cmd)
@@ -74,18 +141,32 @@ class Main:
         if not cmd == "quit_":
             return
         Display.move_to_status_line()
-        print("\n" + Display.term.clear_eol + "FORCING quit")
+        echo("\n" + Display.term.clear_eol + "FORCING quit\n")
         self._puzzle.is_playing = False
 
-    def __execute_puzzle_func(self, cmd):
+    def __execute_puzzle_func(self, cmd, action):
         try:
-            getattr(self._puzzle, cmd)()
+            action()
         except Exception as e:
             Display.warn(f'This puzzle\'s "{cmd}" command is broken!')
             self.__handle_possible_forced_quit(cmd)
             return
         self._puzzle.display_status()
 
+    def __parse_args(argv) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(description="Play Sudoku in the terminal")
+        parser.add_argument(
+            "--blocks", type=Geometry.block_shape, help="block rows x columns (default: 3x3, or the saved game's)"
+        )
+        parser.add_argument(
+            "--display", choices=sorted(DisplayBackend.BACKENDS), help="display backend (default: terminal)"
+        )
+        parser.add_argument("--record", metavar="FILE", help="record the keys of the session in FILE (see replay.py)")
+        parser.add_argument(
+            "--game", metavar="FILE", help="continue the game saved in FILE (if any) and save it on quit"
+        )
+        return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    Main().run()
+    Main.main()
@@ -0,0 +1,330 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import itertools
+import sys
+
+sys.path.insert(0, ".")
+
+from candidates import Candidates
+from geometry import Geometry
+from grid import Grid
+from propagator import Propagator
+
+
+class Technique:
+    """
+    A human solving technique that removes candidates.
+
+    Techniques work on the candidate masks of a Grid using the house tables of its geometry.
+    find(grid) returns the eliminations of the first instance of the pattern it finds, as a
+    list of (cell, mask of candidates to remove) - an empty list when there is none.
+    Every technique declares a COST so that drivers can try the cheapest ones first.
+
+    Techniques are registered with TechniqueLadder.register to be used by the ladder.
+    """
+
+    NAME = None
+    COST = 0
+
+    def __init__(self, geometry: Geometry):
+        self.geometry = geometry
+        self._popcount, self._lowest, self._values = Candidates.tables(geometry.size)
+
+    def find(self, grid: Grid) -> list:
+        """The base technique finds nothing - subclasses look for their pattern"""
+        return []
+
+    def _empty_cells(self, grid, cells) -> list:
+        return [cell for cell in cells if not grid.values[cell]]
+
+    def _eliminations(self, grid, cells, mask) -> list:
+        """The (cell, mask) pairs that would actually remove something"""
+        return [(cell, grid.masks[cell] & mask) for cell in cells if grid.masks[cell] & mask and not grid.values[cell]]
+
+
+class TechniqueLadder:
+    """
+    The registered techniques of a geometry, cheapest first.
+
+    - register(technique_class) - add a Technique class to every ladder (usable as a decorator)
+    - of(geometry) - the shared ladder for a geometry
+    - step(propagator) - apply the eliminations of the cheapest technique that finds any;
+      returns that technique (None when none does)
+    - propagate(propagator, limit) - Propagator.propagate() that falls back on the ladder
+      whenever the singles run dry, so it only stops where a guess is needed
+    """
+
+    _technique_classes = []
+    _ladders = {}
+
+    def register(technique_class) -> type:
+        TechniqueLadder._technique_classes.append(technique_class)
+        TechniqueLadder._ladders.clear()
+        return technique_class
+
+    def of(geometry) -> "TechniqueLadder":
+        ladder = TechniqueLadder._ladders.get(geometry)
+        if ladder is None:
+            ladder = TechniqueLadder._ladders[geometry] = TechniqueLadder(geometry)
+        return ladder
+
+    def __init__(self, geometry):
+        techniques = [technique_class(geometry) for technique_class in TechniqueLadder._technique_classes]
+        self.techniques = sorted(techniques, key=lambda technique: technique.COST)
+
+    def step(self, propagator: Propagator) -> Technique:
+        for technique in self.techniques:
+            eliminations = technique.find(propagator.grid)
+            for cell, mask in eliminations:
+                propagator.eliminate(cell, mask)
+            if eliminations:
+                return technique
+        return None
+
+    def propagate(self, propagator: Propagator, limit=None) -> bool:
+        """Returns False if the grid turned out to be contradictory"""
+        target = limit and len(propagator.steps) + limit
+        while propagator.propagate(target and target - len(propagator.steps)):
+            if (target and len(propagator.steps) >= target) or propagator.grid.is_solved() or not self.step(propagator):
+                return True
+        return False
+
+
+@TechniqueLadder.register
+class LockedCandidates(Technique):
+    """
+    Pointing: a value whose candidates in a block all lie on one row/column is removed from the
+    rest of that line.  Claiming: a value whose candidates on a line all lie in one block is
+    removed from the rest of that block.
+    """
+
+    NAME = "locked candidates"
+    COST = 4
+
+    def find(self, grid):
+        geometry = self.geometry
+        unions = [self.__union(grid, cells) for cells in geometry.segments]
+        for segment, union in enumerate(unions):
+            block_rest = line_rest = 0
+            for other in geometry.segment_blocks[segment]:
+                block_rest |= unions[other]
+            for other in geometry.segment_lines[segment]:
+                line_rest |= unions[other]
+            eliminations = self.__eliminations(grid, geometry.segment_lines[segment], union & ~block_rest)
+            eliminations = eliminations or self.__eliminations(
+                grid, geometry.segment_blocks[segment], union & ~line_rest
+            )
+            if eliminations:
+                return eliminations
+        return []
+
+    def __union(self, grid, cells) -> int:
+        mask = 0
+        for cell in cells:
+            if not grid.values[cell]:
+                mask |= grid.masks[cell]
+        return mask
+
+    def __eliminations(self, grid, others, mask) -> list:
+        cells = [cell for other in others for cell in self.geometry.segments[other]]
+        return self._eliminations(grid, cells, mask) if mask else []
+
+
+class NakedSubset(Technique):
+    """SIZE empty cells of a house with only SIZE candidates between them: no other cell of the house can have those"""
+
+    SIZE = None
+
+    def find(self, grid):
+        popcount = self._popcount
+        for house in self.geometry.houses:
+            empty = self._empty_cells(grid, house)
+            small = [cell for cell in empty if popcount[grid.masks[cell]] <= self.SIZE]
+            for subset in itertools.combinations(small, self.SIZE):
+                mask = 0
+                for cell in subset:
+                    mask |= grid.masks[cell]
+                if popcount[mask] == self.SIZE:
+                    eliminations = self._eliminations(grid, [cell for cell in empty if cell not in subset], mask)
+                    if eliminations:
+                        return eliminations
+        return []
+
+
+@TechniqueLadder.register
+class NakedPair(NakedSubset):
+    NAME = "naked pair"
+    COST = 6
+    SIZE = 2
+
+
+@TechniqueLadder.register
+class NakedTriple(NakedSubset):
+    NAME = "naked triple"
+    COST = 10
+    SIZE = 3
+
+
+@TechniqueLadder.register
+class NakedQuad(NakedSubset):
+    NAME = "naked quad"
+    COST = 16
+    SIZE = 4
+
+
+class HiddenSubset(Technique):
+    """
+    SIZE values that can only go in the same SIZE cells of a house: those cells cannot have other values.
+
+    Each open value of a house gets a mask of the positions (among the house's empty cells) where it
+    can go.  Values with more than SIZE positions cannot be part of the subset and are dropped before
+    combining, and a combination is a subset when the union of its position masks has SIZE bits.
+    """
+
+    SIZE = None
+
+    def find(self, grid):
+        popcount = self._popcount
+        for house in self.geometry.houses:
+            empty = self._empty_cells(grid, house)
+            if len(empty) <= self.SIZE:
+                continue
+            positions = {}
+            for index, cell in enumerate(empty):
+                for value in self._values[grid.masks[cell]]:
+                    positions[value] = positions.get(value, 0) | 1 << index
+            few = [(value, positions[value]) for value in sorted(positions) if popcount[positions[value]] <= self.SIZE]
+            for subset in itertools.combinations(few, self.SIZE):
+                where = 0
+                for _value, value_positions in subset:
+                    where |= value_positions
+                if popcount[where] == self.SIZE:
+                    mask = Candidates.mask_of(value for value, _positions in subset)
+                    cells = [cell for index, cell in enumerate(empty) if where >> index & 1]
+                    eliminations = self._eliminations(grid, cells, ~mask)
+                    if eliminations:
+                        return eliminations
+        return []
+
+
+@TechniqueLadder.register
+class HiddenPair(HiddenSubset):
+    NAME = "hidden pair"
+    COST = 8
+    SIZE = 2
+
+
+@TechniqueLadder.register
+class HiddenTriple(HiddenSubset):
+    NAME = "hidden triple"
+    COST = 12
+    SIZE = 3
+
+
+@TechniqueLadder.register
+class HiddenQuad(HiddenSubset):
+    NAME = "hidden quad"
+    COST = 18
+    SIZE = 4
+
+
+class Fish(Technique):
+    """
+    When a value's candidates in SIZE rows all lie in the same SIZE columns, the value is removed
+    from the rest of those columns (and the same with rows and columns swapped).
+    """
+
+    SIZE = None
+
+    def find(self, grid):
+        size = self.geometry.size
+        rows, cols = self.geometry.houses[:size], self.geometry.houses[size : 2 * size]
+        for value in range(1, size + 1):
+            bit = 1 << (value - 1)
+            for base, cover in ((rows, cols), (cols, rows)):
+                eliminations = self.__find(grid, bit, base, cover)
+                if eliminations:
+                    return eliminations
+        return []
+
+    def __find(self, grid, bit, base, cover) -> list:
+        """Look for SIZE lines of `base` where the value's places all lie on the same SIZE lines of `cover`"""
+        lines = []
+        for index, line in enumerate(base):
+            positions = frozenset(
+                pos for pos, cell in enumerate(line) if not grid.values[cell] and grid.masks[cell] & bit
+            )
+            2 <= len(positions) <= self.SIZE and lines.append((index, positions))
+        for subset in itertools.combinations(lines, self.SIZE):
+            positions = frozenset().union(*(positions for _index, positions in subset))
+            if len(positions) == self.SIZE:
+                base_lines = {index for index, _positions in subset}
+                cells = [cell for pos in positions for index, cell in enumerate(cover[pos]) if index not in base_lines]
+                eliminations = self._eliminations(grid, cells, bit)
+                if eliminations:
+                    return eliminations
+        return []
+
+
+@TechniqueLadder.register
+class XWing(Fish):
+    NAME = "x-wing"
+    COST = 14
+    SIZE = 2
+
+
+@TechniqueLadder.register
+class Swordfish(Fish):
+    NAME = "swordfish"
+    COST = 20
+    SIZE = 3
+
+
+@TechniqueLadder.register
+class XYWing(Technique):
+    """
+    A pivot cell with candidates {x, y} sees two pincer cells with {x, z} and {y, z}: whichever
+    value the pivot takes, one pincer is z - so z is removed from every cell that sees both pincers.
+    """
+
+    NAME = "xy-wing"
+    COST = 15
+
+    def __init__(self, geometry):
+        super().__init__(geometry)
+        self._peer_sets = tuple(frozenset(peers) for peers in geometry.peers)
+
+    def find(self, grid):
+        masks, popcount = grid.masks, self._popcount
+        pairs = [cell for cell, value in enumerate(grid.values) if not value and popcount[masks[cell]] == 2]
+        is_pair = set(pairs)
+        for pivot in pairs:
+            pivot_mask = masks[pivot]
+            pincers = [
+                cell
+                for cell in self.geometry.peers[pivot]
+                if cell in is_pair and popcount[masks[cell] & pivot_mask] == 1
+            ]
+            for first, second in itertools.combinations(pincers, 2):
+                z = masks[first] & ~pivot_mask
+                if z == masks[second] & ~pivot_mask and masks[first] & pivot_mask != masks[second] & pivot_mask:
+                    cells = (self._peer_sets[first] & self._peer_sets[second]) - {pivot}
+                    eliminations = self._eliminations(grid, sorted(cells), z)
+                    if eliminations:
+                        return eliminations
+        return []
@@ -0,0 +1,77 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from backtracking_solver import BacktrackingSolver
+from geometry import Geometry
+from grid import Grid
+
+HARD = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+HARD_SOLUTION = "417369825632158947958724316825437169791586432346912758289643571573291684164875293"
+
+
+class TestGridTrail(TestCase):
+    def test_undo_rolls_back_placements_and_candidate_removals(self):
+        grid = Grid.from_string(HARD)
+        values, masks = list(grid.values), list(grid.masks)
+        grid.trail = []
+        grid.place(1, 1)
+        grid.place(2, 2)
+        self.assertNotEqual(grid.masks, masks)
+        grid.undo(0)
+        self.assertEqual((grid.values, grid.masks, grid.trail), (values, masks, []))
+
+
+class TestBacktrackingSolver(TestCase):
+    solver = BacktrackingSolver()
+
+    def test_solves_a_hard_puzzle_without_changing_it(self):
+        grid = Grid.from_string(HARD)
+        self.assertEqual(self.solver.solve(grid).to_string(), HARD_SOLUTION)
+        self.assertEqual(grid.to_string(), HARD)
+
+    def test_counts_solutions_up_to_the_limit(self):
+        self.assertEqual(self.solver.count_solutions(Grid.from_string(HARD)), 1)
+        self.assertEqual(self.solver.count_solutions(Grid.from_string("." * 81), limit=4), 4)
+        self.assertEqual(self.solver.count_solutions(Grid.from_string("11" + "." * 79)), 0)
+
+    def test_uniqueness(self):
+        self.assertEqual(self.solver.uniqueness(Grid.from_string(HARD)), BacktrackingSolver.UNIQUE)
+        self.assertEqual(self.solver.uniqueness(Grid.from_string("." * 81)), BacktrackingSolver.MULTIPLE)
+        self.assertEqual(self.solver.uniqueness(Grid.from_string("11" + "." * 79)), BacktrackingSolver.NO_SOLUTION)
+
+    def test_uniqueness_is_unknown_when_the_search_runs_out_of_guesses(self):
+        self.assertEqual(self.solver.uniqueness(Grid.from_string(HARD), max_nodes=1), BacktrackingSolver.UNKNOWN)
+        self.assertIsNone(self.solver.count_solutions(Grid.from_string(HARD), max_nodes=1))
+        self.assertEqual(self.solver.count_solutions(Grid.from_string(HARD), max_nodes=10**6), 1)
+
+    def test_other_geometries(self):
+        self.assertTrue(BacktrackingSolver(Geometry.of(2, 3)).solve(Grid(Geometry.of(2, 3))).is_solved())
+
+    def test_large_geometries(self):
+        for shape in ((4, 4), (5, 5)):
+            geometry = Geometry.of(*shape)
+            solution = BacktrackingSolver(geometry).solve(Grid(geometry))
+            self.assertTrue(solution.is_solved() and solution.is_consistent(), shape)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import io
+import os
+import re
+import sys
+import tempfile
+from contextlib import redirect_stderr
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from batch_solve import BatchSolve
+from latency_stats import LatencyStats
+
+HARD = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+HARD_SOLUTION = "417369825632158947958724316825437169791586432346912758289643571573291684164875293"
+
+
+class TestLatencyStats(TestCase):
+    def test_percentiles_are_approximately_right(self):
+        stats = LatencyStats()
+        for ms in range(1, 101):
+            stats.add(ms / 1000)
+        self.assertEqual(stats.count, 100)
+        self.assertAlmostEqual(stats.percentile(50), 0.050, delta=0.050 * 0.13)
+        self.assertAlmostEqual(stats.percentile(99), 0.099, delta=0.099 * 0.13)
+        self.assertEqual(stats.percentile(100), 0.100)
+
+    def test_empty_stats_report_zero(self):
+        self.assertEqual(LatencyStats().percentile(50), 0.0)
+        self.assertIn("0 puzzles", LatencyStats().report())
+
+
+class TestBatchSolve(TestCase):
+    def test_solve_lines_skips_blank_and_comment_lines(self):
+        lines = io.StringIO(f"# header\n{HARD}\n\n{'11' + '.' * 79}\nbad\n")
+        batch = BatchSolve()
+        results = list(batch.solve_lines(lines))
+        self.assertEqual(results[:2], [HARD_SOLUTION, BatchSolve.NO_SOLUTION])
+        self.assertTrue(results[2].startswith("error:"))
+        self.assertEqual((batch.stats.count, batch.unsolved), (3, 2))
+
+    def test_parallel_results_come_back_in_input_order(self):
+        easy = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+        easy_solution = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+        lines = [HARD, easy, "bad"] * 5
+        batch = BatchSolve()
+        results = list(batch.solve_lines_parallel(lines, jobs=2, chunk_size=2))
+        self.assertEqual(results[:2] * 5, [r for r in results if not r.startswith("error:")])
+        self.assertEqual(results[:2], [HARD_SOLUTION, easy_solution])
+        self.assertEqual((batch.stats.count, batch.unsolved), (15, 5))
+
+    def test_parallel_cache_counters_are_summed_over_the_workers(self):
+        batch = BatchSolve(cache_bytes=2**20)
+        self.assertEqual(list(batch.solve_lines_parallel([HARD] * 8, jobs=2, chunk_size=2)), [HARD_SOLUTION] * 8)
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            batch.report()
+        hits, misses = map(int, re.search(r"cache: (\d+) hits, (\d+) misses", stderr.getvalue()).groups())
+        self.assertEqual(hits + misses, 8)
+        self.assertIn("summed over", stderr.getvalue())
+
+    def test_check_reports_uniqueness(self):
+        lines = [HARD, "." * 81, "11" + "." * 79]
+        results = list(BatchSolve(check=True).solve_lines(lines))
+        self.assertEqual(results, ["unique", "multiple", "none"])
+
+    def test_check_goes_through_the_cache(self):
+        batch = BatchSolve(cache_bytes=2**20, check=True)
+        self.assertEqual(list(batch.solve_lines([HARD] * 3)), ["unique"] * 3)
+        self.assertEqual((batch.cache.hits, batch.cache.misses), (2, 1))
+
+    def test_vectorized_chunks_give_the_same_results(self):
+        lines = [HARD, "11" + "." * 79, "bad"]
+        self.assertEqual(list(BatchSolve(vectorized=True).solve_lines(lines)), list(BatchSolve().solve_lines(lines)))
+
+    def test_main_streams_file_to_file_with_each_solver(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            puzzles, solutions = os.path.join(tmp, "in.txt"), os.path.join(tmp, "out.txt")
+            with open(puzzles, "w") as f:
+                f.write(HARD + "\n" + HARD.replace(".", "0") + "\n")
+            for solver in BatchSolve.SOLVERS:
+                stderr = io.StringIO()
+                with redirect_stderr(stderr):
+                    BatchSolve.main([puzzles, "-o", solutions, "--solver", solver])
+                with open(solutions) as f:
+                    self.assertEqual(f.read(), (HARD_SOLUTION + "\n") * 2)
+                self.assertIn("2 puzzles", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    main()
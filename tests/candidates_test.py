@@ -0,0 +1,54 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from candidates import Candidates
+
+
+class TestCandidates(TestCase):
+    def test_full_mask_has_all_values(self):
+        self.assertEqual(Candidates.full(9), 0b111111111)
+
+    def test_mask_of_values(self):
+        self.assertEqual(Candidates.mask_of([1, 3, 9]), 0b100000101)
+        self.assertEqual(Candidates.mask_of([]), 0)
+
+    def test_tables_for_9_values(self):
+        popcount, lowest, values = Candidates.tables(9)
+        mask = Candidates.mask_of([2, 5, 7])
+        self.assertEqual(popcount[mask], 3)
+        self.assertEqual(lowest[mask], 2)
+        self.assertEqual(values[mask], (2, 5, 7))
+        self.assertEqual((popcount[0], lowest[0], values[0]), (0, 0, ()))
+
+    def test_tables_are_shared_per_size(self):
+        self.assertIs(Candidates.tables(9), Candidates.tables(9))
+
+    def test_wide_tables_compute_entries_on_demand(self):
+        popcount, lowest, values = Candidates.tables(25)
+        mask = Candidates.mask_of([4, 17, 25])
+        self.assertEqual(popcount[mask], 3)
+        self.assertEqual(lowest[mask], 4)
+        self.assertEqual(values[mask], (4, 17, 25))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ from unittest.mock import MagicMock
 sys.path.insert(0, ".")
 
 from cell import Cell
+from display_attrs import DisplayAttrs
 
 
 class TestCell(TestCase):
@@ -53,6 +54,33 @@ class TestCell(TestCase):
     def test_cell_value_has_limits_set_by_parent(self):
         self.assertRaises(ValueError, self.cell.set, self.MAX_VALUE)
 
+    def test_cell_starts_with_all_values_possible(self):
+        self.assertEqual(self.cell.possible_values(), tuple(range(1, self.MAX_VALUE)))
+
+    def test_cell_possible_values_shrink_and_grow(self):
+        self.cell.remove_possible(3)
+        self.cell.remove_possible(7)
+        self.assertFalse(self.cell.is_possible(3))
+        self.assertEqual(self.cell.possible_values(), (1, 2, 4, 5, 6, 8, 9))
+        self.cell.add_possible(3)
+        self.assertEqual(self.cell.possible_values(), (1, 2, 3, 4, 5, 6, 8, 9))
+
+    def test_cell_conflict_is_set_by_parent_and_kept_while_value_is_unchanged(self):
+        self.parent.remove_possible.side_effect = lambda row, col, value: self.cell.set_conflict(
+            DisplayAttrs.CONFLICTING
+        )
+        self.cell.set(4)
+        self.assertEqual(self.cell.conflict(), DisplayAttrs.CONFLICTING)
+        self.cell.set(4, {DisplayAttrs.GUESS})
+        self.assertEqual(self.cell.attr(), {DisplayAttrs.GUESS, DisplayAttrs.CONFLICTING})
+        self.cell.set(None)
+        self.assertIsNone(self.cell.conflict())
+
+    def test_set_conflict_reports_changes(self):
+        self.assertTrue(self.cell.set_conflict(DisplayAttrs.CONFLICTED))
+        self.assertFalse(self.cell.set_conflict(DisplayAttrs.CONFLICTED))
+        self.assertTrue(self.cell.set_conflict(None))
+
     def test_cell_can_render(self):
         self.cell.render()
 
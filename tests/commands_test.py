@@ -0,0 +1,96 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from commands import Commands
+from display import Display
+from display_backend import MemoryBackend, NullBackend
+
+
+class TestCommands(TestCase):
+    def tearDown(self):
+        Commands.configure(9)
+        return super().tearDown()
+
+    def test_9_values_are_digits(self):
+        Commands.configure(9)
+        self.assertTrue(Commands.is_value("9"))
+        self.assertFalse(Commands.is_value("a"))
+        self.assertEqual(Commands.val_with_guess("("), (9, True))
+        self.assertIn("a", Commands.PLAY_COMMANDS["auto"]["keys"])
+
+    def test_small_puzzles_only_accept_their_values(self):
+        Commands.configure(6)
+        self.assertTrue(Commands.is_value("6"))
+        self.assertFalse(Commands.is_value("7"))
+        self.assertFalse(Commands.is_value("&"))
+        self.assertEqual(Commands.COMMON_CMDS["#"]["short"], "1-6/shift=guess")
+
+    def test_values_beyond_9_are_letters(self):
+        Commands.configure(16)
+        self.assertEqual(Commands.val_with_guess("a"), (10, False))
+        self.assertEqual(Commands.val_with_guess("G"), (16, True))
+        self.assertFalse(Commands.is_value("h"))
+        self.assertEqual(Commands.COMMON_CMDS["#"]["short"], "1-9,a-g/shift=guess")
+
+    def test_command_keys_taken_by_values_are_dropped(self):
+        Commands.configure(25)
+        self.assertNotIn("a", Commands.PLAY_COMMANDS["auto"]["keys"])
+        self.assertIn("=", Commands.PLAY_COMMANDS["auto"]["keys"])
+        self.assertEqual(Commands.PLAY_COMMANDS["auto"]["short"], "=")
+        self.assertEqual(Commands.COMMON_CMDS["up"]["keys"], ["KEY_UP"])
+        self.assertIn("q", Commands.COMMON_CMDS["quit"]["keys"])
+        Commands.configure(9)
+        self.assertIn("k", Commands.COMMON_CMDS["up"]["keys"])
+        self.assertEqual(Commands.PLAY_COMMANDS["auto"]["short"], "a/=")
+
+    def test_keys_are_compiled_into_commands_per_mode(self):
+        Commands.use(Commands.PLAY)
+        self.assertEqual(
+            (Commands.command("KEY_ESCAPE"), Commands.command("u"), Commands.command("7")), ("init_", "undo_", "7")
+        )
+        Commands.use(Commands.INIT)
+        self.assertEqual((Commands.command("KEY_ESCAPE"), Commands.command("u")), ("play_", None))
+        self.assertIn("play", Commands.CMDS)
+        with self.assertRaises(TypeError):
+            Commands.KEYMAP["x"] = "quit_"
+
+    def test_configure_recompiles_the_keys(self):
+        Commands.configure(16)
+        self.assertEqual((Commands.command("a"), Commands.command("=")), ("a", None))
+        Commands.use(Commands.PLAY)
+        self.assertEqual((Commands.command("a"), Commands.command("=")), ("a", "auto_"))
+
+    def test_help_is_styled_by_the_display_backend_in_use(self):
+        previous = Display.backend
+        try:
+            Display.use(NullBackend())
+            self.assertTrue(Commands.short_help().endswith("PLAY=ESC [initializing]"))
+            Display.use(MemoryBackend())
+            self.assertIn(Display.term.yellow("[initializing]"), Commands.short_help())
+            Commands.use(Commands.PLAY)
+            self.assertIn(Display.term.yellow("[hidden]") + " Hit ESC", Commands.long_help())
+        finally:
+            Display.use(previous)
+
+
+if __name__ == "__main__":
+    main()
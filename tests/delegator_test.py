@@ -0,0 +1,67 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from delegator import Delegator
+from delegator_bench import DelegatorBench
+
+
+class Target:
+    def __init__(self):
+        self.calls = []
+
+    def record(self, value):
+        self.calls.append(value)
+        return len(self.calls)
+
+    def hidden(self):
+        return "hidden"
+
+
+class TestDelegator(TestCase):
+    def setUp(self):
+        self.target = Target()
+        self.delegator = Delegator({self.target: ["record"]})
+        return super().setUp()
+
+    def test_delegated_methods_call_the_target(self):
+        self.assertEqual(self.delegator.record(5), 1)
+        self.assertEqual(self.target.calls, [5])
+
+    def test_delegated_methods_are_bound_when_the_delegator_is_initialized(self):
+        self.assertIn("record", vars(self.delegator))
+        self.assertIs(self.delegator.record.__self__, self.target)
+
+    def test_only_the_listed_methods_are_delegated(self):
+        self.assertRaises(AttributeError, getattr, self.delegator, "hidden")
+
+    def test_a_method_missing_on_the_target_fails_when_the_delegator_is_initialized(self):
+        self.assertRaises(AttributeError, Delegator, {self.target: ["record", "missing"]})
+
+    def test_the_benchmark_times_every_delegated_call(self):
+        results = DelegatorBench.run(number=10, repeat=1)
+        self.assertEqual(list(results), list(DelegatorBench.CALLS))
+        self.assertTrue(all(lookup > 0 and bound > 0 for lookup, bound in results.values()))
+
+
+if __name__ == "__main__":
+    main()
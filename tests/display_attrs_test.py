@@ -65,6 +65,16 @@ class TestDisplayRenderAttrs(TestCase):
         out = DisplayAttrs.render((DisplayAttrs.GUESS, dict(level=75)))
         self.assertEqual(out, "green_on_gray75")
 
+    def test_hashable_level_renders_like_a_level_dict(self):
+        out = DisplayAttrs.render({DisplayAttrs.GUESS, DisplayAttrs.Level(75)})
+        self.assertEqual(out, "green_on_gray75")
+
+    def test_signature_is_hashable_and_level_dicts_match_levels(self):
+        signature = DisplayAttrs.signature([DisplayAttrs.GUESS, dict(level=75)])
+        self.assertEqual(signature, DisplayAttrs.signature({DisplayAttrs.GUESS, DisplayAttrs.Level(75)}))
+        self.assertNotEqual(signature, DisplayAttrs.signature({DisplayAttrs.GUESS, DisplayAttrs.Level(50)}))
+        self.assertEqual({signature: 1}[DisplayAttrs.signature((DisplayAttrs.Level(75), DisplayAttrs.GUESS))], 1)
+
     def test_conflicting_value_renders_boldred_on_yellow(self):
         out = DisplayAttrs.render(DisplayAttrs.CONFLICTING)
         self.assertEqual(out, "boldred_on_yellow")
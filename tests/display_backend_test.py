@@ -0,0 +1,87 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from display import Display
+from display_attrs import DisplayAttrs
+from display_backend import DisplayBackend, MemoryBackend, NullBackend
+from input import Input
+from puzzle_3x3 import Puzzle3x3
+
+
+class TestDisplayBackend(TestCase):
+    def setUp(self):
+        self.previous = Display.backend
+        self.memory = MemoryBackend()
+        Display.use(self.memory)
+        return super().setUp()
+
+    def tearDown(self):
+        Display.use(self.previous)
+        return super().tearDown()
+
+    def test_backends_are_selected_by_name(self):
+        self.assertIsInstance(DisplayBackend.named("null"), NullBackend)
+        self.assertIsInstance(DisplayBackend.named("memory"), MemoryBackend)
+        with self.assertRaises(ValueError):
+            DisplayBackend.named("paper")
+
+    def test_the_memory_screen_shows_the_puzzle(self):
+        puzzle = Puzzle3x3()
+        puzzle.render()
+        puzzle.selected_cell = (0, 0)
+        puzzle.value_(5)
+        Display.move_to_cell(0, 0)
+        self.assertEqual(self.memory.line(0), "█" * (9 * Display.CELL_WIDTH + 1))
+        self.assertEqual(self.memory.line(1)[:7], "█  5  │")
+        self.assertEqual(self.memory.attr(3, 1), DisplayAttrs.render({DisplayAttrs.INITIAL}))
+        self.assertTrue(self.memory.line(Display.status_line_location()[1]).startswith("HELP=?"))
+
+    def test_a_frame_is_one_write(self):
+        Display.geometry({"h_cells": 9, "v_cells": 9})
+        puzzle = Puzzle3x3()
+        Display.clear_screen()
+        puzzle.render()
+        writes = self.memory.writes
+        for row in range(9):
+            puzzle.cell(row, row).update(row + 1)
+        Display.flush()
+        self.assertEqual(self.memory.writes, writes + 1)
+
+    def test_warnings_are_restored_to_the_cursor(self):
+        Display.geometry({"h_cells": 9, "v_cells": 9})
+        Display.move_to_cell(1, 1)
+        Display.warn("careful")
+        self.assertEqual(self.memory.line(Display.status_line_location()[1]), "careful")
+        self.assertEqual(self.memory._cursor, (Display.x(1) + Display.CELL_WIDTH // 2, Display.y(1) + 1))
+
+    def test_headless_keys_are_decoded_into_commands(self):
+        backend = NullBackend()
+        Display.use(backend)
+        backend.feed("?", "KEY_UP", "7")
+        self.assertEqual([Input.get_cmd() for _key in range(3)], ["help_", "up_", "7"])
+        self.assertEqual(Input.get_cmd(timeout=0), "timeout")
+        self.assertEqual(Input.get_cmd(), "quit_")
+
+
+if __name__ == "__main__":
+    main()
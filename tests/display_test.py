@@ -23,6 +23,7 @@ sys.path.insert(0, ".")
 from unittest import main, TestCase
 
 from display import Display, Border
+from display_attrs import DisplayAttrs
 
 
 class TestDisplay(TestCase):
@@ -47,6 +48,24 @@ class TestDisplay(TestCase):
     def test_warn(self0):
         Display.warn("Testing - this line should be yellow")
 
+    def test_cells_are_only_sent_when_they_change(self):
+        Display.clear_screen()
+        self.draw_block(0, 0)
+        self.assertNotEqual(Display.frame.frame(lambda x, y: "", ""), "")
+        self.draw_block(0, 0)
+        Display.draw_cell_value(1, 1, 5)
+        self.assertEqual(
+            Display.frame.frame(lambda x, y: "", ""), getattr(Display.term, DisplayAttrs.render(set())) + "5"
+        )
+
+    def test_cell_frames_and_attributes_are_rendered_once_per_signature(self):
+        Display.draw_cell(0, 0, Border({Border.TOP}), [DisplayAttrs.GUESS, dict(level=50)])
+        rendered = len(Display._rendered)
+        Display.draw_cell(4, 4, Border({Border.TOP}), {DisplayAttrs.GUESS, DisplayAttrs.Level(50)})
+        Display.draw_cell_value(4, 4, 3, {DisplayAttrs.GUESS, DisplayAttrs.Level(50)})
+        Display.draw_cell_value(5, 5, 3, {DisplayAttrs.GUESS, DisplayAttrs.Level(50)})
+        self.assertEqual(len(Display._rendered), rendered + 1)
+
     def draw_block(self, block_row, block_col):
         Display.draw_cell(row=block_row * 3 + 0, col=block_col * 3 + 0, border=Border({Border.TOP, Border.LEFT}))
         Display.draw_cell(row=block_row * 3 + 0, col=block_col * 3 + 1, border=Border({Border.TOP}))
@@ -0,0 +1,66 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from dlx_solver import DlxSolver
+from geometry import Geometry
+from grid import Grid
+
+HARD = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+HARD_SOLUTION = "417369825632158947958724316825437169791586432346912758289643571573291684164875293"
+
+
+class TestDlxSolver(TestCase):
+    solver = DlxSolver()
+
+    def test_solves_a_hard_puzzle(self):
+        self.assertEqual(self.solver.solve(Grid.from_string(HARD)).to_string(), HARD_SOLUTION)
+
+    def test_links_are_restored_after_each_solve(self):
+        links = (list(self.solver._left), list(self.solver._right), list(self.solver._up), list(self.solver._down))
+        self.solver.solve(Grid.from_string(HARD))
+        self.solver.count_solutions(Grid.from_string("." * 81), limit=5)
+        self.solver.solve(Grid.from_string("11" + "." * 79))
+        self.assertEqual((self.solver._left, self.solver._right, self.solver._up, self.solver._down), links)
+
+    def test_counts_solutions_up_to_the_limit(self):
+        self.assertEqual(self.solver.count_solutions(Grid.from_string(HARD)), 1)
+        self.assertEqual(self.solver.count_solutions(Grid.from_string("." * 81), limit=3), 3)
+        self.assertEqual(self.solver.count_solutions(Grid.from_string("11" + "." * 79)), 0)
+
+    def test_conflicting_givens_have_no_solution(self):
+        self.assertIsNone(self.solver.solve(Grid.from_string("1" + "." * 8 + "1" + "." * 71)))
+
+    def test_values_beyond_the_geometry_are_rejected(self):
+        for cell in (0, 80):
+            values = [0] * 81
+            values[cell] = 10
+            self.assertRaises(ValueError, self.solver.solve, Grid(Geometry.of(3, 3), values))
+        self.assertRaises(ValueError, self.solver.solve, Grid(Geometry.of(2, 3)))
+
+    def test_other_geometries(self):
+        solver = DlxSolver(Geometry.of(2, 3))
+        solution = solver.solve(Grid(Geometry.of(2, 3)))
+        self.assertTrue(solution.is_solved())
+
+
+if __name__ == "__main__":
+    main()
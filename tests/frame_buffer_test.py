@@ -0,0 +1,82 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from frame_buffer import FrameBuffer
+
+
+def move(x, y):
+    return f"<{x},{y}>"
+
+
+NORMAL = "|"
+
+
+class TestFrameBuffer(TestCase):
+    def setUp(self):
+        self.frame = FrameBuffer(10, 3)
+        return super().setUp()
+
+    def test_only_changed_runs_are_sent(self):
+        self.frame.put(0, 0, "abc")
+        self.frame.put(2, 2, "xy", "[red]")
+        self.assertEqual(self.frame.frame(move, NORMAL), "<0,0>abc<2,2>|[red]xy|")
+        self.assertEqual(self.frame.frame(move, NORMAL), "")
+
+    def test_redrawing_the_same_content_sends_nothing(self):
+        self.frame.put(0, 1, "same", "[bold]")
+        self.frame.frame(move, NORMAL)
+        self.frame.put(0, 1, "same", "[bold]")
+        self.frame.put(0, 1, "sa")
+        self.frame.put(0, 1, "sa", "[bold]")
+        self.assertEqual(self.frame.frame(move, NORMAL), "")
+
+    def test_attribute_changes_are_sent(self):
+        self.frame.put(0, 0, "ab")
+        self.frame.frame(move, NORMAL)
+        self.frame.put(1, 0, "b", "[red]")
+        self.assertEqual(self.frame.frame(move, NORMAL), "<1,0>|[red]b|")
+
+    def test_runs_with_small_gaps_are_merged(self):
+        self.frame.put(0, 0, "abcdefghij")
+        self.frame.frame(move, NORMAL)
+        self.frame.put(0, 0, "A")
+        self.frame.put(2, 0, "C")
+        self.frame.put(9, 0, "J")
+        self.assertEqual(self.frame.frame(move, NORMAL), "<0,0>AbC<9,0>J")
+
+    def test_text_is_clipped_to_the_screen(self):
+        self.frame.put(-2, 0, "abcd")
+        self.frame.put(8, 1, "xyz")
+        self.frame.put(0, 3, "out")
+        self.assertEqual(self.frame.frame(move, NORMAL), "<0,0>cd<8,1>xy")
+
+    def test_nothing_is_shown_after_a_clear(self):
+        self.frame.put(0, 0, "abc")
+        self.frame.frame(move, NORMAL)
+        self.frame.clear()
+        self.frame.put(0, 0, "abc")
+        self.assertEqual(self.frame.frame(move, NORMAL), "<0,0>abc")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import dataclasses
+import os
+import struct
+import sys
+import tempfile
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from display_attrs import DisplayAttrs
+from game_state import GameState
+from puzzle_3x3 import Puzzle3x3
+from sudoku import Main
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+
+
+class TestGameState(TestCase):
+    def setUp(self):
+        self.puzzle = Puzzle3x3()
+        for cell, char in enumerate(EASY):
+            char != "0" and self.enter(self.puzzle, cell // 9, cell % 9, int(char))
+        self.puzzle.play_()
+        self.enter(self.puzzle, 0, 0, 4)
+        self.enter(self.puzzle, 0, 1, 8, guess=True)
+        self.enter(self.puzzle, 0, 3, 3)  # Conflicts with the given 3s of row 0
+        self.path = os.path.join(tempfile.mkdtemp(), "game.sdk")
+        return super().setUp()
+
+    def tearDown(self):
+        os.path.exists(self.path) and os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+        return super().tearDown()
+
+    def enter(self, puzzle, row, col, value, guess=False):
+        puzzle.selected_cell = (row, col)
+        puzzle.value_(value, guess)
+
+    def cells(self, puzzle):
+        cells = [puzzle.cell(cell // 9, cell % 9) for cell in range(81)]
+        return [(cell.value(), cell.candidates(), cell.attr()) for cell in cells]
+
+    def restored(self) -> Puzzle3x3:
+        self.puzzle.state().save(self.path)
+        puzzle = Puzzle3x3()
+        puzzle.restore(GameState.load(self.path))
+        return puzzle
+
+    def test_a_saved_game_is_restored_as_it_was(self):
+        puzzle = self.restored()
+        self.assertEqual(self.cells(puzzle), self.cells(self.puzzle))
+        self.assertEqual(puzzle.cell(0, 3).conflict(), DisplayAttrs.CONFLICTING)
+        self.assertEqual(
+            (puzzle._bg_level, puzzle.selected_cell, puzzle._initializing, puzzle._history.length()),
+            (Puzzle3x3.BG_LEVEL_DELTA, (0, 3), False, 3),
+        )
+
+    def test_a_restored_game_can_be_undone_and_played_on(self):
+        puzzle = self.restored()
+        puzzle.undo_()
+        self.assertIsNone(puzzle.cell(0, 3).value())
+        self.assertIsNone(puzzle.cell(0, 2).conflict())
+        puzzle.undo_()
+        self.assertEqual(puzzle._bg_level, 0)
+        self.assertTrue(puzzle.cell(0, 1).is_possible(8))
+        self.enter(puzzle, 0, 1, 4)
+        self.assertEqual(puzzle.cell(0, 1).conflict(), DisplayAttrs.CONFLICTING)
+
+    def test_loaded_arrays_are_views_of_the_file(self):
+        self.puzzle.state().save(self.path)
+        state = GameState.load(self.path)
+        self.assertIsInstance(state.candidates, memoryview)
+        self.assertEqual(state.to_bytes(), self.puzzle.state().to_bytes())
+        self.assertEqual(os.path.getsize(self.path), GameState.HEADER.size + 81 * (4 + 2 + 1 + 1) + 3 * 4)
+
+    def test_only_saved_games_of_this_version_are_loaded(self):
+        data = self.puzzle.state().to_bytes()
+        for bad in (b"", b"XXXX" + data[4:], data[:4] + b"\x63\x00" + data[6:], data[:-1]):
+            with self.assertRaises(GameState.FormatError):
+                GameState.from_buffer(bad)
+        with open(self.path, "wb"):
+            pass
+        with self.assertRaises(GameState.FormatError):
+            GameState.load(self.path)
+
+    def test_the_block_shape_and_size_are_checked_before_anything_is_built(self):
+        data = self.puzzle.state().to_bytes()
+        for bad in (data[:6] + b"\xff\xff" + data[8:], data[:6] + b"\x00\x03" + data[8:], data + b"\x00"):
+            with self.assertRaises(GameState.FormatError):
+                GameState.from_buffer(bad)
+
+    def test_cells_history_and_selected_cell_that_do_not_fit_the_grid_are_refused(self):
+        data = self.puzzle.state().to_bytes()
+        history = GameState.HEADER.size + 81 * 4
+        levels = history + 3 * 4
+        values, attrs = levels + 81 * 2, levels + 81 * 3
+        entry = struct.unpack_from("<I", data, history)[0]
+        corruptions = (
+            (values, bytes([10])),  # Value over 9
+            (attrs, bytes([3])),  # Primary attribute code 3
+            (attrs, bytes([3 << 2])),  # Conflict code 3
+            (history, struct.pack("<I", entry & ~0xFFFF | 81)),  # Cell id past the grid
+            (history, struct.pack("<I", entry & ~(0x1F << 16) | 10 << 16)),  # Value over 9
+            (9, bytes([9])),  # Selected row past the grid
+        )
+        for offset, corruption in corruptions:
+            with self.assertRaises(GameState.FormatError):
+                GameState.from_buffer(data[:offset] + corruption + data[offset + len(corruption) :])
+        self.assertEqual(GameState.from_buffer(data).to_bytes(), data)
+
+    def test_a_game_of_another_block_shape_is_refused(self):
+        with self.assertRaises(ValueError):
+            self.puzzle.restore(dataclasses.replace(self.puzzle.state(), block_cols=2))
+
+    def test_blocks_that_do_not_match_the_saved_game_are_refused(self):
+        self.puzzle.state().save(self.path)
+        with self.assertRaises(SystemExit) as exit:
+            Main.main(["--blocks", "2x3", "--game", self.path])
+        self.assertIn("3x3", str(exit.exception))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import random
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from backtracking_solver import BacktrackingSolver
+from generator import Generator
+from geometry import Geometry
+from grid import Grid
+
+
+class TestGenerator(TestCase):
+    solver = BacktrackingSolver()
+
+    def test_generated_puzzle_is_unique_and_minimal(self):
+        puzzle = Generator().generate(random.Random(1))
+        self.assertEqual(self.solver.uniqueness(puzzle), BacktrackingSolver.UNIQUE)
+        for cell, value in enumerate(puzzle.values):
+            if value:
+                values = list(puzzle.values)
+                values[cell] = 0
+                self.assertEqual(self.solver.uniqueness(Grid(puzzle.geometry, values)), BacktrackingSolver.MULTIPLE)
+
+    def test_symmetry_is_kept(self):
+        values = Generator(symmetry=Generator.ROTATIONAL).generate(random.Random(2)).values
+        self.assertEqual([bool(value) for value in values], [bool(value) for value in reversed(values)])
+
+    def test_output_is_reproducible_for_any_number_of_processes(self):
+        generator = Generator()
+        serial = list(generator.generate_many(3, seed=5))
+        self.assertEqual(list(generator.generate_many(3, seed=5, jobs=2)), serial)
+        self.assertNotEqual(list(generator.generate_many(3, seed=6)), serial)
+
+    def test_other_geometries(self):
+        geometry = Geometry.of(2, 3)
+        puzzle = Generator(geometry).generate(random.Random(3))
+        self.assertEqual(BacktrackingSolver(geometry).uniqueness(puzzle), BacktrackingSolver.UNIQUE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from geometry import Geometry
+
+
+class TestGeometry(TestCase):
+    def test_geometry_is_shared_per_block_shape(self):
+        self.assertIs(Geometry.of(3, 3), Geometry.of(3, 3))
+        self.assertIsNot(Geometry.of(3, 3), Geometry.of(2, 3))
+
+    def test_block_shapes_are_limited_to_25_values(self):
+        self.assertTrue(all(Geometry.is_shape(*shape) for shape in ((1, 1), (2, 3), (5, 5), (1, 25))))
+        self.assertFalse(any(Geometry.is_shape(*shape) for shape in ((0, 3), (3, 0), (5, 6), (255, 255))))
+
+    def test_block_shapes_are_parsed_from_text(self):
+        self.assertEqual((Geometry.block_shape("2x3"), Geometry.block_shape("4X4")), ((2, 3), (4, 4)))
+        for text in ("3", "3x", "axb", "0x3", "5x6"):
+            self.assertRaises(argparse.ArgumentTypeError, Geometry.block_shape, text)
+
+    def test_9x9_houses(self):
+        geom = Geometry.of(3, 3)
+        self.assertEqual((geom.size, geom.cell_count, len(geom.houses)), (9, 81, 27))
+        self.assertEqual(geom.houses[0], tuple(range(9)))
+        self.assertEqual(geom.houses[9], tuple(range(0, 81, 9)))
+        self.assertEqual(geom.houses[18 + 4], (30, 31, 32, 39, 40, 41, 48, 49, 50))
+
+    def test_9x9_peers(self):
+        geom = Geometry.of(3, 3)
+        cell = geom.cell_id(4, 4)
+        self.assertEqual(geom.cell_houses[cell], (4, 13, 22))
+        self.assertEqual(len(geom.peers[cell]), 20)
+        self.assertNotIn(cell, geom.peers[cell])
+        self.assertIn(geom.cell_id(3, 5), geom.peers[cell])
+        self.assertNotIn(geom.cell_id(3, 6), geom.peers[cell])
+
+    def test_rectangular_blocks(self):
+        geom = Geometry.of(2, 3)
+        self.assertEqual(geom.size, 6)
+        self.assertEqual(geom.houses[12 + 1], (3, 4, 5, 9, 10, 11))
+        self.assertEqual(geom.block_of(2, 3), 3)
+        self.assertEqual(len(geom.peers[0]), 5 + 5 + 2)
+
+    def test_segments_are_block_line_intersections(self):
+        geom = Geometry.of(2, 3)
+        self.assertEqual(len(geom.segments), 6 * (2 + 3))
+        self.assertEqual(geom.segments[0], (0, 1, 2))
+        self.assertEqual([geom.segments[other] for other in geom.segment_blocks[0]], [(6, 7, 8)])
+        self.assertEqual([geom.segments[other] for other in geom.segment_lines[0]], [(3, 4, 5)])
+
+
+if __name__ == "__main__":
+    main()
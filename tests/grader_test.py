@@ -0,0 +1,70 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from grader import Grader
+from grid import Grid
+from techniques import XWing
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+X_WING = "1.....569492.561.8.561.924...964.8.1.64.1....218.356.4.4.5...169.5.614.2621.....5"
+EASTER_MONSTER = "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1"
+
+
+class TestGrader(TestCase):
+    def setUp(self):
+        self.grader = Grader()
+
+    def test_naked_singles_only_is_trivial(self):
+        grade = self.grader.grade(Grid.from_string(EASY))
+        self.assertTrue(grade.solved)
+        self.assertEqual(grade.rating, "trivial")
+        self.assertEqual(grade.score, EASY.count("0"))
+        self.assertEqual(len(grade.steps), EASY.count("0"))
+
+    def test_steps_record_technique_cost_and_time(self):
+        grade = self.grader.grade(Grid.from_string(X_WING))
+        self.assertTrue(grade.solved)
+        self.assertEqual(grade.rating, "expert")
+        self.assertEqual(grade.counts()["x-wing"], 1)
+        self.assertEqual(grade.score, sum(step.cost for step in grade.steps))
+        self.assertTrue(all(step.seconds >= 0 for step in grade.steps))
+        self.assertIn("singles", grade.seconds)
+
+    def test_ladder_can_be_chosen(self):
+        techniques = [technique for technique in self.grader.techniques if technique.COST < XWing.COST]
+        grade = Grader(techniques=techniques).grade(Grid.from_string(X_WING))
+        self.assertFalse(grade.solved)
+        self.assertEqual(grade.rating, Grader.UNSOLVED)
+
+    def test_puzzles_beyond_the_ladder_are_unsolved(self):
+        grade = self.grader.grade(Grid.from_string(EASTER_MONSTER))
+        self.assertFalse(grade.solved)
+        self.assertEqual(grade.rating, Grader.UNSOLVED)
+
+    def test_grade_line(self):
+        self.assertEqual(self.grader.grade_line("11" + "." * 79), "11" + "." * 79 + " invalid 0")
+        self.assertTrue(self.grader.grade_line("1").startswith("error:"))
+        self.assertEqual(self.grader.ratings["invalid"], 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,72 +15,84 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # -----------------------------------------------------------------------------
 
+
 import sys
 from unittest import main, TestCase
-from unittest.mock import MagicMock
 
 sys.path.insert(0, ".")
 
-import history
-from history import History
+from history import Entry, History
+
+
+def entry(cell, value, attr=None, previous=None):
+    return Entry(cell, Entry.ValueInfo(value, attr), previous)
 
-# Set up mock parent for Cell which has return_value() as a required interface
-CELL_MAX_VALUE = 10
-cell_parent = MagicMock()
-cell_parent.values.return_value = range(1, CELL_MAX_VALUE)
 
 class TestHistory(TestCase):
     def setUp(self):
-        History.clear()
+        self.history = History()
         return super().setUp()
 
     def test_add_history_adds_entries_to_the_end_of_history(self):
-        _h = History._history
-
-        # Add first entry (a simple, normal value)
-        c1 = history.Cell(cell_parent, 0, 0)
-        v1 = 1
-        e1 = history.Entry(c1, history.Entry.ValueInfo(v1))
-        History.add(e1)
-
-        self.assertEqual(len(_h), 1)
-        self.assertEqual(_h[-1].cell, c1)
-        self.assertEqual(_h[-1].valueinfo.value, v1)
-        self.assertEqual(_h[-1].valueinfo.prim_attr, None)
-
-        # Add second entry (a guessed value)
-        c2 = history.Cell(cell_parent, 1, 1)
-        t2 = history.Entry.ValueInfo.GUESS
-        v2 = 2
-        e2 = history.Entry(c2, history.Entry.ValueInfo(v2, t2))
-        History.add(e2)
-
-        self.assertEqual(len(_h), 2)
-        self.assertEqual(_h[-1].cell, c2)
-        self.assertEqual(_h[-1].valueinfo.value, v2)
-        self.assertEqual(_h[-1].valueinfo.prim_attr, t2)
-
-        # Make sure first entry remains intact
-        self.assertEqual(_h[0].cell, c1)
-        self.assertEqual(_h[0].valueinfo.value, v1)
-        self.assertEqual(_h[0].valueinfo.prim_attr, None)
-
-    def test_undo_history_removes_and_returns_the_last_entry(self):
-        _h = History._history
-
-        c1 = history.Cell(cell_parent, 0, 0)
-        v1 = 1
-        e1 = history.Entry(c1, history.Entry.ValueInfo(v1))
-        History.add(e1)
-
-        c2 = history.Cell(cell_parent, 1, 1)
-        v2 = 2
-        e2 = history.Entry(c2, history.Entry.ValueInfo(v2))
-        History.add(e2)
-
-        u2 = History.undo()
-        self.assertEqual(len(_h), 1)
-        self.assertEqual(u2, e2)
+        self.history.add(entry(0, 1))
+        self.history.add(entry(10, 2, Entry.ValueInfo.GUESS))
+        self.assertEqual(self.history.length(), 2)
+        self.assertEqual(self.history.undo(), entry(10, 2, Entry.ValueInfo.GUESS))
+        self.assertEqual(self.history.undo(), entry(0, 1))
+        self.assertTrue(self.history.is_empty())
+
+    def test_entries_round_trip_through_their_packed_form(self):
+        previous = Entry.ValueInfo(25, Entry.ValueInfo.INITIAL)
+        self.history.add(entry(624, 31, Entry.ValueInfo.GUESS, previous))
+        self.history.add(entry(5, None))
+        self.assertEqual(len(self.history._entries), 2)
+        self.assertEqual(self.history.undo(), entry(5, None))
+        self.assertEqual(self.history.undo(), entry(624, 31, Entry.ValueInfo.GUESS, previous))
+
+    def test_undo_from_empty_history_raises(self):
+        with self.assertRaises(IndexError):
+            self.history.undo()
+
+    def test_truncate_drops_the_entries_after_the_given_length(self):
+        for row in range(3):
+            self.history.add(entry(row * 9, row + 1))
+        self.history.truncate(1)
+        self.assertEqual(self.history.length(), 1)
+        self.assertEqual(self.history.undo().valueinfo.value, 1)
+
+    def test_histories_are_independent(self):
+        other = History()
+        self.history.add(entry(0, 1))
+        self.assertTrue(other.is_empty())
+
+    def test_capped_history_drops_the_oldest_entries(self):
+        history = History(capacity=3)
+        for cell in range(5):
+            history.add(entry(cell, cell + 1))
+        self.assertEqual((history.length(), history.dropped, len(history._entries)), (5, 2, 3))
+        self.assertEqual([history.undo().cell for _entry in range(3)], [4, 3, 2])
+        self.assertTrue(history.is_empty())
+        self.assertEqual(history.length(), 2)
+
+    def test_capped_history_truncates_by_logical_length(self):
+        history = History(capacity=2)
+        for cell in range(4):
+            history.add(entry(cell, 1))
+        history.truncate(3)
+        self.assertEqual(history.undo().cell, 2)
+        history.truncate(1)  # Before the kept entries
+        self.assertTrue(history.is_empty())
+        history.add(entry(7, 1))
+        self.assertEqual((history.length(), history.undo().cell), (3, 7))
+
+    def test_packed_entries_restore_the_history(self):
+        history = History(capacity=2)
+        for cell in range(3):
+            history.add(entry(cell, 1))
+        for restored in (History(), History(capacity=2), History(capacity=1)):
+            restored.restore(history.packed(), history.dropped)
+            self.assertEqual(restored.length(), 3)
+            self.assertEqual(restored.undo().cell, 2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import os
+import sys
+import tempfile
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from key_script import KeyScript
+
+
+class TestKeyScript(TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "session.keys")
+        return super().setUp()
+
+    def tearDown(self):
+        os.path.exists(self.path) and os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+        return super().tearDown()
+
+    def test_keys_are_written_and_read_back(self):
+        keys = ["5", "#", " ", "\\", "\n", "KEY_ESCAPE", "é"]
+        KeyScript(2, 3, keys).write(self.path)
+        script = KeyScript.read(self.path)
+        self.assertEqual((script.block_rows, script.block_cols, script.keys), (2, 3, keys))
+
+    def test_the_saved_game_a_session_started_from_is_kept(self):
+        KeyScript(2, 2, ["q"], b"SDKG\x00\xff").write(self.path)
+        self.assertEqual(KeyScript.read(self.path).state, b"SDKG\x00\xff")
+        KeyScript(2, 2, ["q"]).write(self.path)
+        self.assertIsNone(KeyScript.read(self.path).state)
+
+    def test_the_recorder_writes_each_key_as_it_is_typed(self):
+        recorder = KeyScript.Recorder(self.path)
+        recorder("KEY_UP")
+        self.assertEqual(KeyScript.read(self.path).keys, ["KEY_UP"])
+        recorder("q")
+        recorder.close()
+        self.assertEqual(KeyScript.read(self.path).keys, ["KEY_UP", "q"])
+
+    def test_only_recorded_sessions_are_read(self):
+        bad_headers = ("sudoku-keys 1 0x3\n", "sudoku-keys 1 255x255\n", "sudoku-keys 1 3x3 xyz\n")
+        for header in ("", "keys 1 3x3\n", "sudoku-keys 2 3x3\n", "sudoku-keys 1 3by3\n") + bad_headers:
+            with open(self.path, "w") as file:
+                file.write(header + "q\n")
+            with self.assertRaises(KeyScript.FormatError):
+                KeyScript.read(self.path)
+
+
+if __name__ == "__main__":
+    main()
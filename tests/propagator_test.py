@@ -0,0 +1,91 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from grid import Grid
+from propagator import Propagator
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+EASY_SOLUTION = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+HARD = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+
+class TestGrid(TestCase):
+    def test_grid_round_trips_through_string(self):
+        self.assertEqual(Grid.from_string(EASY).to_string(), EASY.replace("0", "."))
+
+    def test_grid_rejects_wrong_length_and_bad_digits(self):
+        self.assertRaises(ValueError, Grid.from_string, EASY[:-1])
+        self.assertRaises(ValueError, Grid.from_string, "x" + EASY[1:])
+        self.assertRaises(ValueError, Grid.from_string, EASY[:-1] + "A")
+
+    def test_initial_candidates_exclude_peer_values(self):
+        grid = Grid.from_string(EASY)
+        self.assertEqual(grid.masks[0], 0b000011000)  # 4, 5
+
+    def test_conflicting_values_make_grid_inconsistent(self):
+        self.assertFalse(Grid.from_string("11" + "." * 79).is_consistent())
+
+    def test_eliminate_removes_candidates_and_can_be_undone(self):
+        grid = Grid.from_string(EASY)
+        grid.trail = []
+        self.assertTrue(grid.eliminate(0, 0b000001000))
+        self.assertFalse(grid.eliminate(0, 0b000001000))
+        self.assertEqual(grid.masks[0], 0b000010000)
+        grid.undo(0)
+        self.assertEqual(grid.masks[0], 0b000011000)
+
+
+class TestPropagator(TestCase):
+    def test_singles_solve_an_easy_puzzle(self):
+        grid = Grid.from_string(EASY)
+        self.assertTrue(Propagator(grid).propagate())
+        self.assertEqual(grid.to_string(), EASY_SOLUTION)
+
+    def test_limit_stops_after_the_given_number_of_steps(self):
+        propagator = Propagator(Grid.from_string(EASY))
+        propagator.propagate(limit=1)
+        self.assertEqual(len(propagator.steps), 1)
+        step = propagator.steps[0]
+        self.assertEqual(EASY_SOLUTION[step.cell], str(step.value))
+
+    def test_hidden_singles_are_found(self):
+        propagator = Propagator(Grid.from_string(HARD))
+        self.assertTrue(propagator.propagate())
+        self.assertIn(Propagator.HIDDEN_SINGLE, {step.technique for step in propagator.steps})
+        self.assertFalse(propagator.grid.is_solved())
+
+    def test_locked_candidates_are_removed_when_enabled(self):
+        grid = Grid()
+        for cell in (9, 10, 11, 18, 19, 20):
+            grid.eliminate(cell, 0b1)  # 1 is only on row 0 in block 0
+        self.assertTrue(Propagator(grid.copy()).propagate())
+        propagator = Propagator(grid, locked_candidates=True)
+        self.assertTrue(propagator.propagate())
+        self.assertEqual([cell for cell in range(9) if not grid.masks[cell] & 0b1], list(range(3, 9)))
+
+    def test_contradiction_is_reported(self):
+        self.assertFalse(Propagator(Grid.from_string("11" + "." * 79)).propagate())
+        self.assertFalse(Propagator(Grid.from_string("12345678." + "." * 8 + "9" + "." * 63)).propagate())
+
+
+if __name__ == "__main__":
+    main()
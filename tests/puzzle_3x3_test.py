@@ -0,0 +1,199 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+from unittest.mock import patch
+
+sys.path.insert(0, ".")
+
+from display_attrs import DisplayAttrs
+from puzzle_3x3 import Puzzle3x3
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+HARD = "400000805030000000000700000020000060000080400000010000000603070500200000104000000"
+EASY_SOLUTION = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+X_WING = "100000569492056108056109240009640801064010000218035604040500016905061402621000005"
+
+
+class TestPuzzle3x3(TestCase):
+    def setUp(self):
+        self.puzzle = Puzzle3x3()
+        return super().setUp()
+
+    def enter(self, row, col, value):
+        self.puzzle.selected_cell = (row, col)
+        self.puzzle.value_(value)
+
+    def test_peers_are_row_column_and_block_cells(self):
+        peers = self.puzzle.peers(4, 4)
+        self.assertEqual(len(peers), 20)
+        self.assertIn(self.puzzle.cell(4, 0), peers)
+        self.assertIn(self.puzzle.cell(0, 4), peers)
+        self.assertIn(self.puzzle.cell(3, 3), peers)
+        self.assertNotIn(self.puzzle.cell(3, 0), peers)
+
+    def test_value_is_removed_from_peers_only(self):
+        self.enter(4, 4, 5)
+        self.assertFalse(self.puzzle.cell(4, 0).is_possible(5))
+        self.assertFalse(self.puzzle.cell(8, 4).is_possible(5))
+        self.assertFalse(self.puzzle.cell(5, 5).is_possible(5))
+        self.assertTrue(self.puzzle.cell(4, 4).is_possible(5))
+        self.assertTrue(self.puzzle.cell(0, 0).is_possible(5))
+
+    def test_cleared_value_is_possible_again_unless_held_by_another_peer(self):
+        self.enter(0, 0, 5)
+        self.enter(0, 8, 5)
+        self.enter(0, 0, None)
+        self.assertFalse(self.puzzle.cell(0, 4).is_possible(5))
+        self.assertTrue(self.puzzle.cell(1, 1).is_possible(5))
+        self.assertTrue(self.puzzle.cell(0, 8).is_possible(5))
+        self.enter(0, 8, None)
+        self.assertTrue(self.puzzle.cell(0, 4).is_possible(5))
+
+    def test_duplicate_is_conflicting_and_the_peers_it_duplicates_are_conflicted(self):
+        self.enter(0, 0, 5)
+        self.enter(0, 8, 5)
+        self.enter(8, 0, 5)
+        self.assertEqual(self.puzzle.cell(0, 8).conflict(), DisplayAttrs.CONFLICTING)
+        self.assertEqual(self.puzzle.cell(8, 0).conflict(), DisplayAttrs.CONFLICTING)
+        self.assertEqual(self.puzzle.cell(0, 0).conflict(), DisplayAttrs.CONFLICTED)
+        self.enter(0, 8, None)
+        self.assertIsNone(self.puzzle.cell(0, 8).conflict())
+        self.assertEqual(self.puzzle.cell(0, 0).conflict(), DisplayAttrs.CONFLICTED)
+        self.enter(8, 0, 6)
+        self.assertIsNone(self.puzzle.cell(0, 0).conflict())
+        self.assertIsNone(self.puzzle.cell(8, 0).conflict())
+
+    def test_conflicts_are_cleared_on_undo(self):
+        self.initialize(EASY)
+        self.enter(0, 0, 3)  # 3 is given in the same row and block
+        self.assertEqual(self.puzzle.cell(0, 0).conflict(), DisplayAttrs.CONFLICTING)
+        self.assertEqual(self.puzzle.cell(0, 2).conflict(), DisplayAttrs.CONFLICTED)
+        self.puzzle.undo_()
+        self.assertIsNone(self.puzzle.cell(0, 0).conflict())
+        self.assertIsNone(self.puzzle.cell(0, 2).conflict())
+
+    def initialize(self, puzzle):
+        for cell, char in enumerate(puzzle):
+            char != "0" and self.enter(cell // 9, cell % 9, int(char))
+        self.puzzle.play_()
+
+    def test_play_is_refused_unless_the_puzzle_has_a_unique_solution(self):
+        self.enter(0, 0, 1)
+        self.enter(0, 1, 1)
+        self.puzzle.play_()
+        self.assertTrue(self.puzzle._initializing)
+        self.enter(0, 1, None)
+        self.puzzle.play_()
+        self.assertTrue(self.puzzle._initializing)
+
+    def test_play_starts_for_a_proper_puzzle(self):
+        self.initialize(EASY)
+        self.assertFalse(self.puzzle._initializing)
+
+    def test_play_starts_unverified_when_the_uniqueness_check_runs_out_of_guesses(self):
+        with patch.object(Puzzle3x3, "UNIQUENESS_NODES", 1):
+            self.initialize(HARD)
+        self.assertFalse(self.puzzle._initializing)
+
+    def test_next_plays_one_must_be_value(self):
+        self.initialize(EASY)
+        self.puzzle.next_()
+        row, col = self.puzzle.selected_cell
+        self.assertEqual(self.puzzle.cell(row, col).value(), int(EASY_SOLUTION[row * 9 + col]))
+        self.assertEqual(sum(1 for cell in range(81) if self.puzzle.cell(cell // 9, cell % 9).value()), 33)
+
+    def test_auto_plays_all_must_be_values_and_can_be_undone(self):
+        self.initialize(EASY)
+        self.puzzle.auto_()
+        self.assertEqual(
+            "".join(str(self.puzzle.cell(cell // 9, cell % 9).value()) for cell in range(81)), EASY_SOLUTION
+        )
+        for _step in range(81 - 32):
+            self.puzzle.undo_()
+        self.assertIsNone(self.puzzle.cell(0, 0).value())
+
+    def state(self):
+        cells = [self.puzzle.cell(cell // 9, cell % 9) for cell in range(81)]
+        return [(cell.value(), cell.candidates(), cell.attr()) for cell in cells]
+
+    def test_rewind_restores_the_puzzle_as_it_was_before_the_guess(self):
+        self.initialize(EASY)
+        self.enter(0, 0, 4)
+        before = self.state()
+        self.puzzle.selected_cell = (0, 1)
+        self.puzzle.value_(8, guess=True)
+        self.puzzle.auto_()
+        self.assertTrue(self.puzzle._history.length() > 2)
+        self.puzzle.rewind_()
+        self.assertEqual(self.state(), before)
+        self.assertEqual(
+            (self.puzzle._history.length(), self.puzzle._bg_level, self.puzzle.selected_cell), (1, 0, (0, 1))
+        )
+        self.puzzle.undo_()
+        self.assertTrue(self.puzzle.cell(0, 1).is_possible(4))
+        self.enter(0, 1, 4)
+        self.assertEqual(self.puzzle.cell(0, 1).conflict(), None)
+        self.assertFalse(self.puzzle.cell(0, 0).is_possible(4))
+
+    def test_rewind_goes_back_one_guess_at_a_time(self):
+        self.initialize(EASY)
+        self.puzzle.selected_cell = (0, 0)
+        self.puzzle.value_(4, guess=True)
+        after_first_guess = self.state()
+        self.puzzle.selected_cell = (0, 1)
+        self.puzzle.value_(8, guess=True)
+        self.puzzle.rewind_()
+        self.assertEqual(self.state(), after_first_guess)
+        self.assertEqual(self.puzzle._bg_level, Puzzle3x3.BG_LEVEL_DELTA)
+        self.puzzle.undo_()
+        self.puzzle.rewind_()  # The first guess was undone: nothing to rewind to
+        self.assertIsNone(self.puzzle.cell(0, 0).value())
+
+    def test_history_is_kept_per_puzzle_and_can_be_capped(self):
+        self.initialize(EASY)
+        other = Puzzle3x3(history_capacity=2)
+        self.enter(0, 0, 4)
+        self.assertTrue(other._history.is_empty())
+        self.puzzle = other
+        self.initialize(EASY)
+        for col, value in ((0, 4), (1, 8), (3, 9)):
+            self.enter(0, col, value)
+        self.puzzle.undo_()
+        self.puzzle.undo_()
+        self.assertEqual((self.puzzle.cell(0, 0).value(), self.puzzle.cell(0, 1).value()), (4, None))
+        self.assertTrue(self.puzzle._history.is_empty())
+
+    def test_capped_puzzle_returns_to_init_after_undoing_everything_it_kept(self):
+        self.puzzle = Puzzle3x3(history_capacity=2)
+        self.initialize(EASY)
+        for col, value in ((0, 4), (1, 8), (3, 9)):
+            self.enter(0, col, value)
+        self.puzzle.undo_()
+        self.puzzle.undo_()
+        self.puzzle.init_()
+        self.assertTrue(self.puzzle._initializing)
+
+    def test_auto_uses_techniques_beyond_singles(self):
+        self.initialize(X_WING)
+        self.puzzle.auto_()
+        self.assertTrue(all(self.puzzle.cell(cell // 9, cell % 9).value() for cell in range(81)))
+
+
+if __name__ == "__main__":
+    main()
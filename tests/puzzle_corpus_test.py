@@ -0,0 +1,112 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import contextlib
+import os
+import sys
+import tempfile
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from geometry import Geometry
+from puzzle_corpus import PuzzleCorpus
+
+EASY = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+EASY_SOLUTION = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+PUZZLE_16 = "".join("123456789ABCDEFG."[cell % 17] for cell in range(256))
+
+
+class TestPuzzleCorpus(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "corpus.sdc")
+        return super().setUp()
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+        return super().tearDown()
+
+    def test_9x9_puzzles_are_packed_into_41_bytes(self):
+        record = PuzzleCorpus.pack(EASY.replace(".", "0"))
+        self.assertEqual(len(record), 41)
+        self.assertEqual(PuzzleCorpus.unpack(record), EASY)
+
+    def test_larger_and_smaller_puzzles_round_trip(self):
+        for geometry, text in ((Geometry.of(4, 4), PUZZLE_16), (Geometry.of(2, 2), "1234..2.3.4.1..4")):
+            record = PuzzleCorpus.pack(text, geometry)
+            self.assertEqual(len(record), (geometry.cell_count * geometry.size.bit_length() + 7) // 8)
+            self.assertEqual(PuzzleCorpus.unpack(record, geometry), text)
+
+    def test_values_outside_the_puzzle_are_refused(self):
+        for text in (EASY[:-1] + "A", EASY[:-1] + "x", EASY[:-1]):
+            with self.assertRaises(ValueError):
+                PuzzleCorpus.pack(text)
+        with self.assertRaises(ValueError):
+            PuzzleCorpus.pack("1234..2.3.4.1..5", Geometry.of(2, 2))
+
+    def test_puzzles_are_read_by_number(self):
+        count = PuzzleCorpus.write(self.path, ["# comment\n", EASY + "\n", "\n", EASY_SOLUTION + "\n"])
+        self.assertEqual(count, 2)
+        self.assertEqual(os.path.getsize(self.path), PuzzleCorpus.HEADER.size + 2 * 41)
+        with PuzzleCorpus(self.path) as corpus:
+            self.assertEqual((len(corpus), corpus[1], corpus[-2]), (2, EASY_SOLUTION, EASY))
+            self.assertEqual(corpus.grid(0).to_string(), EASY)
+            self.assertEqual(list(corpus), [EASY, EASY_SOLUTION])
+            with self.assertRaises(IndexError):
+                corpus[2]
+
+    def test_the_corpus_keeps_its_block_shape(self):
+        PuzzleCorpus.write(self.path, [PUZZLE_16], Geometry.of(4, 4))
+        with PuzzleCorpus(self.path) as corpus:
+            self.assertEqual((corpus.geometry.block_rows, corpus[0]), (4, PUZZLE_16))
+
+    def test_only_corpora_of_this_version_are_opened(self):
+        PuzzleCorpus.write(self.path, [EASY])
+        with open(self.path, "rb") as file:
+            data = file.read()
+        bad_shapes = (data[:6] + b"\xff\xff" + data[8:], data[:6] + b"\x00\x03" + data[8:])
+        for bad in (b"", b"XXXX" + data[4:], data[:4] + b"\x63\x00" + data[6:], data[:-1]) + bad_shapes:
+            with open(self.path, "wb") as file:
+                file.write(bad)
+            with self.assertRaises(PuzzleCorpus.FormatError):
+                PuzzleCorpus(self.path)
+
+    def test_block_shapes_are_checked_on_the_command_line(self):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+            for shape in ("0x3", "6x5", "3by3"):
+                with self.assertRaises(SystemExit):
+                    PuzzleCorpus.main(["pack", "-o", self.path, "--blocks", shape])
+
+    def test_text_files_convert_to_corpora_and_back(self):
+        text, output = os.path.join(self.directory, "puzzles.txt"), os.path.join(self.directory, "out.txt")
+        with open(text, "w") as file:
+            file.write(f"{EASY}\n{EASY_SOLUTION}\n{EASY}\n")
+        PuzzleCorpus.main(["pack", text, "-o", self.path, "-q"])
+        PuzzleCorpus.main(["unpack", self.path, "--start", "1", "--count", "1", "-o", output])
+        with open(output) as file:
+            self.assertEqual(file.read(), EASY_SOLUTION + "\n")
+        PuzzleCorpus.main(["sample", self.path, "-n", "5", "--seed", "1", "-o", output])
+        with open(output) as file:
+            self.assertEqual(sorted(file.read().split()), sorted([EASY, EASY, EASY_SOLUTION]))
+
+
+if __name__ == "__main__":
+    main()
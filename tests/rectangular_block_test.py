@@ -45,6 +45,22 @@ class TestRectangularBlock(TestCase):
         block1.render()
         block2.render()
 
+    def test_cell_value_change_only_touches_peers_given_by_parent(self):
+        peer1, peer2 = MagicMock(), MagicMock()
+        self.parent.peers.return_value = (peer1, peer2)
+        self.parent.is_value_placed_for.side_effect = lambda row, col, value: row == peer2.row
+        block = RectangularBlock(self.parent, 0, 0, self.BLOCK_ROWS, self.BLOCK_COLS)
+
+        block.cell(1, 1).set(5)
+        self.parent.value_placed.assert_called_once_with(1, 1, 5)
+        peer1.remove_possible.assert_called_once_with(5)
+        peer2.remove_possible.assert_called_once_with(5)
+
+        block.cell(1, 1).set(None)
+        self.parent.value_cleared.assert_called_once_with(1, 1, 5)
+        peer1.add_possible.assert_called_once_with(5)
+        peer2.add_possible.assert_not_called()
+
 
 if __name__ == "__main__":
     main()
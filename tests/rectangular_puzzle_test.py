@@ -0,0 +1,84 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from commands import Commands
+from display import Display
+from grid import Grid
+from rectangular_puzzle import RectangularPuzzle
+
+PUZZLE_16 = (
+    "913A.C.BE8FG..4.....67FG.4.A..8C8F6G.4...7.D92AE7..C8...3156..D..B.49...D.73.8C5....3E8.4.2C.61FC.A.5.B4.GE179.D"
+    "13...G..9.8F4BE2AC437129..6.DGF86E.8A.4C...927..2G.7B6.D.C183E9..9.5G.EF72.4C.B.3.D1..7.F6B.ECG...C.EA92...58D.B"
+    ".7.B..1...AEF423E..9...3CD4..1.."
+)
+SOLUTION_16 = (
+    "913A2CDBE8FG6547BD5E67FG249A138C8F6G1435B7CD92AE742C89AE3156BFDGFBE49261DA73G8C5G59D3E874B2CA61FC8A25FB46GE1793D"
+    "1376DGCA958F4BE2AC4371295E6BDGF86EB8A34CGFD927512GF7B65DAC183E94D915G8EF7234CAB63AD14578F6B2ECG946CFEA9213G58D7B"
+    "57GBCD1689AEF423E289FBG3CD47516A"
+)
+
+
+class TestRectangularPuzzle(TestCase):
+    def tearDown(self):
+        Commands.configure(9)
+        Display.geometry({"h_cells": 9, "v_cells": 9})
+        return super().tearDown()
+
+    def enter(self, puzzle, row, col, value):
+        puzzle.selected_cell = (row, col)
+        puzzle.value_(value)
+
+    def test_2x3_blocks(self):
+        puzzle = RectangularPuzzle(2, 3)
+        self.assertEqual(len(puzzle.peers(0, 0)), 5 + 5 + 2)
+        self.assertIn(puzzle.cell(1, 2), puzzle.peers(0, 0))
+        self.assertNotIn(puzzle.cell(2, 0), puzzle.peers(0, 1))
+        self.enter(puzzle, 0, 0, 6)
+        self.assertFalse(puzzle.cell(1, 2).is_possible(6))
+        self.assertRaises(ValueError, self.enter, puzzle, 0, 1, 7)
+
+    def test_block_borders_follow_the_block_shape(self):
+        puzzle = RectangularPuzzle(2, 3)
+        self.assertTrue(puzzle.cell(1, 2).borders.is_bottom())
+        self.assertTrue(puzzle.cell(1, 2).borders.is_right())
+        self.assertFalse(puzzle.cell(2, 2).borders.is_bottom())
+        self.assertTrue(puzzle.cell(2, 3).borders.is_left())
+
+    def test_16x16_uses_letters_and_compact_cells(self):
+        RectangularPuzzle(4, 4)
+        self.assertTrue(Display.geom["compact"])
+        self.assertEqual(Display.geom["h_cells"], 16)
+        self.assertEqual(Commands.val_with_guess("g"), (16, False))
+
+    def test_16x16_can_be_played(self):
+        puzzle = RectangularPuzzle(4, 4)
+        for cell, char in enumerate(PUZZLE_16):
+            char != "." and self.enter(puzzle, cell // 16, cell % 16, Grid.value_of(char))
+        puzzle.play_()
+        self.assertFalse(puzzle._initializing)
+        puzzle.auto_()
+        values = [puzzle.cell(cell // 16, cell % 16).value() for cell in range(256)]
+        self.assertEqual("".join(Grid.DIGITS[value - 1] for value in values), SOLUTION_16)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import os
+import sys
+import tempfile
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from display import Display
+from display_backend import NullBackend
+from game_state import GameState
+from key_script import KeyScript
+from rectangular_puzzle import RectangularPuzzle
+from replay import Replay
+from sudoku import Main
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+
+
+def easy_session() -> list:
+    """Type in the EASY puzzle row by row (snaking), start playing and auto-solve it"""
+    keys = []
+    for row in range(9):
+        cols, move = (range(9), "KEY_RIGHT") if row % 2 == 0 else (range(8, -1, -1), "KEY_LEFT")
+        for col in cols:
+            EASY[row * 9 + col] != "0" and keys.append(EASY[row * 9 + col])
+            keys.append(move)
+        keys.append("KEY_DOWN")
+    return keys + ["KEY_ESCAPE", "a", "q"]
+
+
+class TestReplay(TestCase):
+    def test_a_session_is_replayed_through_the_game(self):
+        main = Replay(KeyScript(keys=easy_session())).run()
+        self.assertTrue(all(main._puzzle.cell(cell // 9, cell % 9).value() for cell in range(81)))
+        self.assertFalse(main._puzzle._initializing)
+
+    def test_latencies_are_reported_per_command(self):
+        replay = Replay(KeyScript(keys=easy_session()), "memory")
+        replay.run()
+        replay.run()
+        self.assertEqual((replay.latencies["auto_"].count, replay.latencies["5"].count), (2, 6))
+        self.assertEqual(replay.session.count, 2)
+        self.assertIn("auto_", replay.report())
+
+    def test_a_recorded_session_replays_the_same_game(self):
+        keys = easy_session()[:-2] + ["r", "x", "a", "q"]  # "x" dismisses the "no guess to rewind to" warning
+        played = self.record(keys)
+        script = KeyScript.read(self.keys)
+        self.assertEqual(script.keys, keys)
+        self.assertTrue(all(played))
+        self.assertEqual(self.values(Replay(script).run()), played)
+
+    def test_a_session_that_continued_a_saved_game_replays_from_that_game(self):
+        previous = Display.backend
+        Display.use(NullBackend())
+        try:
+            puzzle = RectangularPuzzle(2, 2)
+            puzzle.value_(1)
+            puzzle.state().save(self.game)
+        finally:
+            Display.use(previous)
+        played = self.record(["KEY_RIGHT", "2", "q"])
+        self.assertEqual(played[:3], [1, 2, 0])
+        self.assertEqual(self.values(Replay(KeyScript.read(self.keys)).run()), played)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.keys, self.game = os.path.join(directory, "session.keys"), os.path.join(directory, "game.sdk")
+        return super().setUp()
+
+    def tearDown(self):
+        for path in (self.keys, self.game):
+            os.path.exists(path) and os.remove(path)
+        os.rmdir(os.path.dirname(self.keys))
+        return super().tearDown()
+
+    def record(self, keys) -> list:
+        """Play sudoku.py --record --game (the first key ends the splash screen); returns the values saved on quit"""
+        previous, backend = Display.backend, NullBackend()
+        Display.use(backend)
+        backend.feed(" ", *keys)
+        try:
+            Main.main(["--record", self.keys, "--game", self.game])
+        finally:
+            Display.use(previous)
+        return list(GameState.load(self.game).values)
+
+    def values(self, main) -> list:
+        return [cell.value() or 0 for cell in main._puzzle._cells]
+
+
+if __name__ == "__main__":
+    main()
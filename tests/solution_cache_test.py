@@ -0,0 +1,139 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+import time
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from backtracking_solver import BacktrackingSolver
+from canonical_form import CanonicalForm, Transform
+from grid import Grid
+from solution_cache import SolutionCache
+
+HARD = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+SLOW = "52...6.........7.13...........4..8..6......5...........418.........3..2...87....."
+
+# Transpose, swap the first two bands, reverse the columns of each stack and relabel v -> 10 - v
+VARIANT = Transform(
+    True, (3, 4, 5, 0, 1, 2, 6, 7, 8), (2, 1, 0, 5, 4, 3, 8, 7, 6), {value: 10 - value for value in range(1, 10)}
+)
+
+# Band and row permutations of the slow puzzle, with its stacks swapped
+ROWS = [
+    (3, 4, 5, 0, 1, 2, 6, 7, 8),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (1, 0, 2, 4, 3, 5, 7, 6, 8),
+    (2, 1, 0, 8, 7, 6, 5, 4, 3),
+]
+COLS = (3, 4, 5, 0, 1, 2, 6, 7, 8)
+
+
+class TestCanonicalForm(TestCase):
+    def test_isomorphic_puzzles_share_the_canonical_form(self):
+        for puzzle in (HARD, EASY):
+            grid = Grid.from_string(puzzle)
+            canonical, _transform = CanonicalForm.of(grid)
+            self.assertEqual(CanonicalForm.of(VARIANT.apply(grid))[0], canonical)
+
+    def test_transform_maps_to_the_canonical_form_and_back(self):
+        grid = Grid.from_string(HARD)
+        canonical, transform = CanonicalForm.of(grid)
+        self.assertEqual(transform.apply(grid).to_string(), canonical)
+        self.assertEqual(transform.revert(Grid.from_string(canonical)).to_string(), HARD)
+
+    def test_canonical_form_is_not_larger_than_the_puzzle(self):
+        canonical, _transform = CanonicalForm.of(Grid.from_string(HARD))
+        self.assertLessEqual(canonical.replace(".", "0"), HARD.replace(".", "0"))
+
+    def test_too_symmetric_grids_are_not_canonicalized(self):
+        self.assertEqual(CanonicalForm.of(Grid.from_string("." * 81)), (None, None))
+
+    def test_isomorphic_puzzles_share_the_fingerprint(self):
+        for puzzle in (HARD, EASY):
+            grid = Grid.from_string(puzzle)
+            self.assertEqual(CanonicalForm.fingerprint(VARIANT.apply(grid)), CanonicalForm.fingerprint(grid))
+        self.assertNotEqual(
+            CanonicalForm.fingerprint(Grid.from_string(HARD)), CanonicalForm.fingerprint(Grid.from_string(SLOW))
+        )
+
+
+class TestSolutionCache(TestCase):
+    def test_repeated_and_isomorphic_puzzles_are_hits(self):
+        cache = SolutionCache(BacktrackingSolver())
+        grid = Grid.from_string(HARD)
+        variant = VARIANT.apply(grid)
+        solution = cache.solve(grid)
+        self.assertEqual(cache.solve(grid).values, solution.values)
+        variant_solution = cache.solve(variant)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertTrue(variant_solution.is_solved())
+        self.assertEqual(VARIANT.apply(solution).values, variant_solution.values)
+
+    def test_unsolvable_puzzles_are_cached_too(self):
+        cache = SolutionCache(BacktrackingSolver())
+        conflict = Grid.from_string("11" + "." * 79)
+        self.assertIsNone(cache.solve(conflict))
+        self.assertIsNone(cache.solve(conflict))
+        self.assertEqual(cache.hits, 1)
+
+    def test_puzzles_are_only_canonicalized_when_an_isomorphic_one_may_be_cached(self):
+        cache = SolutionCache(BacktrackingSolver())
+        for puzzle in (EASY, HARD, SLOW, "1" + "." * 80, "." * 81):
+            self.assertTrue(cache.solve(Grid.from_string(puzzle)).is_solved())
+        self.assertEqual((cache.canonicalized, cache.uncacheable, cache.misses), (0, 2, 5))
+        cache.solve(VARIANT.apply(Grid.from_string(HARD)))
+        self.assertEqual((cache.canonicalized, cache.hits), (2, 1))
+
+    def test_isomorphic_variants_are_faster_than_solving_each(self):
+        solver = BacktrackingSolver()
+        grid = Grid.from_string(SLOW)
+        variants = [grid, VARIANT.apply(grid)] + [Transform(False, rows, COLS, {}).apply(grid) for rows in ROWS]
+        started = time.perf_counter()
+        solutions = [solver.solve(variant) for variant in variants]
+        solving = time.perf_counter() - started
+        cache = SolutionCache(solver)
+        started = time.perf_counter()
+        cached = [cache.solve(variant) for variant in variants]
+        caching = time.perf_counter() - started
+        self.assertEqual([solution.values for solution in cached], [solution.values for solution in solutions])
+        self.assertEqual((cache.hits, cache.misses), (len(variants) - 1, 1))
+        self.assertLess(caching, solving)
+
+    def test_solution_counts_are_cached_apart_from_solutions(self):
+        cache = SolutionCache(BacktrackingSolver())
+        grid = Grid.from_string(HARD)
+        self.assertEqual(cache.solve(grid).to_string(), BacktrackingSolver().solve(grid).to_string())
+        self.assertEqual(cache.count_solutions(grid), 1)
+        self.assertEqual(cache.count_solutions(VARIANT.apply(grid)), 1)
+        self.assertEqual(cache.count_solutions(Grid.from_string("11" + "." * 79)), 0)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_least_recently_used_entries_are_evicted_under_the_memory_cap(self):
+        cache = SolutionCache(BacktrackingSolver(), max_bytes=500)
+        cache.solve(Grid.from_string(HARD))
+        cache.solve(Grid.from_string(EASY))
+        self.assertGreater(cache.evictions, 0)
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+        cache.solve(Grid.from_string(HARD))
+        self.assertEqual(cache.hits, 0)
+
+
+if __name__ == "__main__":
+    main()
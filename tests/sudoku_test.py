@@ -0,0 +1,55 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+
+import sys
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from display import Display
+from display_backend import NullBackend
+from sudoku import Main
+
+
+class TestMain(TestCase):
+    def setUp(self):
+        self.previous = Display.backend
+        self.backend = NullBackend()
+        Display.use(self.backend)
+        return super().setUp()
+
+    def tearDown(self):
+        Display.use(self.previous)
+        return super().tearDown()
+
+    def test_keys_are_dispatched_to_the_puzzle(self):
+        self.backend.feed(" ", "l", "KEY_DOWN", "5", "q")  # Any key ends the splash screen
+        main = Main()
+        main.run()
+        self.assertEqual(main._puzzle.cell(1, 1).value(), 5)
+        self.assertFalse(main._puzzle.is_playing)
+
+    def test_play_commands_are_unsupported_while_initializing(self):
+        self.backend.feed(" ", "u", "5")  # Undo is ignored when initializing
+        main = Main()
+        main.run()
+        self.assertEqual(main._puzzle.cell(0, 0).value(), 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import itertools
+import random
+import sys
+import time
+from unittest import main, TestCase
+
+sys.path.insert(0, ".")
+
+from backtracking_solver import BacktrackingSolver
+from candidates import Candidates
+from geometry import Geometry
+from grid import Grid
+from propagator import Propagator
+from techniques import (
+    HiddenPair,
+    HiddenQuad,
+    HiddenTriple,
+    LockedCandidates,
+    NakedPair,
+    Swordfish,
+    TechniqueLadder,
+    XWing,
+    XYWing,
+)
+
+GEOMETRY = Geometry.of(3, 3)
+ONE = Candidates.bit(1)
+
+
+def remove(grid, cells, mask):
+    for cell in cells:
+        grid.eliminate(cell, mask)
+
+
+class TestTechniques(TestCase):
+    def test_nothing_is_found_in_an_empty_grid(self):
+        grid = Grid(GEOMETRY)
+        for technique in TechniqueLadder.of(GEOMETRY).techniques:
+            self.assertEqual(technique.find(grid), [], technique.NAME)
+
+    def test_pointing_removes_the_value_from_the_rest_of_the_line(self):
+        grid = Grid(GEOMETRY)
+        remove(grid, (9, 10, 11, 18, 19, 20), ONE)  # 1 is only on row 0 in block 0
+        self.assertEqual(LockedCandidates(GEOMETRY).find(grid), [(cell, ONE) for cell in range(3, 9)])
+
+    def test_naked_pair_removes_its_values_from_the_house(self):
+        grid = Grid(GEOMETRY)
+        remove(grid, (0, 1), ~0b11)
+        eliminations = NakedPair(GEOMETRY).find(grid)
+        self.assertEqual(eliminations, [(cell, 0b11) for cell in range(2, 9)])
+
+    def test_hidden_pair_removes_other_values_from_its_cells(self):
+        grid = Grid(GEOMETRY)
+        remove(grid, range(2, 9), 0b11)
+        eliminations = HiddenPair(GEOMETRY).find(grid)
+        self.assertEqual(eliminations, [(0, 0b111111100), (1, 0b111111100)])
+
+    def test_x_wing_removes_the_value_from_its_columns(self):
+        grid = Grid(GEOMETRY)
+        remove(grid, [cell for cell in range(9) if cell not in (0, 4)], ONE)
+        remove(grid, [cell for cell in range(36, 45) if cell not in (36, 40)], ONE)
+        eliminations = XWing(GEOMETRY).find(grid)
+        expected = [(cell, ONE) for col in (0, 4) for cell in range(col + 9, 81, 9) if cell not in (36, 40)]
+        self.assertEqual(sorted(eliminations), sorted(expected))
+
+    def test_swordfish_removes_the_value_from_its_columns(self):
+        grid = Grid(GEOMETRY)
+        for row, cols in ((0, (0, 4)), (3, (4, 8)), (6, (0, 8))):
+            remove(grid, [row * 9 + col for col in range(9) if col not in cols], ONE)
+        self.assertEqual(XWing(GEOMETRY).find(grid), [])
+        eliminations = Swordfish(GEOMETRY).find(grid)
+        expected = [(row * 9 + col, ONE) for col in (0, 4, 8) for row in range(9) if row not in (0, 3, 6)]
+        self.assertEqual(sorted(eliminations), sorted(expected))
+
+    def test_xy_wing_removes_z_from_cells_seeing_both_pincers(self):
+        grid = Grid(GEOMETRY)
+        remove(grid, (0,), ~0b011)  # Pivot {1, 2} at (0, 0)
+        remove(grid, (4,), ~0b101)  # Pincer {1, 3} at (0, 4)
+        remove(grid, (18,), ~0b110)  # Pincer {2, 3} at (2, 0)
+        eliminations = XYWing(GEOMETRY).find(grid)
+        self.assertEqual(eliminations, [(cell, 0b100) for cell in (1, 2, 21, 22, 23)])
+
+
+class TestHiddenSubsets(TestCase):
+    TECHNIQUES = (HiddenPair, HiddenTriple, HiddenQuad)
+
+    def large_grids(self):
+        """Partly filled 16x16 and 25x25 grids, all but the first of each size with some candidates removed at random"""
+        rnd = random.Random(5)
+        for block_size in (4, 5):
+            geometry = Geometry.of(block_size, block_size)
+            solution = BacktrackingSolver(geometry).solve(Grid(geometry))
+            for removals in range(3):
+                grid = Grid(geometry, [value if rnd.random() < 0.45 else 0 for value in solution.values])
+                for cell in rnd.sample(range(geometry.cell_count), removals * geometry.cell_count // 4):
+                    grid.values[cell] or grid.eliminate(
+                        cell, rnd.getrandbits(geometry.size) & ~(1 << solution.values[cell] - 1)
+                    )
+                yield grid
+
+    def combinations_of_values(self, technique, grid):
+        """What the technique finds, by trying every combination of the open values of every house"""
+        for house in grid.geometry.houses:
+            empty = [cell for cell in house if not grid.values[cell]]
+            open_values = 0
+            for cell in empty:
+                open_values |= grid.masks[cell]
+            for values in itertools.combinations(Candidates.tables(grid.geometry.size)[2][open_values], technique.SIZE):
+                mask = Candidates.mask_of(values)
+                cells = [cell for cell in empty if grid.masks[cell] & mask]
+                eliminations = [(cell, grid.masks[cell] & ~mask) for cell in cells if grid.masks[cell] & ~mask]
+                if len(cells) == technique.SIZE and eliminations:
+                    return eliminations
+        return []
+
+    def test_large_grids_give_the_same_eliminations_as_trying_every_combination(self):
+        found = 0
+        for grid in self.large_grids():
+            for technique_class in self.TECHNIQUES:
+                expected = self.combinations_of_values(technique_class, grid)
+                self.assertEqual(technique_class(grid.geometry).find(grid), expected)
+                found += bool(expected)
+        self.assertGreater(found, 0)
+
+    def test_a_25x25_scan_takes_milliseconds(self):
+        grids = [grid for grid in self.large_grids() if grid.geometry.size == 25]
+        for technique_class in self.TECHNIQUES:
+            technique = technique_class(grids[0].geometry)
+            started = time.perf_counter()
+            for grid in grids:
+                technique.find(grid)
+            self.assertLess(time.perf_counter() - started, 0.1, technique.NAME)
+
+
+class TestTechniqueLadder(TestCase):
+    def test_techniques_are_cheapest_first(self):
+        costs = [technique.COST for technique in TechniqueLadder.of(GEOMETRY).techniques]
+        self.assertEqual(costs, sorted(costs))
+        self.assertEqual(len(costs), 10)
+
+    def test_ladder_goes_on_where_singles_stop(self):
+        grid = Grid.from_string("1.....569492.561.8.561.924...964.8.1.64.1....218.356.4.4.5...169.5.614.2621.....5")
+        self.assertTrue(Propagator(grid.copy()).propagate())
+        propagator = Propagator(grid)
+        self.assertTrue(TechniqueLadder.of(GEOMETRY).propagate(propagator))
+        self.assertTrue(grid.is_solved())
+
+    def test_limit_stops_after_the_given_number_of_placements(self):
+        propagator = Propagator(
+            Grid.from_string("1.....569492.561.8.561.924...964.8.1.64.1....218.356.4.4.5...169.5.614.2621.....5")
+        )
+        TechniqueLadder.of(GEOMETRY).propagate(propagator, limit=3)
+        self.assertEqual(len(propagator.steps), 3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+from unittest import main, skipIf, TestCase
+
+sys.path.insert(0, ".")
+
+try:
+    import numpy as np
+    from vectorized_batch import VectorizedBatch
+except ImportError:  # NumPy is optional
+    np = None
+
+from grid import Grid
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+EASY_SOLUTION = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+HARD = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+HARD_SOLUTION = "417369825632158947958724316825437169791586432346912758289643571573291684164875293"
+CONFLICT = "11" + "." * 79
+
+
+@skipIf(np is None, "NumPy is not installed")
+class TestVectorizedBatch(TestCase):
+    def setUp(self):
+        self.batch = VectorizedBatch()
+        return super().setUp()
+
+    def test_candidates_match_the_scalar_grid(self):
+        grids = self.batch.from_strings([EASY, HARD])
+        masks = self.batch.candidates(grids)
+        for row, line in enumerate([EASY, HARD]):
+            grid = Grid.from_string(line)
+            expected = [mask if not value else 0 for value, mask in zip(grid.values, grid.masks)]
+            self.assertEqual(masks[row].tolist(), expected)
+
+    def test_singles_run_in_lock_step_until_fixpoint(self):
+        grids, solved, contradiction = self.batch.propagate(self.batch.from_strings([EASY, HARD, CONFLICT]))
+        self.assertEqual(solved.tolist(), [True, False, False])
+        self.assertEqual(contradiction.tolist(), [False, False, True])
+        self.assertEqual(self.batch.to_strings(grids)[0], EASY_SOLUTION)
+
+    def test_unsolved_grids_go_to_search(self):
+        solutions, solved = self.batch.solve(self.batch.from_strings([HARD, EASY, CONFLICT]))
+        self.assertEqual(solved.tolist(), [True, True, False])
+        self.assertEqual(self.batch.to_strings(solutions)[:2], [HARD_SOLUTION, EASY_SOLUTION])
+
+
+if __name__ == "__main__":
+    main()
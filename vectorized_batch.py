@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) by Anton Ivanov.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# -----------------------------------------------------------------------------
+
+import sys
+
+sys.path.insert(0, ".")
+
+import numpy as np
+
+from backtracking_solver import BacktrackingSolver
+from geometry import Geometry
+from grid import Grid
+
+
+class VectorizedBatch:
+    """
+    Candidate computation and singles for a whole batch of grids at once (requires NumPy).
+
+    Grids are an (N, cells) uint8 array of values (0 for an empty cell).  Candidate masks
+    come from OR-reductions over every row, column and block of every grid; naked and hidden
+    singles are then applied to all grids in lock-step until none of them changes.  Only the
+    grids that singles cannot finish are handed to a per-puzzle search (`solver`, by default
+    a BacktrackingSolver).
+
+    - candidates(grids) - (N, cells) candidate masks (0 for placed cells)
+    - propagate(grids) - (grids after singles, solved flags, contradiction flags)
+    - solve(grids) - (solutions, solved flags); unsolvable rows are returned as far as singles got them
+    """
+
+    def __init__(self, geometry=None, solver=None):
+        self.geometry = geometry or Geometry.of(3, 3)
+        self._houses = np.array(self.geometry.houses, dtype=np.intp)
+        self._cell_houses = np.array(self.geometry.cell_houses, dtype=np.intp)
+        self._full = (1 << self.geometry.size) - 1
+        self._solver = solver or BacktrackingSolver(self.geometry)
+
+    def from_strings(self, lines) -> np.ndarray:
+        return np.array([Grid.from_string(line, self.geometry).values for line in lines], dtype=np.uint8).reshape(
+            -1, self.geometry.cell_count
+        )
+
+    def to_strings(self, grids) -> list:
+        return [Grid(self.geometry, row).to_string() for row in grids.tolist()]
+
+    def candidates(self, grids) -> np.ndarray:
+        bits = self.__bits(grids)
+        used = np.bitwise_or.reduce(bits[:, self._houses], axis=2)
+        cell_used = (
+            used[:, self._cell_houses[:, 0]] | used[:, self._cell_houses[:, 1]] | used[:, self._cell_houses[:, 2]]
+        )
+        return np.where(grids == 0, self._full & ~cell_used, 0).astype(np.uint32)
+
+    def propagate(self, grids) -> tuple:
+        grids = np.array(grids, dtype=np.uint8).reshape(-1, self.geometry.cell_count)
+        contradiction = np.zeros(len(grids), dtype=bool)
+        active = np.arange(len(grids))
+        while len(active):
+            subset = grids[active]
+            masks = self.candidates(subset)
+            failed = self.__contradictions(subset, masks)
+            contradiction[active[failed]] = True
+            placed = self.__place_singles(subset, masks) & ~failed
+            grids[active] = subset
+            active = active[placed]
+        solved = (grids != 0).all(axis=1) & ~contradiction
+        return grids, solved, contradiction
+
+    def solve(self, grids) -> tuple:
+        grids, solved, contradiction = self.propagate(grids)
+        for row in np.nonzero(~solved & ~contradiction)[0]:
+            solution = self._solver.solve(Grid(self.geometry, grids[row].tolist()))
+            if solution:
+                grids[row] = solution.values
+                solved[row] = True
+        return grids, solved
+
+    # Private functions
+
+    def __bits(self, grids) -> np.ndarray:
+        values = grids.astype(np.uint32)
+        return np.where(values > 0, np.left_shift(np.uint32(1), values - 1, dtype=np.uint32), np.uint32(0))
+
+    def __contradictions(self, grids, masks) -> np.ndarray:
+        """Flag grids with an empty cell without candidates, a repeated value or a value with no place in a house"""
+        dead_cell = ((grids == 0) & (masks == 0)).any(axis=1)
+        bits = self.__bits(grids)[:, self._houses]
+        repeated = (np.bitwise_or.reduce(bits, axis=2) != bits.sum(axis=2)).any(axis=1)
+        covered = np.bitwise_or.reduce(bits | masks[:, self._houses], axis=2)
+        missing = (covered != self._full).any(axis=1)
+        return dead_cell | repeated | missing
+
+    def __place_singles(self, grids, masks) -> np.ndarray:
+        """Place every naked and hidden single in place; returns flags of the grids that changed"""
+        size = self.geometry.size
+        digits = (masks[:, :, None] >> np.arange(size, dtype=np.uint32)) & 1  # (grids, cells, digits)
+        naked = digits.sum(axis=2) == 1
+        values = np.where(naked, digits.argmax(axis=2) + 1, 0)
+
+        in_house = digits[:, self._houses, :]  # (grids, houses, cells in house, digits)
+        hidden = in_house.sum(axis=2) == 1  # (grids, houses, digits)
+        grid_idx, house_idx, digit_idx = np.nonzero(hidden)
+        position = in_house[grid_idx, house_idx, :, digit_idx].argmax(axis=1)
+        values[grid_idx, self._houses[house_idx, position]] = digit_idx + 1
+
+        values = np.where(grids == 0, values, 0)
+        np.copyto(grids, values.astype(np.uint8), where=values > 0)
+        return (values > 0).any(axis=1)